@@ -10,10 +10,74 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "testdb")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "pg_age")
 POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", 5432))
 POSTGRES_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+POSTGRES_DSN = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+POSTGRES_REPLICA_HOST = os.getenv("POSTGRES_REPLICA_HOST")
+POSTGRES_REPLICA_PORT = int(os.getenv("POSTGRES_REPLICA_PORT", POSTGRES_PORT))
+POSTGRES_REPLICA_URL = (
+    f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_REPLICA_HOST}:{POSTGRES_REPLICA_PORT}/{POSTGRES_DB}"
+    if POSTGRES_REPLICA_HOST else None
+)
+POSTGRES_REPLICA_DSN = (
+    f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_REPLICA_HOST}:{POSTGRES_REPLICA_PORT}/{POSTGRES_DB}"
+    if POSTGRES_REPLICA_HOST else None
+)
+READ_PRIMARY_AFTER_WRITE_SECONDS = int(os.getenv("READ_PRIMARY_AFTER_WRITE_SECONDS", 5))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 5))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "pichta-api")
+DB_JIT = os.getenv("DB_JIT", "off")
+AUTH_STATEMENT_TIMEOUT_MS = int(os.getenv("AUTH_STATEMENT_TIMEOUT_MS", 5000))
+
+POSTGRES_GRAPH = os.getenv("POSTGRES_GRAPH", "professions_graph")
+GRAPH_POOL_MIN_SIZE = int(os.getenv("GRAPH_POOL_MIN_SIZE", 2))
+GRAPH_POOL_MAX_SIZE = int(os.getenv("GRAPH_POOL_MAX_SIZE", 10))
+GRAPH_CACHE_SIZE = int(os.getenv("GRAPH_CACHE_SIZE", 128))
+GRAPH_CACHE_VERSION_TTL_SECONDS = float(os.getenv("GRAPH_CACHE_VERSION_TTL_SECONDS", 5))
 
 SECRET_KEY_JWT = os.getenv("SECRET_KEY_JWT")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
+JWT_PRIVATE_KEY_FILE = os.getenv("JWT_PRIVATE_KEY_FILE")
+JWT_PUBLIC_KEY_FILE = os.getenv("JWT_PUBLIC_KEY_FILE")
+JWT_KEY_ID = os.getenv("JWT_KEY_ID", "main")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100000))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 4096))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+PASSWORD_HASH_SCHEMES = [scheme.strip() for scheme in os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt").split(",") if scheme.strip()]
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", 60))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+LOGIN_LIMIT_PER_LOGIN = int(os.getenv("LOGIN_LIMIT_PER_LOGIN", 5))
+LOGIN_LIMIT_PER_IP = int(os.getenv("LOGIN_LIMIT_PER_IP", 20))
+REGISTER_LIMIT_PER_IP = int(os.getenv("REGISTER_LIMIT_PER_IP", 5))
+TRUSTED_PROXIES = [proxy.strip() for proxy in os.getenv("TRUSTED_PROXIES", "").split(",") if proxy.strip()]
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", 20))
+LOG_SAMPLE_WINDOW_SECONDS = float(os.getenv("LOG_SAMPLE_WINDOW_SECONDS", 10))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.01))
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "console")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 500))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", 512))
+QUERY_DEBUG_HEADERS = os.getenv("QUERY_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
 
 FRONTEND_URL_ARRAY = os.getenv("FRONTEND_URL", "http://127.0.0.1:8085,http://localhost:8085").split(",")
\ No newline at end of file
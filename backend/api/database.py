@@ -1,25 +1,150 @@
-from typing import AsyncGenerator
+import asyncio
+import time
+from typing import AsyncGenerator, Callable, Optional
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
-from config import POSTGRES_URL
+import asyncpg
+from fastapi import Depends, Request, Response
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-
-engine = create_async_engine(
+from metrics import count_query
+from tracing import start_statement_span, end_statement_span, fail_statement_span, record_graph_query
+from config import (
     POSTGRES_URL,
-    pool_size=20,
-    max_overflow=10
+    POSTGRES_DSN,
+    GRAPH_POOL_MIN_SIZE,
+    GRAPH_POOL_MAX_SIZE,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_APPLICATION_NAME,
+    DB_JIT,
+    POSTGRES_REPLICA_URL,
+    POSTGRES_REPLICA_DSN,
+    READ_PRIMARY_AFTER_WRITE_SECONDS,
 )
+
+
+class PoolMetrics:
+    """Checkout metrics of the SQLAlchemy pool.
+
+    Attributes:
+        checkouts: Number of successful checkouts.
+        timeouts: Number of checkouts that failed with ``pool_timeout``.
+        wait_seconds: Total checkout time (waiting for a free connection or opening a new one).
+        max_wait_seconds: Longest checkout.
+        peak_checked_out: Maximum number of connections checked out at once.
+        peak_overflow: Maximum number of overflow connections open at once.
+    """
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def observe(self, pool: "MeteredQueuePool", wait: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+        self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout latency and overflow usage."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe(self, time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "MeteredQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+# Параметры сессии Postgres для каждого нового соединения
+SERVER_SETTINGS = {
+    "application_name": DB_APPLICATION_NAME,
+    "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+    "jit": DB_JIT,
+}
+
+def create_engine(url: str, application_name: str = DB_APPLICATION_NAME) -> AsyncEngine:
+    """Creates an async engine with the pool settings from config."""
+    return create_async_engine(
+        url,
+        poolclass=MeteredQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={
+            "server_settings": {**SERVER_SETTINGS, "application_name": application_name},
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+engine = create_engine(POSTGRES_URL)
 new_session = async_sessionmaker(engine, expire_on_commit=False)
 
+# Реплика для чтения; без POSTGRES_REPLICA_HOST чтение идёт в primary
+read_engine = create_engine(POSTGRES_REPLICA_URL, f"{DB_APPLICATION_NAME}-read") if POSTGRES_REPLICA_URL else engine
+# Сессии чтения открывают транзакции как BEGIN READ ONLY (без отдельного SET TRANSACTION)
+new_read_session = async_sessionmaker(read_engine.execution_options(postgresql_readonly=True), expire_on_commit=False)
+new_primary_read_session = async_sessionmaker(engine.execution_options(postgresql_readonly=True), expire_on_commit=False)
+
+for _engine in {engine, read_engine}:
+    event.listen(_engine.sync_engine, "before_cursor_execute", count_query)
+    event.listen(_engine.sync_engine, "before_cursor_execute", start_statement_span)
+    event.listen(_engine.sync_engine, "after_cursor_execute", end_statement_span)
+    event.listen(_engine.sync_engine, "handle_error", fail_statement_span)
+
+READ_PRIMARY_COOKIE = "read_primary"
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+graph_pool: Optional[asyncpg.Pool] = None
+_graph_pool_lock = asyncio.Lock()
+
 
 class Model(DeclarativeBase):
     """ Model for ORM-classes """
     pass
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """ Dependency для получения сессии БД """
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency для сессии запроса: одна транзакция на запрос.
+
+    Репозитории только flush'ат изменения, commit выполняется здесь один раз после
+    обработчика (или rollback при ошибке). У GET/HEAD/OPTIONS сессия primary только
+    для чтения и без commit — её же переиспользует ``get_read_db``.
+    """
+    if request.method in SAFE_METHODS:
+        session = new_primary_read_session()
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
     session = new_session()
     try:
         yield session
@@ -31,6 +156,177 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency для сессии чтения: реплика, либо primary сразу после записи этого клиента.
+
+    Read-your-writes: после успешного изменяющего запроса ``read_your_writes`` ставит
+    cookie ``read_primary`` на ``READ_PRIMARY_AFTER_WRITE_SECONDS``, пока она жива,
+    чтение идёт в primary (реплика могла ещё не догнать запись).
+
+    Транзакция только для чтения и без commit: запись в ней отклонит сам Postgres,
+    а транзакция закрывается откатом при возврате соединения в пул.
+
+    Чтение из primary в безопасном запросе идёт через сессию ``get_db`` (она уже только
+    для чтения, её же использует ``get_current_user``): одно соединение на запрос.
+    """
+    if request.method in SAFE_METHODS and (read_engine is engine or request.cookies.get(READ_PRIMARY_COOKIE)):
+        yield db
+        return
+    factory = new_primary_read_session if request.cookies.get(READ_PRIMARY_COOKIE) else new_read_session
+    session = factory()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def read_your_writes(request: Request, call_next) -> Response:
+    """HTTP middleware: marks clients that have just written to stick to primary for reads."""
+    response = await call_next(request)
+    if read_engine is not engine and request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            key=READ_PRIMARY_COOKIE,
+            value="1",
+            max_age=READ_PRIMARY_AFTER_WRITE_SECONDS,
+            httponly=True,
+        )
+    return response
+
+
+def statement_timeout(milliseconds: int) -> Callable[..., None]:
+    """Creates a dependency that limits statements of the request session.
+
+    Usage: ``dependencies=[Depends(statement_timeout(5000))]`` on a route or router.
+    The limit is applied with ``SET LOCAL`` at the start of every transaction of the
+    session (repositories may commit several times per request).
+
+    Args:
+        milliseconds: Server-side ``statement_timeout`` for the request.
+
+    Returns:
+        A Callable[..., None], FastAPI dependency.
+    """
+    async def dependency(db: AsyncSession = Depends(get_db)) -> None:
+        db.info["statement_timeout"] = milliseconds
+    return dependency
+
+
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session: Session, transaction, connection) -> None:
+    if (milliseconds := session.info.get("statement_timeout")) is not None:
+        connection.execute(text(f"SET LOCAL statement_timeout = {int(milliseconds)}"))
+
+
+async def warm_up_pool(connections: int) -> int:
+    """Opens ``connections`` connections per pool at startup (first requests don't pay for connecting).
+
+    Returns:
+        A int, number of connections opened.
+    """
+    connections = min(connections, DB_POOL_SIZE)
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+
+    async def open_one(target: AsyncEngine):
+        conn = await target.connect().start()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    # Все соединения держим открытыми одновременно, иначе пул отдаст одно и то же
+    results = await asyncio.gather(
+        *(open_one(target) for target in engines for _ in range(connections)), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    return len(opened)
+
+
+def pool_stats(target: Optional[AsyncEngine] = None) -> dict:
+    """Returns the state and checkout metrics of a SQLAlchemy pool (primary by default)."""
+    pool = (target or engine).pool
+    metrics = pool.metrics
+    return {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "peak_checked_out": metrics.peak_checked_out,
+        "peak_overflow": max(metrics.peak_overflow, 0),
+        "checkouts": metrics.checkouts,
+        "timeouts": metrics.timeouts,
+        "avg_wait_ms": round(metrics.wait_seconds / metrics.checkouts * 1000, 2) if metrics.checkouts else 0.0,
+        "max_wait_ms": round(metrics.max_wait_seconds * 1000, 2),
+    }
+
+
+# Параметры старта соединения: RESET ALL возвращает к ним, а не к настройкам сервера
+GRAPH_SERVER_SETTINGS = {
+    **SERVER_SETTINGS,
+    "application_name": f"{DB_APPLICATION_NAME}-graph",
+    "search_path": "ag_catalog, \"$user\", public",
+}
+
+
+async def init_graph_connection(conn: asyncpg.Connection) -> None:
+    """Initialises a new pooled connection for Apache AGE.
+
+    Runs once per physical connection (not per request): loads the extension
+    and registers a text codec for agtype. search_path is a startup parameter
+    of the pool (``GRAPH_SERVER_SETTINGS``): a ``SET`` here would be undone by
+    the ``RESET ALL`` asyncpg runs when a connection is released.
+
+    Args:
+        conn: Fresh asyncpg connection.
+    """
+    conn.add_query_logger(count_query)
+    conn.add_query_logger(record_graph_query)
+    await conn.execute("LOAD 'age';")
+    await conn.set_type_codec(
+        "agtype",
+        schema="ag_catalog",
+        encoder=str,
+        decoder=str,
+        format="text",
+    )
+
+
+async def init_graph_pool() -> asyncpg.Pool:
+    """Creates the asyncpg pool for graph queries (if it does not exist yet).
+
+    Returns:
+        A asyncpg.Pool, pool with AGE-initialised connections.
+    """
+    global graph_pool
+    async with _graph_pool_lock:
+        if graph_pool is None:
+            # Пул только для Cypher: граф в API только читается (пишет deploy_db.py), поэтому идёт в реплику,
+            # если она есть. Таблицы (user_skills, группы) читаются через get_read_db с учётом read_primary
+            graph_pool = await asyncpg.create_pool(
+                dsn=POSTGRES_REPLICA_DSN or POSTGRES_DSN,
+                min_size=GRAPH_POOL_MIN_SIZE,
+                max_size=GRAPH_POOL_MAX_SIZE,
+                max_inactive_connection_lifetime=DB_POOL_RECYCLE_SECONDS,
+                statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                server_settings=GRAPH_SERVER_SETTINGS,
+                init=init_graph_connection,
+            )
+    return graph_pool
+
+
+async def get_graph_pool() -> asyncpg.Pool:
+    """ Dependency для получения пула соединений графа """
+    if graph_pool is None:
+        return await init_graph_pool()
+    return graph_pool
+
+
 async def close_db_connection():
     """Закрытие подключений при shutdown"""
-    await engine.dispose()
\ No newline at end of file
+    global graph_pool
+    if graph_pool is not None:
+        await graph_pool.close()
+        graph_pool = None
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
@@ -0,0 +1,174 @@
+import time
+
+from fastapi import APIRouter, FastAPI, Request, Response
+
+from config import QUERY_DEBUG_HEADERS, N_PLUS_ONE_THRESHOLD
+from database import engine, read_engine, pool_stats
+from logger import app_logger, queue_handler, sampling_filter
+from metrics import CallbackMetric, Counter, Gauge, Histogram, QueryCounter, registry, start_query_count
+from routers.auth.ident.cache import user_cache
+from routers.auth.ident.utils import password_hash_pool
+from routers.graphs.cache import graph_cache
+from tracing import tracer, TRACEPARENT_HEADER
+
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_REPEATS_HEADER = "X-Query-Max-Repeats"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template, method and status.", ("method", "route", "status"),
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being processed.",
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "DB queries (SQLAlchemy and graph) per HTTP request.", ("method", "route"),
+    buckets=QUERY_BUCKETS,
+))
+db_n_plus_one = registry.register(Counter(
+    "db_n_plus_one_total", "Requests that repeated one SQL statement at least N_PLUS_ONE_THRESHOLD times.",
+    ("method", "route"),
+))
+
+
+def route_template(request: Request) -> str:
+    """Route path template (``/skill/get/{skill_id}``), so that labels stay bounded."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def check_n_plus_one(queries: QueryCounter, method: str, route: str) -> None:
+    """Logs and counts statements repeated at least ``N_PLUS_ONE_THRESHOLD`` times in one request."""
+    repeated = queries.repeated(N_PLUS_ONE_THRESHOLD)
+    if not repeated:
+        return
+    db_n_plus_one.inc(method=method, route=route)
+    statement, count = repeated[0]
+    app_logger.warning(
+        "Possible N+1 in %s %s: statement executed %s times (%s repeated statements, %s queries): %s",
+        method, route, count, len(repeated), queries.total, statement[:300], extra={"sampled": True},
+    )
+
+
+async def metrics_middleware(request: Request, call_next) -> Response:
+    """HTTP middleware: latency, status and DB query count of every request.
+
+    With ``QUERY_DEBUG_HEADERS`` the response carries ``X-Query-Count`` and
+    ``X-Query-Max-Repeats`` (queries run by the time the response is returned).
+    """
+    queries = start_query_count()
+    http_requests_in_flight.inc()
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        if QUERY_DEBUG_HEADERS:
+            response.headers[QUERY_COUNT_HEADER] = str(queries.total)
+            response.headers[QUERY_REPEATS_HEADER] = str(queries.max_repeats)
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        http_requests_in_flight.dec()
+        route = route_template(request)
+        http_requests.inc(method=request.method, route=route, status=status)
+        http_request_duration.observe(elapsed, method=request.method, route=route)
+        db_queries_per_request.observe(queries.total, method=request.method, route=route)
+        check_n_plus_one(queries, request.method, route)
+
+
+async def tracing_middleware(request: Request, call_next) -> Response:
+    """HTTP middleware: root span of the request trace, named by method and route template."""
+    with tracer.start_trace(request.method, request.headers.get(TRACEPARENT_HEADER), **{
+        "http.method": request.method, "url.path": request.url.path,
+    }) as span:
+        response = await call_next(request)
+        if span is not None:
+            route = route_template(request)
+            span.name = f"{request.method} {route}"
+            span.set_attribute("http.route", route)
+            span.set_attribute("http.status_code", response.status_code)
+        return response
+
+
+def _engines():
+    if read_engine is engine:
+        return [("primary", engine)]
+    return [("primary", engine), ("read", read_engine)]
+
+
+def _pool_metric(name: str, documentation: str, read, type: str = "gauge") -> None:
+    registry.register(CallbackMetric(
+        name, documentation, lambda: [({"pool": pool}, read(target)) for pool, target in _engines()], type,
+    ))
+
+
+_pool_metric("db_pool_size", "Configured pool size.", lambda target: pool_stats(target)["size"])
+_pool_metric("db_pool_checked_out", "Connections checked out of the pool.",
+             lambda target: pool_stats(target)["checked_out"])
+_pool_metric("db_pool_overflow", "Overflow connections open beyond the pool size.",
+             lambda target: pool_stats(target)["overflow"])
+_pool_metric("db_pool_peak_overflow", "Maximum overflow connections open at once.",
+             lambda target: pool_stats(target)["peak_overflow"])
+_pool_metric("db_pool_checkouts_total", "Pool checkouts.", lambda target: target.pool.metrics.checkouts, "counter")
+_pool_metric("db_pool_checkout_timeouts_total", "Checkouts that failed with pool_timeout.",
+             lambda target: target.pool.metrics.timeouts, "counter")
+_pool_metric("db_pool_checkout_wait_seconds_total", "Total time spent waiting for pool checkouts.",
+             lambda target: target.pool.metrics.wait_seconds, "counter")
+_pool_metric("db_pool_checkout_max_wait_seconds", "Longest pool checkout.",
+             lambda target: target.pool.metrics.max_wait_seconds)
+
+registry.register(CallbackMetric(
+    "graph_cache_requests_total", "Profession graph cache lookups by result.",
+    lambda: [({"result": "hit"}, graph_cache.hits), ({"result": "miss"}, graph_cache.misses)], "counter",
+))
+registry.register(CallbackMetric(
+    "graph_cache_entries", "Profession graphs in the cache.", lambda: [({}, len(graph_cache))],
+))
+registry.register(CallbackMetric(
+    "user_cache_requests_total", "Auth user cache lookups by result.",
+    lambda: [({"result": "hit"}, user_cache.hits), ({"result": "miss"}, user_cache.misses)], "counter",
+))
+registry.register(CallbackMetric(
+    "password_hash_queue_depth", "Password hashes waiting for a worker thread.",
+    lambda: [({}, password_hash_pool.queued)],
+))
+registry.register(CallbackMetric(
+    "password_hash_running", "Password hashes running.", lambda: [({}, password_hash_pool.running)],
+))
+registry.register(CallbackMetric(
+    "password_hash_rejected_total", "Password hashes rejected with 503 (queue full).",
+    lambda: [({}, password_hash_pool.rejected)], "counter",
+))
+registry.register(CallbackMetric(
+    "password_hash_completed_total", "Password hashes completed.",
+    lambda: [({}, password_hash_pool.completed)], "counter",
+))
+registry.register(CallbackMetric(
+    "log_records_dropped_total", "Log records dropped because the log queue was full.",
+    lambda: [({}, queue_handler.dropped)], "counter",
+))
+registry.register(CallbackMetric(
+    "log_records_sampled_out_total", "Repeated log records dropped by sampling.",
+    lambda: [({}, sampling_filter.sampled_out)], "counter",
+))
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def setup_instrumentation(app: FastAPI) -> None:
+    """Registers the tracing and metrics middlewares (outermost, call last) and the ``/metrics`` endpoint."""
+    app.include_router(router)
+    app.middleware("http")(tracing_middleware)
+    app.middleware("http")(metrics_middleware)
@@ -1,20 +1,207 @@
+import atexit
+import json
 import logging
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
 
+from fastapi import Request, Response
 
-def setup_logger() -> Logger:
-    logger = logging.getLogger("app")
-    logger.setLevel(logging.INFO)
+from config import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_BURST,
+    LOG_SAMPLE_WINDOW_SECONDS,
+    LOG_SAMPLE_RATE,
+)
+
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Идентификатор текущего HTTP-запроса (None вне запроса)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Стандартные атрибуты LogRecord: всё остальное пришло через extra= и попадает в JSON
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ``ts``, ``level``, ``logger``, ``message``, ``request_id`` and ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The previous human-readable format with the request id (``LOG_FORMAT=text``)."""
+
+    def __init__(self):
+        super().__init__("%(levelname)s:     [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the id of the current request (runs in the calling task, where the context is)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Thins out repeated records of high-volume call sites during storms.
+
+    Only records logged with ``extra={"sampled": True}`` below ERROR are sampled:
+    errors and ordinary records always pass. Sampled records are grouped by call
+    site (file and line) and level, so a storm at one site does not hide records
+    of another. The first ``burst`` records of a group in each window pass, the
+    rest pass with probability ``rate``. The next record that passes carries
+    ``suppressed`` - how many were dropped before it.
+
+    Attributes:
+        sampled_out: Records dropped by sampling.
+    """
+    MAX_GROUPS = 1024
+
+    def __init__(self, burst: int = LOG_SAMPLE_BURST, window: float = LOG_SAMPLE_WINDOW_SECONDS,
+                 rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.rate = rate
+        self.sampled_out = 0
+        self._groups: Dict[Tuple[str, int, int], List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or not getattr(record, "sampled", False):
+            return True
+        key = (record.pathname, record.lineno, record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None or now - group[0] >= self.window:
+                if group is None and len(self._groups) >= self.MAX_GROUPS:
+                    self._groups.clear()
+                suppressed = group[2] if group is not None else 0
+                group = self._groups[key] = [now, 0, suppressed]
+            group[1] += 1
+            if group[1] > self.burst and random.random() >= self.rate:
+                group[2] += 1
+                self.sampled_out += 1
+                return False
+            if group[2]:
+                record.suppressed = group[2]
+                group[2] = 0
+        return True
 
-    formatter = logging.Formatter(
-        '%(levelname)s:     %(message)s'
-    )
 
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+class NonBlockingQueueHandler(QueueHandler):
+    """Puts records into a bounded queue without formatting and without ever blocking.
 
+    Formatting (``msg % args``, tracebacks, JSON) happens in the listener thread,
+    so ``args`` must not be mutated after the call. When the queue is full the
+    record is dropped and counted.
+
+    Attributes:
+        dropped: Records dropped because the queue was full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Очередь может быть полной: поток-слушатель её разбирает, поэтому ждём места
+        self.queue.put(self._sentinel)
+
+
+def _formatter(log_format: str) -> logging.Formatter:
+    return TextFormatter() if log_format == "text" else JsonFormatter()
+
+
+log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+queue_handler = NonBlockingQueueHandler(log_queue)
+sampling_filter = SamplingFilter()
+
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_formatter(LOG_FORMAT))
+_listener = _Listener(log_queue, _stream_handler, respect_handler_level=True)
+
+
+def start_logging() -> None:
+    """Starts the thread writing log records (idempotent)."""
+    if _listener._thread is None:
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the writer thread (idempotent)."""
+    if _listener._thread is not None:
+        _listener.stop()
+
+
+def setup_logger() -> Logger:
+    logger = logging.getLogger("app")
+    logger.setLevel(LOG_LEVEL)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(sampling_filter)
+    logger.addHandler(queue_handler)
+    start_logging()
+    atexit.register(stop_logging)
     return logger
 
 
-app_logger = setup_logger()
\ No newline at end of file
+async def request_id_middleware(request: Request, call_next) -> Response:
+    """HTTP middleware: takes ``X-Request-ID`` (or generates one), binds it to log records and echoes it back."""
+    request_id = request.headers.get(REQUEST_ID_HEADER)
+    if not request_id or not _REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+app_logger = setup_logger()
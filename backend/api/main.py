@@ -2,8 +2,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import close_db_connection
-from logger import app_logger
+from database import close_db_connection, init_graph_pool, new_session, warm_up_pool, pool_stats, engine, read_engine, read_your_writes
+from instrumentation import setup_instrumentation
+from logger import app_logger, request_id_middleware, start_logging, stop_logging
+from tracing import shutdown_tracing
+from routers.auth.ident.jwt import JWTService
+from routers.auth.ident.service import RefreshTokenRepository
+from routers.auth.ident.utils import check_password_backends, password_hash_pool
 
 from routers.auth.ident.router import router as router_ident
 from routers.auth.user.router import router as router_user
@@ -18,18 +23,51 @@ from routers.task.router import router as router_task
 
 from config import (
     FRONTEND_URL_ARRAY,
+    DB_POOL_WARMUP,
 )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_logging()
+
+    # Ключи подписи JWT читаются и разбираются один раз; ошибка конфигурации останавливает запуск
+    codec = JWTService.codec()
+    app_logger.info("JWT keys loaded: %s (%s)", codec.algorithm, codec.backend)
+    check_password_backends()
+
+    try:
+        opened = await warm_up_pool(DB_POOL_WARMUP)
+        app_logger.info("DB pool warmed up: %s/%s connections", opened, DB_POOL_WARMUP)
+    except Exception as e:
+        app_logger.error("DB pool warm-up failed: %s", e)
+
+    try:
+        await init_graph_pool()
+    except Exception as e:
+        # Пул графа создастся лениво при первом запросе
+        app_logger.error("Graph pool init failed: %s", e)
+
+    try:
+        async with new_session() as session:
+            await RefreshTokenRepository(session).load_revoked()
+    except Exception as e:
+        app_logger.error("Revoked tokens load failed: %s", e)
+
     try:
         yield
     except Exception as e:
-        app_logger.error(f"Unexpected error: {str(e)}")
+        app_logger.error("Unexpected error: %s", e)
     finally:
+        app_logger.info("DB pool stats: %s", pool_stats())
+        if read_engine is not engine:
+            app_logger.info("DB read pool stats: %s", pool_stats(read_engine))
         await close_db_connection()
         app_logger.info("Database connection closed")
+        password_hash_pool.shutdown()
+        shutdown_tracing()
+        # Дописываем записи из очереди логов до выхода
+        stop_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -44,10 +82,15 @@ app.include_router(router_profession, prefix="/prof", tags=["Profession"])
 app.include_router(router_skill, prefix="/skill", tags=["Skills"])
 app.include_router(router_task, prefix="/task", tags=["Tasks"])
 
+app.middleware("http")(read_your_writes)
+app.middleware("http")(request_id_middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=FRONTEND_URL_ARRAY,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# Последней: внешний middleware, меряет весь запрос
+setup_instrumentation(app)
@@ -0,0 +1,237 @@
+import bisect
+import math
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class Metric(ABC):
+    """Base class of metrics rendered in the Prometheus text format (version 0.0.4).
+
+    Attributes:
+        name: Metric name.
+        documentation: HELP text.
+        labelnames: Names of the labels, values are passed as keyword arguments.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        """Yields ``(sample name, labels, value)`` of every sample of the metric."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(_format_sample(name, labels, value) for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Cumulative histogram (``_bucket``, ``_sum`` and ``_count`` samples).
+
+    Attributes:
+        buckets: Upper bounds of the buckets (``+Inf`` is added automatically).
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self) -> Iterable[Sample]:
+        for key, counts in self._counts.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, self._sums[key]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """Metric whose samples are read at scrape time (state owned by other objects).
+
+    Args:
+        collect: Returns ``(labels, value)`` pairs.
+        type: ``gauge`` or ``counter``.
+    """
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]],
+                 type: str = "gauge"):
+        super().__init__(name, documentation)
+        self.type = type
+        self.collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self.collect():
+            yield self.name, labels, value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class QueryCounter:
+    """DB queries of one request: the total and how often each statement text repeats.
+
+    The same SQL text executed many times in one request (a SELECT per row of a
+    loop, lazy loads) is the N+1 pattern.
+
+    Attributes:
+        total: Number of queries.
+        statements: Executions per statement text (at most ``MAX_STATEMENTS`` distinct texts).
+    """
+    MAX_STATEMENTS = 256
+
+    def __init__(self):
+        self.total = 0
+        self.statements: Dict[str, int] = {}
+
+    def count(self, statement: Optional[str] = None) -> None:
+        self.total += 1
+        if statement is not None and (statement in self.statements or len(self.statements) < self.MAX_STATEMENTS):
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.statements.values(), default=0)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, most frequent first."""
+        return sorted(
+            ((statement, count) for statement, count in self.statements.items() if count >= threshold),
+            key=lambda item: item[1], reverse=True,
+        )
+
+
+# Счётчик запросов к БД текущего HTTP-запроса (None вне запроса)
+_query_count: ContextVar[Optional[QueryCounter]] = ContextVar("query_count", default=None)
+
+
+def start_query_count() -> QueryCounter:
+    """Starts counting DB queries for the current request context."""
+    counter = QueryCounter()
+    _query_count.set(counter)
+    return counter
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Counts DB queries of a block (restores the outer counter on exit)."""
+    counter = QueryCounter()
+    token = _query_count.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_count.reset(token)
+
+
+def _statement_of(args: tuple) -> Optional[str]:
+    # before_cursor_execute(conn, cursor, statement, ...) или LoggedQuery asyncpg
+    if len(args) >= 3 and isinstance(args[2], str):
+        return args[2]
+    if len(args) == 1:
+        return getattr(args[0], "query", None)
+    return None
+
+
+def count_query(*args) -> None:
+    """Counts one DB query in the current request (usable directly as an event/query-logger callback)."""
+    counter = _query_count.get()
+    if counter is not None:
+        counter.count(_statement_of(args))
@@ -2,7 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 
 from .schemas import UserUpdate
-from .service import AdminRepository, get_admin_repository
+from .service import AdminRepository, get_admin_repository, get_admin_read_repository
 from routers.auth.ident.dependencies import require_roles
 from routers.auth.user.roles import UserRole
 from routers.auth.user.schemas import UserInfo
@@ -20,7 +20,7 @@ router = APIRouter()
     response_model=List[UserInfo]
 )
 async def get_all_users(
-        admin_repo: AdminRepository = Depends(get_admin_repository),
+        admin_repo: AdminRepository = Depends(get_admin_read_repository),
         current_user: UserInfo = Depends(require_roles([UserRole.admin]))
 ) -> List[UserInfo]:
     return await admin_repo.get_all_users()
@@ -3,11 +3,14 @@ from sqlalchemy import select
 from fastapi import HTTPException, status, Depends
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db
+from tracing import trace_methods
+from routers.auth.ident.cache import invalidate_after_commit
 from routers.auth.user.models import UserOrm
 from routers.auth.user.roles import UserRole
 
 
+@trace_methods
 class AdminRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -36,7 +39,8 @@ class AdminRepository:
             )
 
         await self.session.delete(user)
-        await self.session.commit()
+        await self.session.flush()
+        invalidate_after_commit(self.session, user_id)
 
     async def update_user(self, user_id: int, user_data: dict):
         user = await self.session.get(UserOrm, user_id)
@@ -53,11 +57,17 @@ class AdminRepository:
                 setattr(user, key, value)
 
         user.update_time = datetime.utcnow()
-        await self.session.commit()
-        await self.sessionrefresh(user)
+        await self.session.flush()
+        invalidate_after_commit(self.session, user_id)
+        await self.session.refresh(user)
         return user
 
 
 def get_admin_repository(db: AsyncSession = Depends(get_db)) -> AdminRepository:
     """ Dependency для FastAPI """
-    return AdminRepository(db)
\ No newline at end of file
+    return AdminRepository(db)
+
+
+def get_admin_read_repository(db: AsyncSession = Depends(get_read_db)) -> AdminRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return AdminRepository(db)
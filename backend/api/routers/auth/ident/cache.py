@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+from ..user.schemas import UserInfo
+
+
+class UserCache:
+    """Bounded TTL cache of validated ``UserInfo`` for ``get_current_user``.
+
+    Entries are keyed by ``(user_id, jti)``, so a cached user is only reused for the
+    token it was resolved for. The cache is per process: repositories invalidate
+    it on user changes, other workers see the change after at most ``ttl`` seconds.
+
+    Attributes:
+        max_size: Maximum number of cached entries.
+        ttl: Lifetime of an entry in seconds.
+        hits: Number of lookups served from the cache.
+        misses: Number of lookups that went to the database.
+    """
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[float, UserInfo]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[Tuple[int, Hashable]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: int, jti: Hashable = None) -> Optional[UserInfo]:
+        key = (user_id, jti)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id: int, jti: Hashable, user: UserInfo) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        key = (user_id, jti)
+        self._entries[key] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drops all entries of a user (or the whole cache)."""
+        if user_id is None:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            return
+        for key in self._keys_by_user.pop(user_id, ()):
+            self._entries.pop(key, None)
+
+    def _remove(self, key: Tuple[int, Hashable]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+user_cache = UserCache()
+
+PENDING_INVALIDATIONS = "user_cache_invalidate"
+
+
+def invalidate_after_commit(session: AsyncSession, user_id: int) -> None:
+    """Drops the user from ``user_cache`` when ``session`` commits (nothing is dropped on rollback).
+
+    Invalidating before the commit would let a concurrent request cache the old row again.
+    """
+    session.info.setdefault(PENDING_INVALIDATIONS, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
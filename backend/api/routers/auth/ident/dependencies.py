@@ -2,8 +2,12 @@ from typing import List, Callable, Optional
 
 from fastapi import Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+import database
+from tracing import traced
 from .jwt import JWTService
 from .responses.http_errors import HTTPError
+from ..user.service import UserRepository, get_user_repository
 from ..user.roles import UserRole
 from ..user.schemas import UserInfo
 
@@ -11,20 +15,29 @@ from ..user.schemas import UserInfo
 http_bearer = HTTPBearer()
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(http_bearer)) -> UserInfo:
+@traced("auth.get_current_user")
+async def get_current_user(
+        credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+        user_repo: UserRepository = Depends(get_user_repository),
+) -> UserInfo:
     """Retrieves the current user based on the provided JWT token.
 
     Args:
         credentials (HTTPAuthorizationCredentials): The HTTP authorization credentials containing the JWT token.
+        user_repo (UserRepository): Users of the request session (``get_db``, read-only for GET).
+            GET handlers reading from primary share it through ``get_read_db``; with a replica the
+            lookup transaction is ended here, so the request does not hold a primary connection
+            while the handler reads from the replica.
 
     Returns:
         UserInfo: The user object corresponding to the valid JWT token.
     """
     token = credentials.credentials
 
-    user = await JWTService.descript_and_check_token(token)
-
-    return UserInfo.model_validate(user.__dict__)
+    user_info = await JWTService.get_user_info(token, user_repo)
+    if database.read_engine is not database.engine and user_repo.session.in_transaction():
+        await user_repo.session.commit()
+    return user_info
 
 
 def require_roles(req_roles: List[UserRole]) -> Callable[[UserInfo], UserInfo]:
@@ -1,9 +1,13 @@
+from uuid import uuid4
 from datetime import datetime, timezone, timedelta
-from jose import jwt, JWTError, ExpiredSignatureError
 from fastapi import Response
 
+from routers.auth.ident.cache import user_cache
+from routers.auth.ident.keys import get_token_codec, TokenCodec, InvalidTokenError, TokenExpiredError
 from routers.auth.ident.responses.http_errors import HTTPError
+from routers.auth.ident.service import RefreshTokenRepository
 from routers.auth.user.models import UserOrm
+from routers.auth.user.schemas import UserInfo
 from routers.auth.user.service import UserRepository
 
 from config import (
@@ -29,8 +33,8 @@ class JWTService:
         """
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
-        encode_jwt = jwt.encode(to_encode, SECRET_KEY_JWT, algorithm=ALGORITHM)
+        to_encode.update({"exp": expire, "jti": uuid4().hex})
+        encode_jwt = JWTService.codec().encode(to_encode)
         return encode_jwt
 
     @staticmethod
@@ -46,8 +50,8 @@ class JWTService:
         """
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-        to_encode.update({"exp": expire})
-        encode_jwt = jwt.encode(to_encode, SECRET_KEY_JWT, algorithm=ALGORITHM)
+        to_encode.update({"exp": expire, "jti": uuid4().hex, "type": "refresh"})
+        encode_jwt = JWTService.codec().encode(to_encode)
         response.set_cookie(
             key="refresh_token",
             value=encode_jwt,
@@ -57,36 +61,120 @@ class JWTService:
         )
 
     @staticmethod
-    async def refresh_access_token(refresh_token: str) -> str:
-        """Refreshes the access token using a provided refresh token.
+    async def refresh_access_token(
+            response: Response,
+            refresh_token: str,
+            user_repo: UserRepository,
+            token_repo: RefreshTokenRepository,
+    ) -> str:
+        """Rotates a refresh token: revokes it, sets a new one and returns a new access token.
+
+        A refresh token can be used once; presenting a revoked one is rejected.
+        Tokens without ``jti`` or ``type == "refresh"`` (access tokens, refresh tokens
+        issued before rotation) cannot be revoked and are rejected: the user logs in again.
 
         Args:
+            response (Response): The HTTP response object (new refresh token cookie).
             refresh_token (str): The refresh token used to generate a new access token.
+            user_repo (UserRepository): Users of the current request session.
+            token_repo (RefreshTokenRepository): Revoked tokens of the current request session.
 
         Returns:
             A str, new access token.
         """
-        user = await JWTService.descript_and_check_token(refresh_token)
+        payload = JWTService.decode_token(refresh_token)
+        jti = payload.get("jti")
+        if not jti or payload.get("type") != "refresh":
+            raise HTTPError.invalid_token_401()
+
+        if token_repo.is_revoked(jti):
+            raise HTTPError.refresh_token_in_black_list_401()
+
+        if not (user := await user_repo.find_one_or_none_by_id(int(payload["sub"]))):
+            raise HTTPError.data_out_of_date_403()
 
-        new_access_token = JWTService.create_access_token({"sub": str(user.id)})
-        return new_access_token
+        if not await token_repo.revoke(jti, payload["exp"]):
+            # Токен уже использован в другом процессе
+            raise HTTPError.refresh_token_in_black_list_401()
+
+        JWTService.create_refresh_token(response, {"sub": str(user.id)})
+        return JWTService.create_access_token({"sub": str(user.id)})
 
     @staticmethod
-    async def descript_and_check_token(token: str) -> UserOrm:
+    async def revoke_refresh_token(refresh_token: str, token_repo: RefreshTokenRepository) -> None:
+        """Revokes a refresh token on logout (invalid or legacy tokens are ignored)."""
         try:
-            payload = jwt.decode(token, SECRET_KEY_JWT, algorithms=[ALGORITHM])
-        except ExpiredSignatureError:
+            payload = JWTService.codec().decode(refresh_token)
+        except InvalidTokenError:
+            return
+        if (jti := payload.get("jti")) and payload.get("exp"):
+            await token_repo.revoke(jti, payload["exp"])
+
+    @staticmethod
+    def codec() -> TokenCodec:
+        """Returns the token codec for the current settings (keys are built once and cached)."""
+        return get_token_codec(ALGORITHM, SECRET_KEY_JWT)
+
+    @staticmethod
+    def jwks() -> dict:
+        """Returns the public signing keys as a JWK Set (empty for HMAC algorithms)."""
+        return JWTService.codec().jwks()
+
+    @staticmethod
+    def decode_token(token: str) -> dict:
+        """Decodes and validates a token (signature, expiration, ``sub``).
+
+        Args:
+            token (str): Encoded JWT.
+
+        Returns:
+            A dict, token payload.
+        """
+        try:
+            payload = JWTService.codec().decode(token)
+        except TokenExpiredError:
             raise HTTPError.bad_credentials_403()
-        except JWTError:
+        except InvalidTokenError:
             raise HTTPError.invalid_token_401()
 
-        if not (user_id := payload.get('sub')):
+        if not payload.get('sub'):
             raise HTTPError.invalid_token_401()
 
-        if not (user := await UserRepository.find_one_or_none_by_id(int(user_id))):
+        return payload
+
+    @staticmethod
+    async def descript_and_check_token(token: str, user_repo: UserRepository) -> UserOrm:
+        payload = JWTService.decode_token(token)
+
+        if not (user := await user_repo.find_one_or_none_by_id(int(payload['sub']))):
             raise HTTPError.data_out_of_date_403()
 
         # if not user.is_active:
         #     raise HTTPError.user_not_active_403()
 
-        return user
\ No newline at end of file
+        return user
+
+    @staticmethod
+    async def get_user_info(token: str, user_repo: UserRepository) -> UserInfo:
+        """Returns the user of an access token, served from ``user_cache`` when possible.
+
+        Args:
+            token (str): Encoded access token.
+            user_repo (UserRepository): Users of the current request session (used on cache miss).
+
+        Returns:
+            A UserInfo, the user the token was issued for.
+        """
+        payload = JWTService.decode_token(token)
+        user_id = int(payload['sub'])
+        jti = payload.get('jti')
+
+        if (user_info := user_cache.get(user_id, jti)) is not None:
+            return user_info
+
+        if not (user := await user_repo.find_one_or_none_by_id(user_id)):
+            raise HTTPError.data_out_of_date_403()
+
+        user_info = UserInfo.model_validate(user.__dict__)
+        user_cache.put(user_id, jti, user_info)
+        return user_info
@@ -0,0 +1,153 @@
+import base64
+from functools import lru_cache
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import jwk as jose_jwk, jwt as jose_jwt, ExpiredSignatureError as JoseExpiredSignatureError, JWTError
+
+try:
+    import jwt as pyjwt  # PyJWT: быстрее python-jose и поддерживает EdDSA
+except ImportError:  # pragma: no cover - depends on the environment
+    pyjwt = None
+
+from config import JWT_PRIVATE_KEY_FILE, JWT_PUBLIC_KEY_FILE, JWT_KEY_ID
+
+
+ASYMMETRIC_ALGORITHMS = frozenset(("ES256", "EdDSA"))
+
+
+class InvalidTokenError(Exception):
+    """Token signature, format or claims are invalid."""
+
+
+class TokenExpiredError(InvalidTokenError):
+    """Token signature is valid but the token has expired."""
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def public_jwk(public_key, algorithm: str, kid: Optional[str]) -> dict:
+    """Builds the public JWK (RFC 7517) of an EC P-256 or Ed25519 key."""
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        jwk = {"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw)}
+    elif isinstance(public_key, ec.EllipticCurvePublicKey):
+        numbers = public_key.public_numbers()
+        jwk = {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64url(numbers.x.to_bytes(32, "big")),
+            "y": _b64url(numbers.y.to_bytes(32, "big")),
+        }
+    else:
+        raise ValueError(f"Unsupported public key type: {type(public_key).__name__}")
+    jwk.update({"use": "sig", "alg": algorithm})
+    if kid:
+        jwk["kid"] = kid
+    return jwk
+
+
+class TokenCodec:
+    """Signs and verifies JWT with key objects built once.
+
+    Uses PyJWT when it is installed, otherwise python-jose (no EdDSA). HMAC keys
+    come from ``SECRET_KEY_JWT``; ES256/EdDSA keys from PEM files, the public
+    part is published as JWKS so other services can verify tokens themselves.
+
+    Attributes:
+        algorithm: JWT algorithm.
+        backend: ``"pyjwt"`` or ``"jose"``.
+        kid: Key id put into the token header (asymmetric keys only).
+        jwk: Public JWK (None for HMAC).
+    """
+    def __init__(self, algorithm: str, secret: Optional[str] = None,
+                 private_pem: Optional[bytes] = None, public_pem: Optional[bytes] = None,
+                 kid: Optional[str] = None, backend: Optional[str] = None):
+        self.algorithm = algorithm
+        self.backend = backend or ("pyjwt" if pyjwt is not None else "jose")
+        self.kid = kid if algorithm in ASYMMETRIC_ALGORITHMS else None
+        self.jwk = None
+        self._headers = {"kid": self.kid} if self.kid else None
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            if not secret:
+                raise ValueError(f"SECRET_KEY_JWT is required for {algorithm}")
+            self._signing_key = self._verification_key = self._prepare_hmac(secret)
+            return
+
+        if algorithm == "EdDSA" and self.backend != "pyjwt":
+            raise ValueError("EdDSA requires PyJWT")
+        if not private_pem and not public_pem:
+            raise ValueError(f"{algorithm} requires JWT_PRIVATE_KEY_FILE or JWT_PUBLIC_KEY_FILE")
+
+        private_key = serialization.load_pem_private_key(private_pem, password=None) if private_pem else None
+        public_key = serialization.load_pem_public_key(public_pem) if public_pem else private_key.public_key()
+        self.jwk = public_jwk(public_key, algorithm, self.kid)
+
+        if self.backend == "pyjwt":
+            self._signing_key, self._verification_key = private_key, public_key
+        else:
+            self._signing_key = jose_jwk.construct(private_pem, algorithm) if private_key else None
+            self._verification_key = jose_jwk.construct(
+                public_key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo),
+                algorithm,
+            )
+
+    def _prepare_hmac(self, secret: str):
+        if self.backend == "pyjwt":
+            return secret
+        return jose_jwk.construct(secret, self.algorithm)
+
+    def encode(self, claims: dict) -> str:
+        if self._signing_key is None:
+            raise ValueError("Private key is not configured, tokens can only be verified")
+        if self.backend == "pyjwt":
+            return pyjwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=self._headers)
+        return jose_jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=self._headers)
+
+    def decode(self, token: str) -> dict:
+        """Verifies the signature and ``exp`` and returns the claims.
+
+        Raises:
+            TokenExpiredError: The token has expired.
+            InvalidTokenError: The token is invalid.
+        """
+        if self.backend == "pyjwt":
+            try:
+                return pyjwt.decode(token, self._verification_key, algorithms=[self.algorithm])
+            except pyjwt.ExpiredSignatureError as e:
+                raise TokenExpiredError(str(e)) from e
+            except pyjwt.InvalidTokenError as e:
+                raise InvalidTokenError(str(e)) from e
+        try:
+            return jose_jwt.decode(token, self._verification_key, algorithms=[self.algorithm])
+        except JoseExpiredSignatureError as e:
+            raise TokenExpiredError(str(e)) from e
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+    def jwks(self) -> dict:
+        return {"keys": [self.jwk] if self.jwk else []}
+
+
+def _read_file(path: Optional[str]) -> Optional[bytes]:
+    if not path:
+        return None
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@lru_cache(maxsize=8)
+def get_token_codec(algorithm: str, secret: Optional[str]) -> TokenCodec:
+    """Returns the codec for the current settings (keys are read and parsed once)."""
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        return TokenCodec(
+            algorithm,
+            private_pem=_read_file(JWT_PRIVATE_KEY_FILE),
+            public_pem=_read_file(JWT_PUBLIC_KEY_FILE),
+            kid=JWT_KEY_ID,
+        )
+    return TokenCodec(algorithm, secret=secret)
@@ -0,0 +1,156 @@
+import ipaddress
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import Request
+
+from config import (
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_WINDOW_SECONDS,
+    LOGIN_LIMIT_PER_LOGIN,
+    LOGIN_LIMIT_PER_IP,
+    REGISTER_LIMIT_PER_IP,
+    TRUSTED_PROXIES,
+)
+from .responses.http_errors import HTTPError
+from .utils import password_hash_pool
+
+
+class RateLimitBackend(ABC):
+    """Storage of token buckets.
+
+    The in-memory backend is per process. A shared backend (Redis, Postgres, ...)
+    implements ``take`` atomically and is installed with ``set_rate_limit_backend``.
+    """
+    @abstractmethod
+    async def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> Tuple[bool, float]:
+        """Takes ``cost`` tokens from the bucket ``key``.
+
+        Args:
+            key: Bucket key.
+            capacity: Bucket size (burst).
+            refill_per_second: Tokens added per second.
+            cost: Tokens to take.
+
+        Returns:
+            A Tuple[bool, float], whether the tokens were taken and seconds until they would be available.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Token buckets in a bounded LRU dict (the least recently used keys are dropped)."""
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+        return allowed, retry_after
+
+
+rate_limit_backend: RateLimitBackend = InMemoryRateLimitBackend()
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Replaces the backend of all limiters (e.g. with a shared one)."""
+    global rate_limit_backend
+    rate_limit_backend = backend
+
+
+class RateLimiter:
+    """Token-bucket limiter: ``limit`` requests per ``window`` seconds with bursts up to ``limit``.
+
+    Attributes:
+        name: Key prefix of the limiter.
+        limit: Bucket capacity.
+        window: Seconds needed to refill the whole bucket.
+        backend: Explicit backend (the module-level one is used if None).
+    """
+    def __init__(self, name: str, limit: int, window: float = RATE_LIMIT_WINDOW_SECONDS,
+                 backend: Optional[RateLimitBackend] = None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+
+    async def hit(self, key: str) -> None:
+        """Takes a token for ``key`` or raises 429."""
+        if self.limit <= 0:
+            return
+        backend = self.backend if self.backend is not None else rate_limit_backend
+        allowed, retry_after = await backend.take(f"{self.name}:{key}", self.limit, self.limit / self.window)
+        if not allowed:
+            raise HTTPError.too_many_requests_429(math.ceil(retry_after))
+
+
+login_ip_limiter = RateLimiter("login:ip", LOGIN_LIMIT_PER_IP)
+login_limiter = RateLimiter("login:login", LOGIN_LIMIT_PER_LOGIN)
+register_ip_limiter = RateLimiter("register:ip", REGISTER_LIMIT_PER_IP)
+
+
+# Адреса reverse proxy (nginx, сеть docker), чьим заголовкам X-Forwarded-For / X-Real-IP можно верить
+_TRUSTED_NETWORKS = tuple(ipaddress.ip_network(proxy, strict=False) for proxy in TRUSTED_PROXIES)
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _TRUSTED_NETWORKS)
+
+
+def client_ip(request: Request) -> str:
+    """Address of the client for the per-IP buckets.
+
+    Behind a reverse proxy every connection comes from the proxy, so the address is
+    taken from ``X-Forwarded-For`` (the rightmost hop that is not a trusted proxy) or
+    ``X-Real-IP`` - only when the connection itself comes from ``TRUSTED_PROXIES``.
+    Without the setting the headers are ignored: any client could forge them.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _TRUSTED_NETWORKS or not _is_trusted(peer):
+        return peer
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(forwarded):
+        if not _is_trusted(hop):
+            return hop
+    return request.headers.get("x-real-ip", "").strip() or (forwarded[0] if forwarded else peer)
+
+
+def check_hash_capacity() -> None:
+    """Fails fast (before the DB lookup) when the password hashing queue is full."""
+    if password_hash_pool.saturated:
+        password_hash_pool.rejected += 1
+        raise HTTPError.service_busy_503()
+
+
+async def check_login_limits(request: Request, login: str) -> None:
+    """Admission control for ``/auth/login``: per-IP and per-login buckets, then hash capacity."""
+    await login_ip_limiter.hit(client_ip(request))
+    await login_limiter.hit(login.lower())
+    check_hash_capacity()
+
+
+async def check_register_limits(request: Request) -> None:
+    """Admission control for ``/auth/register``: per-IP bucket, then hash capacity."""
+    await register_ip_limiter.hit(client_ip(request))
+    check_hash_capacity()
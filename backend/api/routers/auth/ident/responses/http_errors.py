@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
 from error import ErrorDetail
 
@@ -14,6 +16,8 @@ class IdentErrorCode:
         DATA_OUT_OF_DATE: The data is out of date.
         LOGIN_ALREADY_EXISTS: Login is already taken.
         REFRESH_TOKEN_IN_BLACK_LIST: Refresh_token in black list.
+        SERVICE_BUSY: Too many concurrent authentication requests.
+        TOO_MANY_REQUESTS: Rate limit exceeded.
     """
     BAD_CREDENTIALS = "BAD_CREDENTIALS"
     USER_NOT_ACTIVE = "USER_NOT_ACTIVE"
@@ -23,6 +27,8 @@ class IdentErrorCode:
     DATA_OUT_OF_DATE = "DATA_OUT_OF_DATE"
     LOGIN_ALREADY_EXISTS = "LOGIN_ALREADY_EXISTS"
     REFRESH_TOKEN_IN_BLACK_LIST = "REFRESH_TOKEN_IN_BLACK_LIST"
+    SERVICE_BUSY = "SERVICE_BUSY"
+    TOO_MANY_REQUESTS = "TOO_MANY_REQUESTS"
 
 
 class HTTPError:
@@ -38,7 +44,9 @@ class HTTPError:
         no_access_rights_403: No required access rights.
         data_out_of_date_403: User data is out of date, please re-login.
         login_already_exists_409: Login is already taken.
+        too_many_requests_429: Rate limit exceeded.
         endpoint_not_found_500: Endpoint not found.
+        service_busy_503: Too many concurrent authentication requests.
     """
     @staticmethod
     def bad_credentials_400():
@@ -130,6 +138,17 @@ class HTTPError:
             ).model_dump(),
         )
 
+    @staticmethod
+    def too_many_requests_429(retry_after: Optional[int] = None):
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ErrorDetail(
+                code=IdentErrorCode.TOO_MANY_REQUESTS,
+                reason="Too many attempts, try again later"
+            ).model_dump(),
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
+        )
+
     @staticmethod
     def endpoint_not_found_500():
         return HTTPException(
@@ -138,4 +157,14 @@ class HTTPError:
                 code=IdentErrorCode.ENDPOINT_NOT_FOUND,
                 reason="Endpoint not found"
             ).model_dump(),
+        )
+
+    @staticmethod
+    def service_busy_503():
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ErrorDetail(
+                code=IdentErrorCode.SERVICE_BUSY,
+                reason="Too many authentication requests, try again later"
+            ).model_dump(),
         )
\ No newline at end of file
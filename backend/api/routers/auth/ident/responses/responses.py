@@ -34,12 +34,24 @@ class IdentResponse:
         status.HTTP_409_CONFLICT: convert_to_example([
             HTTPError_auth.login_already_exists_409(),
         ]),
+        status.HTTP_429_TOO_MANY_REQUESTS: convert_to_example([
+            HTTPError_auth.too_many_requests_429(),
+        ]),
+        status.HTTP_503_SERVICE_UNAVAILABLE: convert_to_example([
+            HTTPError_auth.service_busy_503(),
+        ]),
     }
 
     login_post = {
         status.HTTP_400_BAD_REQUEST: convert_to_example([
             HTTPError_auth.bad_credentials_400(),
         ]),
+        status.HTTP_429_TOO_MANY_REQUESTS: convert_to_example([
+            HTTPError_auth.too_many_requests_429(),
+        ]),
+        status.HTTP_503_SERVICE_UNAVAILABLE: convert_to_example([
+            HTTPError_auth.service_busy_503(),
+        ]),
     }
 
     refresh_post = {
@@ -64,5 +76,8 @@ class IdentResponse:
             status.HTTP_404_NOT_FOUND: convert_to_example([
                 HTTPError_user.user_not_found_404(),
             ]),
+            status.HTTP_503_SERVICE_UNAVAILABLE: convert_to_example([
+                HTTPError_auth.service_busy_503(),
+            ]),
         }
     )
\ No newline at end of file
@@ -0,0 +1,85 @@
+import hashlib
+import math
+import time
+from typing import Dict, Iterable, Tuple
+
+from config import REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b digest).
+
+    Attributes:
+        size: Number of bits.
+        hash_count: Number of bit positions per key.
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationSet:
+    """Revoked token ids: a Bloom filter in front of an exact ``{jti: expires_at}`` map.
+
+    Lookups of tokens that were never revoked (the common case) are answered by the
+    filter alone. Expired entries are purged (and the filter rebuilt) when the map
+    outgrows the filter capacity.
+
+    Attributes:
+        capacity: Expected number of live revoked tokens.
+        error_rate: Target false-positive rate of the filter.
+    """
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._expires: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Marks ``jti`` as revoked until ``expires_at`` (unix time)."""
+        if expires_at <= time.time():
+            return
+        self._expires[jti] = expires_at
+        self._bloom.add(jti)
+        if len(self._expires) > self.capacity:
+            self.purge()
+
+    def update(self, items: Iterable[Tuple[str, float]]) -> None:
+        for jti, expires_at in items:
+            self.add(jti, expires_at)
+
+    def __contains__(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge(self) -> None:
+        """Drops expired entries and rebuilds the filter (grows it if still over capacity)."""
+        now = time.time()
+        self._expires = {jti: expires_at for jti, expires_at in self._expires.items() if expires_at > now}
+        self.capacity = max(self.capacity, 2 * len(self._expires))
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._expires:
+            self._bloom.add(jti)
+
+
+revoked_refresh_tokens = RevocationSet()
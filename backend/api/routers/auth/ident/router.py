@@ -1,17 +1,21 @@
 from fastapi import APIRouter, status, Response, Request, Depends
+from database import statement_timeout
 from utils import handle_catch_error
+from config import AUTH_STATEMENT_TIMEOUT_MS
 
 from .dependencies import get_current_user
+from .limiter import check_login_limits, check_register_limits
 from .schemas import UserRegister, UserLogin, Token, ChangePass
 from .responses.responses import IdentResponse, base_auth_responses
 from .responses.http_errors import HTTPError
-from .service import AuthRepository
+from .service import AuthRepository, RefreshTokenRepository, get_auth_repository, get_refresh_token_repository
 from .jwt import JWTService
 from ..user.schemas import UserInfo
-from ..user.service import UserRepository
+from ..user.service import UserRepository, get_user_repository
 
 
-router = APIRouter()
+# Точечные запросы авторизации: под нагрузкой лучше быстро отказать, чем держать соединение
+router = APIRouter(dependencies=[Depends(statement_timeout(AUTH_STATEMENT_TIMEOUT_MS))])
 
 
 @router.post(
@@ -24,8 +28,13 @@ router = APIRouter()
     responses=IdentResponse.register_post,
 )
 @handle_catch_error
-async def register_user(user: UserRegister) -> Response:
-    await UserRepository.create_user(user) # Default role -> User
+async def register_user(
+        request: Request,
+        user: UserRegister,
+        user_repo: UserRepository = Depends(get_user_repository),
+) -> Response:
+    await check_register_limits(request)
+    await user_repo.create_user(user) # Default role -> User
     return Response(status_code=status.HTTP_201_CREATED)
 
 
@@ -39,8 +48,14 @@ async def register_user(user: UserRegister) -> Response:
     responses=IdentResponse.login_post,
 )
 @handle_catch_error
-async def login_user(response: Response, user: UserLogin) -> Token:
-    check_user = await AuthRepository.authenticate_user(login=user.login, password=user.password)
+async def login_user(
+        request: Request,
+        response: Response,
+        user: UserLogin,
+        auth_repo: AuthRepository = Depends(get_auth_repository),
+) -> Token:
+    await check_login_limits(request, user.login)
+    check_user = await auth_repo.authenticate_user(login=user.login, password=user.password)
     if check_user is None:
         raise HTTPError.bad_credentials_400()
 
@@ -53,33 +68,48 @@ async def login_user(response: Response, user: UserLogin) -> Token:
 @router.post(
     path="/refresh_token",
     summary="Refresh access token",
-    description="Generates new access token using valid refresh token. Does not extend refresh token lifespan.",
+    description="Generates new access token using valid refresh token. Rotates refresh token (the old one is revoked).",
     response_description="Bearer Token (Access)",
     status_code=status.HTTP_200_OK,
     response_model=Token,
     responses=IdentResponse.refresh_post,
 )
 @handle_catch_error
-async def refresh_token_point(request: Request) -> Token:
+async def refresh_token_point(
+        request: Request,
+        response: Response,
+        user_repo: UserRepository = Depends(get_user_repository),
+        token_repo: RefreshTokenRepository = Depends(get_refresh_token_repository),
+) -> Token:
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPError.bad_credentials_401()
 
-    access_token = await JWTService.refresh_access_token(refresh_token=refresh_token)
+    access_token = await JWTService.refresh_access_token(
+        response=response, refresh_token=refresh_token, user_repo=user_repo, token_repo=token_repo
+    )
     return Token(access_token=access_token, token_type="Bearer")
 
 
 @router.post(
     path="/logout",
     summary="Logout, deleted refresh token (Cookie)",
-    description="Deleted refresh token (Cookie). Requires valid access token.",
+    description="Revokes and deletes refresh token (Cookie). Requires valid access token.",
     response_description="Empty response (status 200)",
     status_code=status.HTTP_200_OK,
     response_class=Response,
     responses=base_auth_responses,
 )
 @handle_catch_error
-async def logout(response: Response, user_current: UserInfo = Depends(get_current_user)) -> Response:
+async def logout(
+        request: Request,
+        response: Response,
+        user_current: UserInfo = Depends(get_current_user),
+        token_repo: RefreshTokenRepository = Depends(get_refresh_token_repository),
+) -> Response:
+    if refresh_token := request.cookies.get("refresh_token"):
+        await JWTService.revoke_refresh_token(refresh_token, token_repo)
+
     response.delete_cookie(
         key="refresh_token",
         path="/",
@@ -102,7 +132,18 @@ async def logout(response: Response, user_current: UserInfo = Depends(get_curren
 @handle_catch_error
 async def change_pass(
         user_data: ChangePass,
-        user_current: UserInfo = Depends(get_current_user)
+        user_current: UserInfo = Depends(get_current_user),
+        auth_repo: AuthRepository = Depends(get_auth_repository),
 ) -> Response:
-    await AuthRepository.update_pass_user(user_current.id, user_data)
-    return Response(status_code=status.HTTP_200_OK)
\ No newline at end of file
+    await auth_repo.update_pass_user(user_current.id, user_data)
+    return Response(status_code=status.HTTP_200_OK)
+
+@router.get(
+    path="/.well-known/jwks.json",
+    summary="Public signing keys (JWKS)",
+    description="Public keys for verifying access tokens without calling the API (ES256/EdDSA). Empty for HMAC algorithms.",
+    response_description="JWK Set",
+    status_code=status.HTTP_200_OK,
+)
+async def jwks() -> dict:
+    return JWTService.jwks()
@@ -1,17 +1,32 @@
+from datetime import datetime, timezone
 from typing import Optional
 
-from database import new_session
+from fastapi import Depends
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from tracing import trace_methods
+from logger import app_logger
+from .models import RevokedTokenOrm
+from .revocation import revoked_refresh_tokens
+from .cache import invalidate_after_commit
 from .schemas import ChangePass
-from .utils import verify_password, get_password_hash
+from .utils import verify_password_async, verify_and_update_password_async, get_password_hash_async
 from .responses.http_errors import HTTPError as HTTPError_auth
 from ..user.models import UserOrm
 from ..user.service import UserRepository
 from ..user.responses.http_errors import HTTPError as HTTPError_user
 
 
+@trace_methods
 class AuthRepository:
-    @classmethod
-    async def authenticate_user(cls, login: str, password: str) -> Optional[UserOrm]:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.users = UserRepository(session)
+
+    async def authenticate_user(self, login: str, password: str) -> Optional[UserOrm]:
         """Authenticates a user by login and password.
 
         Args:
@@ -21,22 +36,101 @@ class AuthRepository:
         Returns:
             A Optional[UserOrm], the user object if authentication is successful, otherwise None.
         """
-        user = await UserRepository.find_one_or_none_by_login(login)
-        if not user or verify_password(default_password=password, hashed_password=str(user.password)) is False:
+        user = await self.users.find_one_or_none_by_login(login)
+        # Завершаем читающую транзакцию: соединение возвращается в пул на время проверки пароля
+        await self.session.commit()
+        if not user:
+            return None
+        # Дальше нужен только снимок пользователя; откат неудачного перехэширования его не затронет
+        self.session.expunge(user)
+
+        verified, new_hash = await verify_and_update_password_async(
+            default_password=password, hashed_password=str(user.password)
+        )
+        if not verified:
             return None
+
+        if new_hash:
+            # Хэш со старой схемой/стоимостью — прозрачно перехэшируем, вход при ошибке не ломаем
+            try:
+                async with self.session.begin_nested():
+                    await self.users.update_password_hash(user.id, new_hash)
+                user.password = new_hash
+            except Exception as e:
+                app_logger.error("Password rehash failed for user %s: %s", user.id, e)
         return user
 
-    @classmethod
-    async def update_pass_user(cls, user_id: int, data: ChangePass) -> None:
-        async with new_session() as session:
-            user = await session.get(UserOrm, user_id)
-            if not user:
-                raise HTTPError_user.user_not_found_404()
+    async def update_pass_user(self, user_id: int, data: ChangePass) -> None:
+        user = await self.users.find_one_or_none_by_id(user_id)
+        await self.session.commit()
+        if not user:
+            raise HTTPError_user.user_not_found_404()
+
+        if not await verify_password_async(default_password=data.old_password, hashed_password=user.password):
+            raise HTTPError_auth.bad_credentials_400()
+
+        user.password = await get_password_hash_async(data.new_password)
+        invalidate_after_commit(self.session, user_id)
+
+
+@trace_methods
+class RefreshTokenRepository:
+    """Revocation of refresh tokens by jti.
+
+    ``revoked_refresh_tokens`` answers lookups in memory; Postgres keeps the revoked
+    ids until the tokens expire and makes revocation atomic across workers
+    (a jti can be revoked — i.e. a refresh token rotated — only once).
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def is_revoked(jti: str) -> bool:
+        return jti in revoked_refresh_tokens
+
+    async def revoke(self, jti: str, expires_at: int) -> bool:
+        """Revokes a refresh token.
+
+        Args:
+            jti: Token id.
+            expires_at: Token expiration (unix time).
+
+        Returns:
+            A bool, True if the token was revoked now, False if it had already been revoked.
+        """
+        result = await self.session.execute(
+            insert(RevokedTokenOrm)
+            .values(jti=jti, expires_at=datetime.fromtimestamp(expires_at, timezone.utc))
+            .on_conflict_do_nothing(index_elements=[RevokedTokenOrm.jti])
+            .returning(RevokedTokenOrm.jti)
+        )
+        revoked_now = result.scalar_one_or_none() is not None
+        # Отзыв фиксируем сразу, до выдачи нового токена
+        await self.session.commit()
+
+        revoked_refresh_tokens.add(jti, expires_at)
+        return revoked_now
+
+    async def load_revoked(self) -> int:
+        """Deletes expired rows and loads the live revoked ids into memory (on startup).
+
+        Returns:
+            A int, number of loaded ids.
+        """
+        await self.session.execute(delete(RevokedTokenOrm).where(RevokedTokenOrm.expires_at <= func.now()))
+        result = await self.session.execute(select(RevokedTokenOrm.jti, RevokedTokenOrm.expires_at))
+        rows = result.all()
+        await self.session.commit()
+
+        revoked_refresh_tokens.update((row.jti, row.expires_at.timestamp()) for row in rows)
+        return len(rows)
+
 
-            if not verify_password(default_password=data.old_password, hashed_password=user.password):
-                raise HTTPError_auth.bad_credentials_400()
+def get_auth_repository(db: AsyncSession = Depends(get_db)) -> AuthRepository:
+    """ Dependency для FastAPI """
+    return AuthRepository(db)
 
-            user.password = get_password_hash(data.new_password)
 
-            session.add(user)
-            await session.commit()
\ No newline at end of file
+def get_refresh_token_repository(db: AsyncSession = Depends(get_db)) -> RefreshTokenRepository:
+    """ Dependency для FastAPI """
+    return RefreshTokenRepository(db)
@@ -1,7 +1,78 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
 from passlib.context import CryptContext
 
+from config import (
+    PASSWORD_HASH_SCHEMES,
+    BCRYPT_ROUNDS,
+    ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+)
+from .responses.http_errors import HTTPError
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_crypt_context(
+        schemes: List[str] = PASSWORD_HASH_SCHEMES,
+        bcrypt_rounds: int = BCRYPT_ROUNDS,
+        argon2_time_cost: int = ARGON2_TIME_COST,
+        argon2_memory_cost: int = ARGON2_MEMORY_COST,
+        argon2_parallelism: int = ARGON2_PARALLELISM,
+) -> CryptContext:
+    """Creates the password context from the hashing settings.
+
+    The first scheme hashes new passwords, the others are only verified and marked
+    deprecated. Cost parameters are pinned (min = max = default), so hashes made with
+    other parameters need an update and are rehashed on the next successful login.
+
+    Args:
+        schemes: Enabled schemes (``argon2`` requires ``argon2-cffi``).
+        bcrypt_rounds: bcrypt cost (log2 of iterations).
+        argon2_time_cost: argon2 iterations.
+        argon2_memory_cost: argon2 memory in KiB.
+        argon2_parallelism: argon2 lanes.
+
+    Returns:
+        A CryptContext, context for hashing and verification.
+    """
+    settings = {}
+    if "bcrypt" in schemes:
+        settings.update(bcrypt__default_rounds=bcrypt_rounds, bcrypt__min_rounds=bcrypt_rounds,
+                        bcrypt__max_rounds=bcrypt_rounds)
+    if "argon2" in schemes:
+        settings.update(argon2__time_cost=argon2_time_cost, argon2__memory_cost=argon2_memory_cost,
+                        argon2__parallelism=argon2_parallelism)
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+def check_password_backends(context: Optional[CryptContext] = None) -> None:
+    """Fails fast when an enabled scheme has no installed backend (``argon2`` without ``argon2-cffi``).
+
+    Without the check the missing backend surfaces as ``MissingBackendError`` on the first
+    registration or login.
+
+    Args:
+        context: Context to check, ``pwd_context`` by default.
+
+    Raises:
+        RuntimeError: Some schemes cannot hash or verify passwords.
+    """
+    context = context or pwd_context
+    missing = []
+    for scheme in context.schemes():
+        handler = context.handler(scheme)
+        if hasattr(handler, "has_backend") and not handler.has_backend():
+            missing.append(scheme)
+    if missing:
+        raise RuntimeError(f"No backend installed for password hash schemes {missing} (PASSWORD_HASH_SCHEMES)")
+
+
+pwd_context = build_crypt_context()
 
 
 def get_password_hash(password: str) -> str:
@@ -26,4 +97,127 @@ def verify_password(default_password: str, hashed_password: str) -> bool:
     Returns:
         A bool, if password success verified True, else False.
     """
-    return pwd_context.verify(default_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(default_password, hashed_password)
+
+
+def verify_and_update_password(default_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifies password and rehashes it if the hash uses outdated scheme or cost.
+
+    Args:
+        default_password (str): Password to check.
+        hashed_password (str): Hashed password.
+
+    Returns:
+        A Tuple[bool, Optional[str]], verification result and the new hash (None if the hash is up to date).
+    """
+    return pwd_context.verify_and_update(default_password, hashed_password)
+
+
+class PasswordHashPool:
+    """Bounded thread pool for password hashing off the event loop.
+
+    bcrypt releases the GIL while hashing, so worker threads hash in parallel.
+    At most ``max_workers`` hashes run at once and at most ``max_pending`` more
+    wait in the queue; beyond that requests are rejected with 503 (back-pressure).
+
+    Attributes:
+        max_workers: Number of hashing threads.
+        max_pending: Maximum number of queued (not yet running) hashes.
+        in_flight: Hashes submitted and not finished (running + queued).
+        peak_in_flight: Maximum ``in_flight`` observed.
+        completed: Number of finished hashes.
+        rejected: Number of hashes rejected because the queue was full.
+        wait_seconds: Total time hashes spent in the queue.
+        run_seconds: Total time spent hashing.
+    """
+    def __init__(self, max_workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running(self) -> int:
+        return min(self.in_flight, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        return max(self.in_flight - self.max_workers, 0)
+
+    @property
+    def saturated(self) -> bool:
+        return self.queued >= self.max_pending
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queued,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self.run_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs ``func(*args)`` on the pool.
+
+        Returns:
+            A Any, result of ``func``.
+        """
+        if self.saturated:
+            self.rejected += 1
+            raise HTTPError.service_busy_503()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+
+        submitted = time.perf_counter()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._timed, func, args
+            )
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.wait_seconds += started - submitted
+        self.run_seconds += finished - started
+        return result
+
+    @staticmethod
+    def _timed(func: Callable[..., Any], args: tuple) -> tuple:
+        started = time.perf_counter()
+        result = func(*args)
+        return result, started, time.perf_counter()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Async version of ``get_password_hash`` (runs on ``password_hash_pool``)."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(default_password: str, hashed_password: str) -> bool:
+    """Async version of ``verify_password`` (runs on ``password_hash_pool``)."""
+    return await password_hash_pool.run(verify_password, default_password, hashed_password)
+
+
+async def verify_and_update_password_async(default_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Async version of ``verify_and_update_password`` (runs on ``password_hash_pool``)."""
+    return await password_hash_pool.run(verify_and_update_password, default_password, hashed_password)
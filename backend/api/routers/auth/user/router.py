@@ -2,7 +2,7 @@ from fastapi import APIRouter, status, Response, Depends
 from utils import handle_catch_error
 from .roles import UserRole
 from .schemas import UserInfo, AboutMeCreate, UserRoleResponse, UserPrint
-from .service import UserRepository
+from .service import UserRepository, get_user_repository
 from ..ident.dependencies import get_current_user, require_roles
 from .responses.responses import UserResponse
 
@@ -35,9 +35,10 @@ async def get_me(user_current: UserInfo = Depends(get_current_user)) -> UserPrin
 @handle_catch_error
 async def update_about_me(
         data: AboutMeCreate,
-        current_user: UserInfo = Depends(require_roles([UserRole.admin, UserRole.manager, UserRole.user]))
+        current_user: UserInfo = Depends(require_roles([UserRole.admin, UserRole.manager, UserRole.user])),
+        user_repo: UserRepository = Depends(get_user_repository),
 ) -> Response:
-    await UserRepository.update_aboutme(current_user.id, data)
+    await user_repo.update_aboutme(current_user.id, data)
     return Response(status_code=status.HTTP_200_OK)
 
 
@@ -1,30 +1,32 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import select
+from fastapi import Depends
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import new_session
+from database import get_db
+from tracing import trace_methods
 from logger import app_logger
 from .models import UserOrm
 from .responses.http_errors import HTTPError as HTTPError_user
 from .roles import UserRole
 from .schemas import UserUpdate, AboutMeCreate
+from ..ident.cache import invalidate_after_commit
 from ..ident.responses.http_errors import HTTPError as HTTPError_auth
 from ..ident.schemas import UserRegister
-from ..ident.utils import get_password_hash
+from ..ident.utils import get_password_hash_async
 
 
+@trace_methods
 class UserRepository:
-    @classmethod
-    async def find_one_or_none_by_id(cls, id_user: int) -> Optional[UserOrm]:
-        async with new_session() as session:
-            user = await session.get(UserOrm, id_user)
-            if user:
-                return user
-            return None
-
-    @classmethod
-    async def find_one_or_none_by_login(cls, login: str) -> Optional[UserOrm]:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def find_one_or_none_by_id(self, id_user: int) -> Optional[UserOrm]:
+        return await self.session.get(UserOrm, id_user)
+
+    async def find_one_or_none_by_login(self, login: str) -> Optional[UserOrm]:
         """Finds a user by login.
 
         Args:
@@ -33,13 +35,10 @@ class UserRepository:
         Returns:
             A Optional[UsersOrm], the user object if found, otherwise None.
         """
-        async with new_session() as session:
-            result = await session.execute(select(UserOrm).where(UserOrm.login == login))
-            user = result.scalar_one_or_none()
-            return user
+        result = await self.session.execute(select(UserOrm).where(UserOrm.login == login))
+        return result.scalar_one_or_none()
 
-    @classmethod
-    async def create_user(cls, data: UserRegister, role: UserRole = UserRole.user) -> Optional[str]:
+    async def create_user(self, data: UserRegister, role: UserRole = UserRole.user) -> Optional[str]:
         """Create user.
 
         Args:
@@ -49,55 +48,55 @@ class UserRepository:
         Returns:
             A Optional[str], login of the created user on success, otherwise None.
         """
-        async with new_session() as session:
-            try:
-                user = UserOrm(
-                    login=data.login,
-                    password=get_password_hash(data.password),
-                    role=role,
-                    create_date=datetime.now()
-                )
-
-                session.add(user)
-                await session.flush()
-                await session.commit()
-                return user.login
-            except IntegrityError:
-                await session.rollback()
-                raise HTTPError_auth.login_already_exists_409()
-
-    @classmethod
-    async def update_user(cls, user_data: UserUpdate, id_user: int):
-        async with new_session() as session:
-            try:
-                user = await cls.find_one_or_none_by_id(id_user)
-                if not user:
-                    raise HTTPError_user.user_not_found_404()
-
-                for field, value in user_data.model_dump(exclude_unset=True).items():
-                    if field == "password":
-                        value = get_password_hash(value)
+        # Хэшируем до обращения к БД, чтобы не держать соединение во время bcrypt
+        hashed_password = await get_password_hash_async(data.password)
+        user = UserOrm(
+            login=data.login,
+            password=hashed_password,
+            role=role,
+            create_date=datetime.now()
+        )
+        try:
+            # SAVEPOINT: при занятом логине откатывается только эта вставка, а не вся транзакция запроса
+            async with self.session.begin_nested():
+                self.session.add(user)
+        except IntegrityError:
+            raise HTTPError_auth.login_already_exists_409()
+        return user.login
+
+    async def update_user(self, user_data: UserUpdate, id_user: int):
+        values = user_data.model_dump(exclude_unset=True)
+        if "password" in values:
+            values["password"] = await get_password_hash_async(values["password"])
+
+        user = await self.find_one_or_none_by_id(id_user)
+        if not user:
+            raise HTTPError_user.user_not_found_404()
+
+        try:
+            async with self.session.begin_nested():
+                for field, value in values.items():
                     setattr(user, field, value)
-
                 user.update_time = datetime.now()
+        except IntegrityError:
+            raise HTTPError_auth.login_already_exists_409()
+        invalidate_after_commit(self.session, id_user)
+
+    async def update_aboutme(self, user_id: int, data: AboutMeCreate):
+        user = await self.find_one_or_none_by_id(user_id)
+        if not user:
+            raise HTTPError_user.user_not_found_404()
+
+        # Обновляем информацию
+        user.about_me = data.about_me
+        invalidate_after_commit(self.session, user_id)
+
+    async def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        """Stores a rehashed password (same password, new scheme or cost)."""
+        await self.session.execute(update(UserOrm).where(UserOrm.id == user_id).values(password=hashed_password))
+        invalidate_after_commit(self.session, user_id)
+
 
-                session.add(user)
-                await session.commit()
-            except IntegrityError:
-                await session.rollback()
-                raise HTTPError_auth.login_already_exists_409()
-
-    @classmethod
-    async def update_aboutme(cls, user_id: int, data: AboutMeCreate):
-        async with new_session() as session:
-            result = await session.execute(
-                select(UserOrm).where(UserOrm.id == user_id)
-            )
-            user = result.scalar_one_or_none()
-
-            if not user:
-                raise HTTPError_user.user_not_found_404()
-
-            # Обновляем информацию
-            user.about_me = data.about_me
-            await session.commit()
\ No newline at end of file
+def get_user_repository(db: AsyncSession = Depends(get_db)) -> UserRepository:
+    """ Dependency для FastAPI """
+    return UserRepository(db)
@@ -3,7 +3,7 @@ from typing import List, Union
 
 from logger import app_logger
 from .schemas import EducationResponse, EducationCreate, EducationUpdate
-from .service import EducationRepository, get_education_repository
+from .service import EducationRepository, get_education_repository, get_education_read_repository
 from ..auth.ident.dependencies import get_current_user
 from ..auth.user.roles import UserRole
 from ..auth.user.schemas import UserInfo
@@ -45,7 +45,7 @@ router = APIRouter()
 )
 async def get_all_education_for_user(
         user_id: int,
-        education_repository: EducationRepository = Depends(get_education_repository),
+        education_repository: EducationRepository = Depends(get_education_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[EducationResponse]:
     try:
@@ -62,7 +62,7 @@ async def get_all_education_for_user(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -77,7 +77,7 @@ async def get_all_education_for_user(
 async def get_education(
         education_id: int,
         user_id: int,
-        education_repository: EducationRepository = Depends(get_education_repository),
+        education_repository: EducationRepository = Depends(get_education_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> Union[EducationResponse, List]:
     try:
@@ -93,7 +93,7 @@ async def get_education(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -122,7 +122,7 @@ async def add_education(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -152,7 +152,7 @@ async def update_education_endpoint(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -181,5 +181,5 @@ async def delete_education_endpoint(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -4,12 +4,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status, Depends
 
-from database import get_db
+from database import get_db, get_read_db
+from tracing import trace_methods
 from .models import Education
 from .schemas import EducationCreate, EducationUpdate, EducationResponse
 from routers.auth.user.models import UserOrm
 
 
+@trace_methods
 class EducationRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -54,7 +56,7 @@ class EducationRepository:
             # Создаем и сохраняем запись
             db_education = Education(id_user=user_id, **education_data)
             self.session.add(db_education)
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(db_education)
 
             # Проверяем, что ID был получен
@@ -90,7 +92,7 @@ class EducationRepository:
         for field, value in update_data.items():
             setattr(educ, field, value)
 
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(educ)
         return EducationResponse.model_validate(educ)
 
@@ -103,9 +105,14 @@ class EducationRepository:
             )
 
         await self.session.delete(db_education)
-        await self.session.commit()
+        await self.session.flush()
 
 
 def get_education_repository(db: AsyncSession = Depends(get_db)) -> EducationRepository:
     """ Dependency для FastAPI """
-    return EducationRepository(db)
\ No newline at end of file
+    return EducationRepository(db)
+
+
+def get_education_read_repository(db: AsyncSession = Depends(get_read_db)) -> EducationRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return EducationRepository(db)
@@ -2,7 +2,7 @@ from typing import List, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 
 from logger import app_logger
-from .service import get_experience_repository, ExperienceRepository
+from .service import get_experience_repository, ExperienceRepository, get_experience_read_repository
 from .schemas import ExperienceResponse, ExperienceUpdate, ExperienceCreate
 from ..auth.user.roles import UserRole
 from ..auth.user.schemas import UserInfo
@@ -45,7 +45,7 @@ router = APIRouter()
 )
 async def get_user_experiences(
         user_id: int,
-        experience_repo: ExperienceRepository = Depends(get_experience_repository),
+        experience_repo: ExperienceRepository = Depends(get_experience_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[ExperienceResponse]:
     try:
@@ -62,7 +62,7 @@ async def get_user_experiences(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -77,7 +77,7 @@ async def get_user_experiences(
 async def get_experience(
         experience_id: int,
         user_id: int,
-        experience_repo: ExperienceRepository = Depends(get_experience_repository),
+        experience_repo: ExperienceRepository = Depends(get_experience_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> Union[ExperienceResponse, List]:
     try:
@@ -94,7 +94,7 @@ async def get_experience(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -116,7 +116,7 @@ async def add_experience_for_user(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -148,7 +148,7 @@ async def add_experience_for_self(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -181,7 +181,7 @@ async def update_experience(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -209,5 +209,5 @@ async def delete_experience(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
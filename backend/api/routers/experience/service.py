@@ -5,9 +5,11 @@ from sqlalchemy import select
 from fastapi import HTTPException, status, Depends
 from .models import WorkExperience
 from .schemas import ExperienceUpdate, ExperienceCreate, ExperienceResponse
-from database import get_db
+from database import get_db, get_read_db
+from tracing import trace_methods
 
 
+@trace_methods
 class ExperienceRepository:
     def __init__(self, session: AsyncSession = Depends(get_db)):
         self.session = session
@@ -24,7 +26,7 @@ class ExperienceRepository:
                 **experience_dict
             )
             self.session.add(experience)
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(experience)
             return ExperienceResponse.model_validate(experience)
         except Exception as e:
@@ -68,7 +70,7 @@ class ExperienceRepository:
             for key, value in update_data.items():
                 setattr(experience, key, value)
 
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(experience)
             return ExperienceResponse.model_validate(experience)
         except Exception as e:
@@ -89,7 +91,7 @@ class ExperienceRepository:
                 )
 
             await self.session.delete(experience)
-            await self.session.commit()
+            await self.session.flush()
         except Exception as e:
             await self.session.rollback()
             raise HTTPException(
@@ -99,4 +101,9 @@ class ExperienceRepository:
 
 def get_experience_repository(db: AsyncSession = Depends(get_db)) -> ExperienceRepository:
     """ Dependency для FastAPI """
-    return ExperienceRepository(db)
\ No newline at end of file
+    return ExperienceRepository(db)
+
+
+def get_experience_read_repository(db: AsyncSession = Depends(get_read_db)) -> ExperienceRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return ExperienceRepository(db)
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response
 
 from logger import app_logger
 from .schemas import WantedProfessionCreate, WantedProfessionRead
-from .service import get_for_myself_repository, ForMyselfRepository
+from .service import get_for_myself_repository, ForMyselfRepository, get_for_myself_read_repository
 from ..auth.ident.dependencies import get_current_user
 from ..auth.user.roles import UserRole
 from ..auth.user.schemas import UserInfo
@@ -22,7 +22,7 @@ router = APIRouter()
 )
 async def get_wanted_profession(
         user_id: int,
-        for_myself_repo: ForMyselfRepository = Depends(get_for_myself_repository),
+        for_myself_repo: ForMyselfRepository = Depends(get_for_myself_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[WantedProfessionRead]:
     try:
@@ -39,7 +39,7 @@ async def get_wanted_profession(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -62,5 +62,5 @@ async def add_wanted_profession(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
@@ -6,12 +6,14 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 
-from database import get_db
+from database import get_db, get_read_db
+from tracing import trace_methods
 from logger import app_logger
 from routers.for_myself.models import WantedProfession
 from routers.for_myself.schemas import WantedProfessionCreate
 
 
+@trace_methods
 class ForMyselfRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -36,7 +38,7 @@ class ForMyselfRepository:
             ]
 
             self.session.add_all(professions)
-            await self.session.commit()
+            await self.session.flush()
         except IntegrityError:
             await self.session.rollback()
             raise HTTPException(
@@ -47,4 +49,9 @@ class ForMyselfRepository:
 
 def get_for_myself_repository(db: AsyncSession = Depends(get_db)) -> ForMyselfRepository:
     """ Dependency для FastAPI """
-    return ForMyselfRepository(db)
\ No newline at end of file
+    return ForMyselfRepository(db)
+
+
+def get_for_myself_read_repository(db: AsyncSession = Depends(get_read_db)) -> ForMyselfRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return ForMyselfRepository(db)
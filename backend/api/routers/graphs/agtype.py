@@ -0,0 +1,73 @@
+"""Decoding of Apache AGE ``agtype`` text values.
+
+AGE prints graph values as JSON with type annotations appended to composite and
+numeric values, e.g. ``{"id": 1, ...}::vertex``, ``[{...}::vertex, {...}::edge, {...}::vertex]::path``
+or ``1.5::numeric``. The annotations are removed in a single pass (only outside
+string literals) and the rest is decoded with ``orjson`` when it is installed.
+
+``database/graphs/agtype.py`` is a copy for the graph scripts (their image does
+not contain the API): keep the two in sync.
+"""
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+ANNOTATIONS = frozenset(("vertex", "edge", "path", "numeric"))
+
+# Строковый литерал (оставляем как есть) или аннотация типа вне строки (вырезаем)
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|::[A-Za-z_]+')
+
+
+_loads_json = json.loads
+
+
+def _loads_orjson(value: str) -> Any:
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        # NaN / Infinity, которые orjson не принимает
+        return json.loads(value)
+
+
+loads = _loads_orjson if orjson is not None else _loads_json
+
+
+def _strip_token(match: re.Match) -> str:
+    token = match.group()
+    return token if token[0] == '"' else ""
+
+
+def strip_annotations(value: str) -> str:
+    """Removes every ``::type`` annotation that is not inside a string literal."""
+    if "::" not in value:
+        return value
+
+    # Частый случай: одна аннотация в конце (вершина, ребро, число)
+    head, _, suffix = value.rpartition("::")
+    if suffix in ANNOTATIONS and "::" not in head:
+        return head
+    return _TOKEN_RE.sub(_strip_token, value)
+
+
+def decode_agtype(value: Any) -> Any:
+    """Decodes an agtype text value into Python objects.
+
+    Args:
+        value: Raw value returned by the driver. Non-string values are returned unchanged.
+
+    Returns:
+        A Any, decoded JSON value, or the value without annotations if it is not valid JSON.
+    """
+    if not isinstance(value, str):
+        return value
+    value = strip_annotations(value)
+    try:
+        return loads(value)
+    except ValueError:
+        return value
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncpg
+
+from config import GRAPH_CACHE_SIZE, GRAPH_CACHE_VERSION_TTL_SECONDS
+from logger import app_logger
+
+
+class GraphCache:
+    """In-process LRU cache of compiled profession graphs.
+
+    Every entry remembers the ``graph_version`` stamp of its profession at load time.
+    The stamps are re-read from Postgres at most once per ``version_ttl`` seconds
+    (one query for all professions), so steady-state lookups never touch the graph.
+    ``deploy_db.py`` bumps the stamp of every profession it (re)imports.
+
+    Attributes:
+        max_size: Maximum number of professions kept in the cache.
+        version_ttl: How long (seconds) the known version stamps are trusted.
+        hits: Number of lookups served from the cache.
+        misses: Number of lookups that had to load the graph.
+    """
+    VERSIONS_QUERY = "SELECT profession_id, version FROM graph_version"
+
+    def __init__(self, max_size: int = GRAPH_CACHE_SIZE, version_ttl: float = GRAPH_CACHE_VERSION_TTL_SECONDS):
+        self.max_size = max_size
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, tuple[int, Any]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._versions_checked_at: Optional[float] = None
+        self._versions_lock = asyncio.Lock()
+        self._inflight: Dict[int, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def version_of(self, profession_id: int) -> int:
+        return self._versions.get(profession_id, 0)
+
+    async def refresh_versions(self, pool: asyncpg.Pool, force: bool = False) -> None:
+        """Re-reads version stamps if the known ones are older than ``version_ttl``.
+
+        Args:
+            pool: Pool used to read the ``graph_version`` table.
+            force: Ignore the TTL and always re-read.
+        """
+        if not force and not self._versions_stale():
+            return
+
+        async with self._versions_lock:
+            if not force and not self._versions_stale():
+                return
+            try:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch(self.VERSIONS_QUERY)
+                versions = {row["profession_id"]: row["version"] for row in rows}
+            except asyncpg.UndefinedTableError:
+                # Граф ещё ни разу не деплоился скриптом — версии нулевые
+                versions = {}
+            except Exception as e:
+                app_logger.error("Graph version check failed: %s", e)
+                return
+
+            self.apply_versions(versions)
+            self._versions_checked_at = time.monotonic()
+
+    def apply_versions(self, versions: Dict[int, int]) -> None:
+        """Stores new version stamps and drops entries whose stamp has changed."""
+        self._versions = versions
+        for profession_id in [pid for pid, (version, _) in self._entries.items() if version != self.version_of(pid)]:
+            del self._entries[profession_id]
+
+    def get(self, profession_id: int) -> Optional[Any]:
+        entry = self._entries.get(profession_id)
+        if entry is None or entry[0] != self.version_of(profession_id):
+            return None
+        self._entries.move_to_end(profession_id)
+        return entry[1]
+
+    def put(self, profession_id: int, version: int, value: Any) -> None:
+        self._entries[profession_id] = (version, value)
+        self._entries.move_to_end(profession_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, profession_id: Optional[int] = None) -> None:
+        """Drops one profession (or everything) from the cache."""
+        if profession_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(profession_id, None)
+
+    async def get_or_load(self, pool: asyncpg.Pool, profession_id: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached graph of a profession, loading it on a miss.
+
+        Concurrent misses for the same profession share a single load.
+
+        Args:
+            pool: Pool used for the version check.
+            profession_id: Profession id.
+            loader: Coroutine factory that reads the graph from the database.
+
+        Returns:
+            A Any, value produced by ``loader``.
+        """
+        await self.refresh_versions(pool)
+
+        value = self.get(profession_id)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        if (inflight := self._inflight.get(profession_id)) is not None:
+            return await asyncio.shield(inflight)
+
+        version = self.version_of(profession_id)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[profession_id] = future
+        try:
+            value = await loader()
+            self.put(profession_id, version, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже проброшено вызывающему — не оставляем его «не полученным»
+            future.exception()
+            raise
+        finally:
+            del self._inflight[profession_id]
+
+    def _versions_stale(self) -> bool:
+        return (
+            self._versions_checked_at is None
+            or time.monotonic() - self._versions_checked_at >= self.version_ttl
+        )
+
+
+graph_cache = GraphCache()
@@ -0,0 +1,161 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .tree import CompiledProfessionTree, NO_PARENT, NO_SKILL
+
+
+class CohortOverlay:
+    """Skill-gap overlay of many users against one profession, computed with NumPy.
+
+    The profession is flattened into a skill vector (one column per Skill slot of the
+    compiled tree) and the users' proficiencies into a ``users x skills`` matrix.
+    Missing ``user_skills`` rows are the gray zone.
+
+    Attributes:
+        user_ids: Sorted user ids (matrix rows).
+        skill_ids: skill_id per column.
+        required: Required level per column.
+        category_names: Category names (rollup columns).
+        category_of_skill: Category index per column.
+        proficiency: ``users x skills`` proficiency matrix.
+        has_skill: ``users x skills`` mask of existing user_skills rows.
+    """
+    def __init__(self, tree: CompiledProfessionTree, user_ids: Iterable[int], rows: Iterable[Tuple[int, int, int]]):
+        """
+        Args:
+            tree: Compiled profession tree.
+            user_ids: Users of the cohort.
+            rows: ``(id_user, id_skill, proficiency)`` rows from ``user_skills``.
+        """
+        self.user_ids = np.unique(np.fromiter(user_ids, dtype=np.int64))
+        slots = [slot for slot in tree.skill_slots if tree.skill_ids[slot] != NO_SKILL]
+        self.skill_ids = np.array([tree.skill_ids[slot] for slot in slots], dtype=np.int64)
+        self.required = np.array([tree.values[slot] or 0 for slot in slots], dtype=np.float64)
+        self.category_names, self.category_of_skill = self._categorize(tree, slots)
+
+        self.proficiency = np.zeros((len(self.user_ids), len(slots)), dtype=np.float64)
+        self.has_skill = np.zeros((len(self.user_ids), len(slots)), dtype=bool)
+        self._fill(rows)
+
+    @staticmethod
+    def _categorize(tree: CompiledProfessionTree, slots: Sequence[int]) -> Tuple[List[str], np.ndarray]:
+        """Maps every skill slot to its nearest Category ancestor (or the profession)."""
+        names: List[str] = []
+        index: Dict[str, int] = {}
+        category_of_skill = np.empty(len(slots), dtype=np.int64)
+        for column, slot in enumerate(slots):
+            parent = tree.parents[slot]
+            while parent != NO_PARENT and tree.labels[parent] != "Category" and tree.parents[parent] != NO_PARENT:
+                parent = tree.parents[parent]
+            name = tree.names[parent] if parent != NO_PARENT else tree.names[slot]
+            if name not in index:
+                index[name] = len(names)
+                names.append(name)
+            category_of_skill[column] = index[name]
+        return names, category_of_skill
+
+    def _fill(self, rows: Iterable[Tuple[int, int, int]]) -> None:
+        data = np.array(list(rows), dtype=np.int64).reshape(-1, 3)
+        if not len(data) or not len(self.skill_ids) or not len(self.user_ids):
+            return
+
+        # Колонки навыка: один skill_id может встречаться в нескольких категориях
+        order = np.argsort(self.skill_ids, kind="stable")
+        sorted_ids = self.skill_ids[order]
+        user_pos = np.searchsorted(self.user_ids, data[:, 0])
+        known_user = (user_pos < len(self.user_ids)) & (self.user_ids[np.minimum(user_pos, len(self.user_ids) - 1)] == data[:, 0])
+
+        left = np.searchsorted(sorted_ids, data[:, 1], side="left")
+        right = np.searchsorted(sorted_ids, data[:, 1], side="right")
+        repeats = np.where(known_user, right - left, 0)
+        if not repeats.sum():
+            return
+
+        row_idx = np.repeat(user_pos, repeats)
+        starts = np.repeat(left, repeats)
+        within = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        col_idx = order[starts + within]
+
+        self.proficiency[row_idx, col_idx] = np.repeat(data[:, 2], repeats)
+        self.has_skill[row_idx, col_idx] = True
+
+    @property
+    def capped(self) -> np.ndarray:
+        """Proficiency capped at the required level (progress that counts)."""
+        return np.minimum(self.proficiency, self.required)
+
+    def user_percent(self) -> np.ndarray:
+        """Percent complete per user, weighted by the required level of every skill."""
+        total = self.required.sum()
+        if not total:
+            return np.zeros(len(self.user_ids))
+        return np.round(self.capped.sum(axis=1) / total * 100, 2)
+
+    def user_gray_zone(self) -> np.ndarray:
+        """Number of profession skills the user has not started."""
+        return (~self.has_skill).sum(axis=1)
+
+    def user_category_percent(self) -> np.ndarray:
+        """``users x categories`` percent complete."""
+        membership = np.zeros((len(self.skill_ids), len(self.category_names)))
+        membership[np.arange(len(self.skill_ids)), self.category_of_skill] = 1
+        required = self.required @ membership
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = np.where(required > 0, (self.capped @ membership) / required * 100, 0)
+        return np.round(percent, 2)
+
+    def category_rollups(self) -> List[dict]:
+        per_user = self.user_category_percent()
+        rollups = []
+        for index, name in enumerate(self.category_names):
+            columns = self.category_of_skill == index
+            rollups.append({
+                "name": name,
+                "skills": int(columns.sum()),
+                "percent": round(float(per_user[:, index].mean()), 2) if len(self.user_ids) else 0.0,
+                "gray_zone": round(float((~self.has_skill[:, columns]).mean()), 4) if len(self.user_ids) else 0.0,
+            })
+        return rollups
+
+    def aggregates(self) -> dict:
+        percent = self.user_percent()
+        gray_zone = self.user_gray_zone()
+        if not len(self.user_ids):
+            percent = gray_zone = np.zeros(1)
+        return {
+            "users": int(len(self.user_ids)),
+            "skills": int(len(self.skill_ids)),
+            "percent_mean": round(float(percent.mean()), 2),
+            "percent_median": round(float(np.median(percent)), 2),
+            "percent_min": round(float(percent.min()), 2),
+            "percent_max": round(float(percent.max()), 2),
+            "gray_zone_mean": round(float(gray_zone.mean()), 2),
+            "complete_users": int((percent >= 100).sum()) if len(self.user_ids) else 0,
+        }
+
+    def user_rows(self, offset: int = 0, limit: int = 100) -> List[dict]:
+        """Per-user rows ordered by user id, sliced for pagination."""
+        page = slice(offset, offset + limit)
+        percent = self.user_percent()[page]
+        gray_zone = self.user_gray_zone()[page]
+        categories = self.user_category_percent()[page]
+        return [
+            {
+                "user_id": int(user_id),
+                "percent": float(percent[i]),
+                "gray_zone": int(gray_zone[i]),
+                "categories": {name: float(categories[i, j]) for j, name in enumerate(self.category_names)},
+            }
+            for i, user_id in enumerate(self.user_ids[page])
+        ]
+
+    def export(self, offset: int = 0, limit: int = 100) -> dict:
+        return {
+            "aggregates": self.aggregates(),
+            "categories": self.category_rollups(),
+            "users": self.user_rows(offset, limit),
+            "total": int(len(self.user_ids)),
+            "offset": offset,
+            "limit": limit,
+        }
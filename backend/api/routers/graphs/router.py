@@ -1,16 +1,20 @@
 import json
-from typing import Any, AnyStr
+from typing import Any, AnyStr, List, Optional
 
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from database import get_read_db
 from logger import app_logger
-from routers.auth.ident.dependencies import get_current_user
+from tracing import tracer
+from routers.auth.ident.dependencies import get_current_user, require_roles
+from routers.auth.user.roles import UserRole
 from routers.auth.user.schemas import UserInfo
-from .schemas import SkillsProfForGanttGraph
+from .schemas import SkillsProfForGanttGraph, SkillsProfForCohort
 #from .schemas import SkillsProfForGanttGraph
-from .service import get_graph_importer, GraphImporter, GraphStatusExporter, get_user_skills_from_db, \
-    get_skills_by_status
-from ..skill.service import SkillRepository, get_skill_repository
+from .service import get_graph_importer, GraphImporter, GraphStatusExporter, get_skills_by_status, \
+    get_cohort_overlay, get_group_user_ids, is_group_manager
+from ..skill.service import SkillRepository, get_skill_read_repository
 
 
 router = APIRouter()
@@ -27,20 +31,19 @@ async def get_prof_graph(
         user_id: int,
         prof_id: int,
         importer: GraphImporter = Depends(get_graph_importer),
-        skill_repo: SkillRepository = Depends(get_skill_repository),
+        skill_repo: SkillRepository = Depends(get_skill_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ):
     try:
-        nodes, relationships = importer.get_nodes_and_relationships(prof_id)
-        importer.close()
+        tree = await importer.get_profession_tree(prof_id)
 
         user_skills = await skill_repo.get_user_skills_dict_name_prof(user_id)
 
-        exporter = GraphStatusExporter(nodes, relationships, user_skills=user_skills)
+        exporter = GraphStatusExporter(user_skills=user_skills, tree=tree)
         hierarchy = exporter.export()
         return hierarchy
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -55,11 +58,56 @@ async def get_prof_graph(
 async def get_prof_graph(
         user_id: int,
         prof_id: int,
+        importer: GraphImporter = Depends(get_graph_importer),
+        db: AsyncSession = Depends(get_read_db),
         current_user: UserInfo = Depends(get_current_user)
 ) -> SkillsProfForGanttGraph:
     try:
-        result = get_skills_by_status(profession_id=prof_id, user_id=user_id)
-        return SkillsProfForGanttGraph.model_validate(result)
+        result = await get_skills_by_status(importer, db, profession_id=prof_id, user_id=user_id)
+        with tracer.span("SkillsProfForGanttGraph.model_validate"):
+            return SkillsProfForGanttGraph.model_validate(result)
+    except Exception as e:
+        app_logger.error("Error: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@router.get(
+    path="/get/{prof_id}/cohort",
+    summary="Skill gap of a group of users for the profession",
+    description="Percent complete, gray zone and per-category rollups for many users at once. "
+                "Cohort - group_id (user_to_group) and/or user_ids. Admin - any users, manager - own groups.",
+    response_description="Aggregates, category rollups and paginated per-user rows",
+    status_code=status.HTTP_200_OK,
+    response_model=SkillsProfForCohort
+)
+async def get_prof_graph_cohort(
+        prof_id: int,
+        group_id: Optional[int] = None,
+        user_ids: Optional[List[int]] = Query(None),
+        offset: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        importer: GraphImporter = Depends(get_graph_importer),
+        db: AsyncSession = Depends(get_read_db),
+        current_user: UserInfo = Depends(require_roles([UserRole.admin, UserRole.manager]))
+) -> SkillsProfForCohort:
+    try:
+        cohort = set(user_ids or [])
+        if group_id is not None:
+            if current_user.role != UserRole.admin and not await is_group_manager(db, group_id, current_user.id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="View can only your groups")
+            group_users = set(await get_group_user_ids(db, group_id))
+            # user_ids вместе с group_id сужают выборку внутри группы
+            cohort = cohort & group_users if cohort else group_users
+        elif current_user.role != UserRole.admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Managers must specify group_id")
+
+        if not cohort:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cohort is empty")
+
+        overlay = await get_cohort_overlay(importer, db, profession_id=prof_id, user_ids=sorted(cohort))
+        return SkillsProfForCohort.model_validate(overlay.export(offset=offset, limit=limit))
+    except HTTPException:
+        raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 from routers.skill.enums import UserSkillStatus
@@ -26,3 +26,37 @@ class SkillsProfForGanttGraph(BaseModel):
     inactive: List[UserSkillBody]
     complete: List[UserSkillBody]
     gray_zone: List[NodeSkill]
+
+
+class CohortAggregates(BaseModel):
+    users: int
+    skills: int
+    percent_mean: float
+    percent_median: float
+    percent_min: float
+    percent_max: float
+    gray_zone_mean: float
+    complete_users: int
+
+
+class CohortCategoryRollup(BaseModel):
+    name: str
+    skills: int
+    percent: float
+    gray_zone: float
+
+
+class CohortUserRow(BaseModel):
+    user_id: int
+    percent: float
+    gray_zone: int
+    categories: Dict[str, float]
+
+
+class SkillsProfForCohort(BaseModel):
+    aggregates: CohortAggregates
+    categories: List[CohortCategoryRollup]
+    users: List[CohortUserRow]
+    total: int
+    offset: int
+    limit: int
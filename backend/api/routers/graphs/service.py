@@ -1,203 +1,122 @@
-from typing import Optional
-from age import Age
 import json
-import psycopg2
-import psycopg2.extras
+from typing import Optional
+
+import asyncpg
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+from config import POSTGRES_GRAPH
+from database import get_graph_pool
+from tracing import traced
+from .agtype import decode_agtype
+from .cache import GraphCache, graph_cache
+from .cohort import CohortOverlay
+from .tree import CompiledProfessionTree, NO_SKILL
 
 
 class GraphImporter:
-    def __init__(self):
-        self.conn = None
-        self.cursor = None
-
-    def connect_to_db(self):
-        self.conn = psycopg2.connect(
-            dbname=POSTGRES_DB,
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT
-        )
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("LOAD 'age';")
-        self.cursor.execute("SET search_path = ag_catalog, '$user', public;")
-        self.conn.commit()
+    """Reads the profession graph from Apache AGE through the shared asyncpg pool.
+
+    Cypher is sent with the AGE parameter map (``$1``), so the SQL text of every
+    query is constant and asyncpg reuses its prepared statement per connection.
+    When a ``GraphCache`` is given, compiled profession trees are served from it.
+    """
+    def __init__(self, pool: Optional[asyncpg.Pool] = None, cache: Optional[GraphCache] = None):
+        self.pool = pool
+        self.cache = cache
 
-    def execute_cypher_with_return(self, cypher_query, columns=("v agtype",)):
+    @staticmethod
+    def build_cypher_sql(cypher_query: str, columns=("v agtype",)) -> str:
         col_defs = ", ".join(columns)
-        sql_query = f"SELECT * FROM cypher('professions_graph', $${cypher_query}$$) as ({col_defs});"
-        self.cursor.execute(sql_query)
-        result = self.cursor.fetchall()
-        self.conn.commit()
-        return result
+        return f"SELECT * FROM cypher('{POSTGRES_GRAPH}', $${cypher_query}$$, $1) as ({col_defs});"
+
+    async def execute_cypher_with_return(self, conn: asyncpg.Connection, cypher_query, params: dict, columns=("v agtype",)):
+        sql_query = self.build_cypher_sql(cypher_query, columns)
+        return await conn.fetch(sql_query, json.dumps(params))
 
     def parse_agtype(self, value):
-        if isinstance(value, str):
-            if value.endswith("::vertex") or value.endswith("::edge"):
-                value = value.rsplit("::", 1)[0]
-            try:
-                return json.loads(value)
-            except:
-                return value
-        return value
-
-    def get_nodes_and_relationships(self, profession_id):
-        # ноды
-        cypher_nodes = f"MATCH (n) WHERE n.profession_id = {profession_id} RETURN n"
-        nodes_res = self.execute_cypher_with_return(cypher_nodes, ("n agtype",))
-        nodes = [self.parse_agtype(r[0]) for r in nodes_res]
-
-        # связи
-        cypher_rels = f"""
-            MATCH (a)-[r:CONTAINS]->(b)
-            WHERE a.profession_id = {profession_id} AND b.profession_id = {profession_id}
-            RETURN a,r,b
-        """
-        rel_res = self.execute_cypher_with_return(cypher_rels, ("a agtype", "r agtype", "b agtype"))
-        relationships = [{"from": self.parse_agtype(r[0])["id"],
-                          "to": self.parse_agtype(r[2])["id"],
-                          "type": "CONTAINS"} for r in rel_res]
-        return nodes, relationships
+        return decode_agtype(value)
+
+    @traced("GraphImporter.get_profession_tree")
+    async def get_profession_tree(self, profession_id) -> CompiledProfessionTree:
+        if self.cache is None:
+            return await self.load_profession_tree(profession_id)
+        return await self.cache.get_or_load(
+            self.pool, profession_id, lambda: self.load_profession_tree(profession_id)
+        )
 
-    def close(self):
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+    @traced("GraphImporter.load_profession_tree")
+    async def load_profession_tree(self, profession_id) -> CompiledProfessionTree:
+        nodes, relationships = await self.get_nodes_and_relationships(profession_id)
+        return CompiledProfessionTree.compile(nodes, relationships)
+
+    # Одним запросом: вершины профессии с нужными свойствами и id их детей.
+    # Из рёбер нужны только id концов, поэтому сами рёбра и вершины-дети не выгружаются.
+    PROFESSION_GRAPH_CYPHER = """
+        MATCH (n) WHERE n.profession_id = $profession_id
+        OPTIONAL MATCH (n)-[:CONTAINS]->(c) WHERE c.profession_id = $profession_id
+        RETURN id(n), label(n), n.name, n.skill_id, n.value, collect(id(c))
+    """
+    PROFESSION_GRAPH_COLUMNS = (
+        "id agtype", "label agtype", "name agtype", "skill_id agtype", "value agtype", "children agtype",
+    )
+    NODE_PROPERTIES = ("name", "skill_id", "value")
+
+    @traced("GraphImporter.get_nodes_and_relationships")
+    async def get_nodes_and_relationships(self, profession_id):
+        params = {"profession_id": profession_id}
+        async with self.pool.acquire() as conn:
+            rows = await self.execute_cypher_with_return(
+                conn, self.PROFESSION_GRAPH_CYPHER, params, self.PROFESSION_GRAPH_COLUMNS
+            )
+
+        nodes = []
+        relationships = []
+        for row in rows:
+            node_id = decode_agtype(row[0])
+            properties = {}
+            for key, value in zip(self.NODE_PROPERTIES, row[2:5]):
+                value = decode_agtype(value)
+                if value is not None:
+                    properties[key] = value
+            nodes.append({"id": node_id, "label": decode_agtype(row[1]), "properties": properties})
+            relationships.extend(
+                {"from": node_id, "to": child_id, "type": "CONTAINS"}
+                for child_id in decode_agtype(row[5]) or ()
+            )
+        return nodes, relationships
 
 
-def get_graph_importer() -> GraphImporter:
-    importer = GraphImporter()
-    importer.connect_to_db()
-    return importer
+def get_graph_importer(pool: asyncpg.Pool = Depends(get_graph_pool)) -> GraphImporter:
+    """ Dependency для FastAPI """
+    return GraphImporter(pool, graph_cache)
 
 
 class GraphStatusExporter:
-    def __init__(self, nodes, relationships, user_skills_data = None, user_skills = None):
-        self.nodes = {n["id"]: n for n in nodes}
-        self.relationships = relationships
-        self.user_skills_data = user_skills_data  # Теперь это dict: {skill_id: данные}
-        self.user_skills = user_skills
-        self.children_map = {}
-        self.build_children_map()
-
-    def build_children_map(self):
-        for rel in self.relationships:
-            f, t = rel["from"], rel["to"]
-            self.children_map.setdefault(f, []).append(t)
-
-    def build_hierarchy(self, node_id):
-        node = self.nodes[node_id]
-        label = node["label"]
-        props = node["properties"]
-        name = props.get("name")
-
-        node_value = props.get("value", 0)
-        user_prof = self.user_skills.get(name, 0)
-        percent = min(round((user_prof / node_value * 100) if node_value else 0, 2), 100)
-
-        entry = {
-            "count": node_value,
-            "user_proficiency": user_prof,
-            "percent": percent
-        }
-
-        for child_id in self.children_map.get(node_id, []):
-            child = self.nodes[child_id]
-            child_name = child["properties"]["name"]
-            entry[child_name] = self.build_hierarchy(child_id)
-
-        return entry
+    """Overlays user skills on a profession graph.
 
-    def collect_skill_nodes(self, node_id):
-        """Рекурсивно собирает только Skill узлы, игнорируя Category"""
-        skills = []
-        node = self.nodes[node_id]
-
-        # Добавляем только Skill узлы (не Profession и не Category)
-        if node["label"] == "Skill":
-            skills.append({
-                "id": node_id,
-                "name": node["properties"]["name"],
-                "skill_id": node["properties"].get("skill_id"),  # ID из таблицы skills
-                "count": node["properties"].get("value", 0)
-            })
-
-        # Рекурсивно обходим детей
-        for child_id in self.children_map.get(node_id, []):
-            child_skills = self.collect_skill_nodes(child_id)
-            skills.extend(child_skills)
-
-        return skills
+    Thin wrapper over ``CompiledProfessionTree``: accepts either raw nodes/relationships
+    (compiled on the spot) or an already compiled tree from the graph cache.
+    """
+    def __init__(self, nodes=None, relationships=None, user_skills_data=None, user_skills=None,
+                 tree: Optional[CompiledProfessionTree] = None):
+        self.tree = tree if tree is not None else CompiledProfessionTree.compile(nodes or [], relationships or [])
+        self.user_skills_data = user_skills_data  # dict: {skill_id: данные}
+        self.user_skills = user_skills  # dict: {name: proficiency}
 
+    @traced("GraphStatusExporter.export")
     def export(self):
-        result = {}
-        for node_id, node in self.nodes.items():
-            if node["label"] == "Profession":
-                prof_name = node["properties"]["name"]
-                result[prof_name] = self.build_hierarchy(node_id)
-        return result
+        return self.tree.export(self.user_skills)
 
+    @traced("GraphStatusExporter.export_by_status")
     def export_by_status(self):
-        # Собираем все Skill узлы из графа
-        all_skills = []
-        for node_id, node in self.nodes.items():
-            if node["label"] == "Profession":
-                profession_skills = self.collect_skill_nodes(node_id)
-                all_skills.extend(profession_skills)
-
-        # Группируем по статусам
-        result = {
-            "process": [],
-            "inactive": [],
-            "complete": [],
-            "gray_zone": []
-        }
+        return self.tree.export_by_status(self.user_skills_data)
 
-        for skill in all_skills:
-            skill_id = skill["skill_id"]
-            skill_name = skill["name"]
-
-            # Ищем навык пользователя по skill_id
-            user_skill_data = self.user_skills_data.get(skill_id)
-
-            if user_skill_data:
-                # Навык есть у пользователя
-                status = user_skill_data["status"]
-                user_prof = user_skill_data["proficiency"]
-                required_level = skill["count"]
-
-                skill_entry = {
-                    "name": skill_name,
-                    "count": required_level,
-                    "proficiency": user_prof,
-                    "percent": min(round((user_prof / required_level * 100) if required_level else 0, 2), 100),
-                    "priority": user_skill_data.get("priority"),
-                    "start_date": user_skill_data.get("start_date"),
-                    "end_date": user_skill_data.get("end_date"),
-                    "status": status
-                }
-
-                # Добавляем в соответствующую группу
-                if status in result:
-                    result[status].append(skill_entry)
-
-            else:
-                # Серая зона - навыка нет у пользователя
-                gray_skill = {
-                    "name": skill_name,
-                    "count": skill["count"]
-                }
-                result["gray_zone"].append(gray_skill)
-
-        return result
-
-
-def get_user_skills_from_db(user_id, db_cursor):
-    """Получаем навыки пользователя из обычной БД с JOIN таблицы skills"""
-    query = """
+
+# Реляционные данные читаются через сессию get_read_db, а не через пул графа: пул графа
+# смотрит в реплику всегда, а сессия учитывает cookie read_primary (read-your-writes)
+USER_SKILLS_SQL = text("""
     SELECT 
         us.id_skill,
         s.name as skill_name,
@@ -208,12 +127,17 @@ def get_user_skills_from_db(user_id, db_cursor):
         us.end_date 
     FROM user_skills us
     JOIN skills s ON us.id_skill = s.id
-    WHERE us.id_user = %s
-    """
-    db_cursor.execute(query, (user_id,))
+    WHERE us.id_user = :user_id
+""")
+
+
+@traced()
+async def get_user_skills_from_db(user_id, session: AsyncSession):
+    """Получаем навыки пользователя из обычной БД с JOIN таблицы skills"""
+    rows = (await session.execute(USER_SKILLS_SQL, {"user_id": user_id})).mappings().all()
 
     user_skills = {}
-    for row in db_cursor.fetchall():
+    for row in rows:
         user_skills[row['id_skill']] = {
             'skill_name': row['skill_name'],
             'proficiency': row['proficiency'],
@@ -226,31 +150,60 @@ def get_user_skills_from_db(user_id, db_cursor):
     return user_skills
 
 
-def get_skills_by_status(profession_id: int, user_id: int) ->  Optional[dict[str, list]]:
+@traced()
+async def get_skills_by_status(importer: GraphImporter, session: AsyncSession, profession_id: int,
+                               user_id: int) -> Optional[dict[str, list]]:
     """Основная функция для получения навыков по статусам"""
-    ordinary_conn = psycopg2.connect(
-        dbname=POSTGRES_DB,
-        user=POSTGRES_USER,
-        password=POSTGRES_PASSWORD,
-        host=POSTGRES_HOST,
-        port=POSTGRES_PORT
+    # Получаем данные из графа
+    tree = await importer.get_profession_tree(profession_id)
+
+    # Получаем данные пользователя из обычной БД
+    user_skills_data = await get_user_skills_from_db(user_id, session)
+
+    # Экспортируем по статусам
+    exporter = GraphStatusExporter(user_skills_data=user_skills_data, tree=tree)
+    result = exporter.export_by_status()
+
+    return result
+
+
+async def get_group_user_ids(session: AsyncSession, group_id: int) -> list[int]:
+    """Пользователи группы"""
+    result = await session.execute(
+        text("SELECT id_user FROM user_to_group WHERE id_group = :group_id"), {"group_id": group_id}
+    )
+    return list(result.scalars().all())
+
+
+async def is_group_manager(session: AsyncSession, group_id: int, manager_id: int) -> bool:
+    result = await session.execute(
+        text("SELECT 1 FROM manager_to_group WHERE id_group = :group_id AND id_manager = :manager_id"),
+        {"group_id": group_id, "manager_id": manager_id},
     )
-    ordinary_cursor = ordinary_conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    return result.first() is not None
+
+
+COHORT_SKILL_ROWS_SQL = text("""
+    SELECT id_user, id_skill, proficiency
+    FROM user_skills
+    WHERE id_user = ANY(CAST(:user_ids AS int[])) AND id_skill = ANY(CAST(:skill_ids AS int[]))
+""")
+
+
+@traced()
+async def get_cohort_skill_rows(session: AsyncSession, user_ids: list[int], skill_ids: list[int]) -> list[tuple]:
+    """Строки (id_user, id_skill, proficiency) для матрицы пользователи x навыки"""
+    result = await session.execute(COHORT_SKILL_ROWS_SQL, {"user_ids": user_ids, "skill_ids": skill_ids})
+    return [tuple(row) for row in result.all()]
 
-    try:
-        # Получаем данные из графа
-        importer = get_graph_importer()
-        nodes, relationships = importer.get_nodes_and_relationships(profession_id)
-        importer.close()
 
-        # Получаем данные пользователя из обычной БД
-        user_skills_data = get_user_skills_from_db(user_id, ordinary_cursor)
+@traced()
+async def get_cohort_overlay(importer: GraphImporter, session: AsyncSession, profession_id: int,
+                             user_ids: list[int]) -> CohortOverlay:
+    """Наложение навыков группы пользователей на граф профессии"""
+    tree = await importer.get_profession_tree(profession_id)
+    skill_ids = sorted({skill_id for skill_id in (tree.skill_ids[slot] for slot in tree.skill_slots) if skill_id != NO_SKILL})
 
-        # Экспортируем по статусам
-        exporter = GraphStatusExporter(nodes, relationships, user_skills_data)
-        result = exporter.export_by_status()
+    rows = await get_cohort_skill_rows(session, user_ids, skill_ids)
 
-        return result
-    finally:
-        ordinary_cursor.close()
-        ordinary_conn.close()
+    return CohortOverlay(tree, user_ids, rows)
@@ -0,0 +1,206 @@
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+NO_PARENT = -1
+NO_SKILL = -1
+
+
+def calc_percent(user_prof, required) -> float:
+    """Percent of the required level reached by the user (capped at 100)."""
+    return min(round((user_prof / required * 100) if required else 0, 2), 100)
+
+
+class CompiledProfessionTree:
+    """Immutable, array-backed view of a profession graph (Profession -> Category -> Skill).
+
+    Slots are stored in pre-order (every parent precedes its children), so both
+    exports are single linear passes without recursion. A vertex reachable via
+    several parents gets a slot per occurrence, as in the nested JSON export.
+
+    Attributes:
+        labels: Vertex label per slot.
+        names: ``name`` property per slot.
+        values: Required level (``value`` property) per slot.
+        skill_ids: ``skill_id`` per slot (``NO_SKILL`` for non-skill vertices).
+        parents: Parent slot per slot (``NO_PARENT`` for profession roots).
+        child_offsets: CSR offsets into ``children`` (length = slots + 1).
+        children: Child slots of every slot, grouped by parent.
+        skill_slots: Slots of Skill vertices in export order.
+    """
+    __slots__ = (
+        "labels", "names", "values", "skill_ids",
+        "parents", "child_offsets", "children", "skill_slots",
+    )
+
+    def __init__(
+            self,
+            labels: Tuple[str, ...],
+            names: Tuple[str, ...],
+            values: Tuple[Any, ...],
+            skill_ids: array,
+            parents: array,
+            child_offsets: array,
+            children: array,
+    ):
+        self.labels = labels
+        self.names = names
+        self.values = values
+        self.skill_ids = skill_ids
+        self.parents = parents
+        self.child_offsets = child_offsets
+        self.children = children
+        self.skill_slots = array("q", (i for i, label in enumerate(labels) if label == "Skill"))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def compile(cls, nodes: Iterable[dict], relationships: Iterable[dict]) -> "CompiledProfessionTree":
+        """Builds the tree from parsed AGE vertices and CONTAINS edges.
+
+        Args:
+            nodes: Vertices (``id``, ``label``, ``properties``).
+            relationships: Edges (``from``, ``to``).
+
+        Returns:
+            A CompiledProfessionTree, rooted at every Profession vertex.
+        """
+        by_id = {node["id"]: node for node in nodes}
+        adjacency: Dict[Any, List[Any]] = {}
+        for rel in relationships:
+            adjacency.setdefault(rel["from"], []).append(rel["to"])
+
+        labels, names, values = [], [], []
+        skill_ids = array("q")
+        parents = array("q")
+        vertex_of_slot = []
+
+        stack = [(vertex_id, NO_PARENT) for vertex_id, node in reversed(by_id.items()) if node["label"] == "Profession"]
+        while stack:
+            vertex_id, parent = stack.pop()
+            node = by_id[vertex_id]
+            props = node["properties"]
+            slot = len(labels)
+
+            labels.append(node["label"])
+            names.append(props.get("name"))
+            values.append(props.get("value", 0))
+            skill_id = props.get("skill_id")
+            skill_ids.append(NO_SKILL if skill_id is None else int(skill_id))
+            parents.append(parent)
+            vertex_of_slot.append(vertex_id)
+
+            for child_id in reversed(adjacency.get(vertex_id, ())):
+                if child_id in by_id and not cls._is_ancestor(child_id, slot, parents, vertex_of_slot):
+                    stack.append((child_id, slot))
+
+        child_offsets, children = cls._build_csr(parents)
+        return cls(tuple(labels), tuple(names), tuple(values), skill_ids, parents, child_offsets, children)
+
+    @staticmethod
+    def _is_ancestor(vertex_id, slot: int, parents: array, vertex_of_slot: list) -> bool:
+        """Guards against cycles: True if ``vertex_id`` is already on the path to ``slot``."""
+        while slot != NO_PARENT:
+            if vertex_of_slot[slot] == vertex_id:
+                return True
+            slot = parents[slot]
+        return False
+
+    @staticmethod
+    def _build_csr(parents: array) -> Tuple[array, array]:
+        counts = [0] * (len(parents) + 1)
+        for parent in parents:
+            if parent != NO_PARENT:
+                counts[parent + 1] += 1
+
+        child_offsets = array("q", counts)
+        for i in range(1, len(child_offsets)):
+            child_offsets[i] += child_offsets[i - 1]
+
+        children = array("q", bytes(8 * child_offsets[-1]))
+        fill = array("q", child_offsets[:-1])
+        for slot, parent in enumerate(parents):
+            if parent != NO_PARENT:
+                children[fill[parent]] = slot
+                fill[parent] += 1
+        return child_offsets, children
+
+    def children_of(self, slot: int) -> array:
+        return self.children[self.child_offsets[slot]:self.child_offsets[slot + 1]]
+
+    def export(self, user_skills: Optional[Dict[str, int]] = None) -> dict:
+        """Nested ``{name: {count, user_proficiency, percent, <child>: {...}}}`` export.
+
+        Args:
+            user_skills: User proficiency by skill name.
+
+        Returns:
+            A dict, hierarchy per profession name.
+        """
+        user_skills = user_skills or {}
+        result = {}
+        entries = [None] * len(self.labels)
+
+        for slot, name in enumerate(self.names):
+            node_value = self.values[slot]
+            user_prof = user_skills.get(name, 0)
+            entry = {
+                "count": node_value,
+                "user_proficiency": user_prof,
+                "percent": calc_percent(user_prof, node_value),
+            }
+            entries[slot] = entry
+
+            parent = self.parents[slot]
+            if parent == NO_PARENT:
+                result[name] = entry
+            else:
+                entries[parent][name] = entry
+
+        return result
+
+    def export_by_status(self, user_skills_data: Optional[Dict[int, dict]] = None) -> Dict[str, list]:
+        """Groups the profession skills by the user's study status.
+
+        Args:
+            user_skills_data: User skill rows by skill_id.
+
+        Returns:
+            A dict with ``process``, ``inactive``, ``complete`` and ``gray_zone`` lists.
+        """
+        user_skills_data = user_skills_data or {}
+        result = {
+            "process": [],
+            "inactive": [],
+            "complete": [],
+            "gray_zone": []
+        }
+
+        for slot in self.skill_slots:
+            skill_id = self.skill_ids[slot]
+            required_level = self.values[slot]
+            user_skill_data = user_skills_data.get(skill_id) if skill_id != NO_SKILL else None
+
+            if user_skill_data:
+                status = user_skill_data["status"]
+                user_prof = user_skill_data["proficiency"]
+                if status in result:
+                    result[status].append({
+                        "name": self.names[slot],
+                        "count": required_level,
+                        "proficiency": user_prof,
+                        "percent": calc_percent(user_prof, required_level),
+                        "priority": user_skill_data.get("priority"),
+                        "start_date": user_skill_data.get("start_date"),
+                        "end_date": user_skill_data.get("end_date"),
+                        "status": status
+                    })
+            else:
+                # Серая зона - навыка нет у пользователя
+                result["gray_zone"].append({
+                    "name": self.names[slot],
+                    "count": required_level
+                })
+
+        return result
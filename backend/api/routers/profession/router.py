@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response
 from typing import List
 
 from .schemas import ProfessionRead, ProfessionCreate, ProfessionUpdate
-from .service import ProfessionRepository, get_profession_repository
+from .service import ProfessionRepository, get_profession_repository, get_profession_read_repository
 from ..auth.ident.dependencies import get_current_user, require_roles
 from ..auth.user.roles import UserRole
 from ..auth.user.schemas import UserInfo
@@ -20,7 +20,7 @@ router = APIRouter()
     response_model=List[ProfessionRead]
 )
 async def read_professions(
-        profession_repo: ProfessionRepository = Depends(get_profession_repository),
+        profession_repo: ProfessionRepository = Depends(get_profession_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[ProfessionRead]:
     profs = await profession_repo.get_all_professions()
@@ -37,7 +37,7 @@ async def read_professions(
 )
 async def read_profession(
     profession_id: int,
-    profession_repo: ProfessionRepository = Depends(get_profession_repository),
+    profession_repo: ProfessionRepository = Depends(get_profession_read_repository),
     current_user: UserInfo = Depends(require_roles([UserRole.admin]))
 ) -> ProfessionRead:
     profession = await profession_repo.get_profession_by_id(profession_id)
@@ -2,11 +2,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status, Depends
 
-from database import get_db
+from database import get_db, get_read_db
+from tracing import trace_methods
 from .models import Profession
 from .schemas import ProfessionCreate, ProfessionUpdate, ProfessionRead
 
 
+@trace_methods
 class ProfessionRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -23,7 +25,7 @@ class ProfessionRepository:
         try:
             db_profession = Profession(**profession.model_dump())
             self.session.add(db_profession)
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(db_profession)
             return ProfessionRead.model_validate(db_profession)
         except Exception as e:
@@ -45,7 +47,7 @@ class ProfessionRepository:
         for field, value in update_data.items():
             setattr(db_profession, field, value)
 
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(db_profession)
         return ProfessionRead.model_validate(db_profession)
 
@@ -58,9 +60,14 @@ class ProfessionRepository:
             )
 
         await self.session.delete(db_profession)
-        await self.session.commit()
+        await self.session.flush()
 
 
 def get_profession_repository(db: AsyncSession = Depends(get_db)) -> ProfessionRepository:
     """ Dependency для FastAPI """
-    return ProfessionRepository(db)
\ No newline at end of file
+    return ProfessionRepository(db)
+
+
+def get_profession_read_repository(db: AsyncSession = Depends(get_read_db)) -> ProfessionRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return ProfessionRepository(db)
@@ -5,4 +5,11 @@ class UserSkillStatus(enum.Enum):
     """ Enum class for users skill status """
     inactive = "inactive"
     process = "process"
-    complete = "complete"
\ No newline at end of file
+    complete = "complete"
+
+
+class OnConflict(str, enum.Enum):
+    """ What to do with skills the user already has on bulk add """
+    skip = "skip"
+    update = "update"
+    fail = "fail"
\ No newline at end of file
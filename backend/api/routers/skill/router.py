@@ -1,15 +1,19 @@
 from typing import List, Union
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Response
 
 from logger import app_logger
-from .service import get_skill_repository, SkillRepository
-from .schemas import UserSkillCreate, UserSkillResponse, SkillResponse, UserSkillUpdate, SkillOnlyResponse
+from .enums import OnConflict
+from .service import get_skill_repository, SkillRepository, get_skill_read_repository
+from .schemas import UserSkillCreate, UserSkillResponse, SkillResponse, UserSkillUpdate, SkillOnlyResponse, \
+    UserSkillBatchItem, UserSkillBatchSummary
 from ..auth.ident.dependencies import get_current_user, require_roles
 from ..auth.user.roles import UserRole
 from ..auth.user.schemas import UserInfo
 from ..courser.schemas import CourseResponse
 
 
+SKILL_BATCH_MAX_ITEMS = 10000
+
 router = APIRouter()
 
 
@@ -22,7 +26,7 @@ router = APIRouter()
     response_model=List[SkillOnlyResponse],
 )
 async def get_all_skills(
-        skill_repo: SkillRepository = Depends(get_skill_repository),
+        skill_repo: SkillRepository = Depends(get_skill_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[SkillOnlyResponse]:
     try:
@@ -34,7 +38,7 @@ async def get_all_skills(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -48,7 +52,7 @@ async def get_all_skills(
 )
 async def get_user_skills(
         user_id: int,
-        skill_repo: SkillRepository = Depends(get_skill_repository),
+        skill_repo: SkillRepository = Depends(get_skill_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[SkillResponse]:
     try:
@@ -65,7 +69,7 @@ async def get_user_skills(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -80,7 +84,7 @@ async def get_user_skills(
 async def get_user_skill(
         skill_id: int,
         user_id: int,
-        skill_repo: SkillRepository = Depends(get_skill_repository),
+        skill_repo: SkillRepository = Depends(get_skill_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> Union[SkillResponse, List]:
     try:
@@ -97,7 +101,7 @@ async def get_user_skill(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -111,7 +115,7 @@ async def get_user_skill(
 )
 async def get_user_skill(
         skill_id: int,
-        skill_repo: SkillRepository = Depends(get_skill_repository),
+        skill_repo: SkillRepository = Depends(get_skill_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[CourseResponse]:
     try:
@@ -119,7 +123,7 @@ async def get_user_skill(
 
         return [CourseResponse(id=course.id, url=course.url, title=course.title) for course in list_course]
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -133,7 +137,7 @@ async def get_user_skill(
 )
 async def get_user_skill(
         user_id: int,
-        skill_repo: SkillRepository = Depends(get_skill_repository),
+        skill_repo: SkillRepository = Depends(get_skill_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ):
     try:
@@ -145,37 +149,40 @@ async def get_user_skill(
 
         return [SkillResponse.model_validate(skill) for skill in skills]
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @router.post(
     path="/add",
     summary="Add skill for yourself",
-    description="Add skill for yourself. Row status - enum('inactive', 'process', 'complete')",
+    description="Add skill for yourself. Row status - enum('inactive', 'process', 'complete'). "
+                "on_conflict - skills you already have: fail (400), skip or update",
     response_description="Status code",
     status_code=status.HTTP_201_CREATED,
     response_class=Response
 )
 async def add_my_skill(
         skill_data: List[UserSkillCreate],
+        on_conflict: OnConflict = OnConflict.fail,
         skill_repo: SkillRepository = Depends(get_skill_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> Response:
     try:
-        await skill_repo.create_user_skills(current_user.id, skill_data)
+        await skill_repo.create_user_skills(current_user.id, skill_data, on_conflict)
         return Response(status_code=status.HTTP_201_CREATED)
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @router.post(
     path="/add/{user_id}",
     summary="Add skill for user",
-    description="Add skill for specific user (admin only).  Row status - enum('inactive', 'process', 'complete')",
+    description="Add skill for specific user (admin only).  Row status - enum('inactive', 'process', 'complete'). "
+                "on_conflict - skills the user already has: fail (400), skip or update",
     response_description="Status code",
     status_code=status.HTTP_201_CREATED,
     response_class=Response
@@ -183,16 +190,49 @@ async def add_my_skill(
 async def add_user_skill(
         user_id: int,
         skill_data: List[UserSkillCreate],
+        on_conflict: OnConflict = OnConflict.fail,
         skill_repo: SkillRepository = Depends(get_skill_repository),
         current_user: UserInfo = Depends(require_roles([UserRole.admin]))
 ) -> Response:
     try:
-        await skill_repo.create_user_skills(user_id, skill_data)
+        await skill_repo.create_user_skills(user_id, skill_data, on_conflict)
         return Response(status_code=status.HTTP_201_CREATED)
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@router.put(
+    path="/batch",
+    summary="Batch update of user skills",
+    description="Many proficiency/status/priority/date changes in one request (up to 10000). "
+                "Empty field - keep the current value; a missing skill is added when proficiency is given. "
+                "id_user - admin only, by default yourself.",
+    response_description="Counts of updated and inserted skills and skipped (id_user, id_skill)",
+    status_code=status.HTTP_200_OK,
+    response_model=UserSkillBatchSummary,
+)
+async def batch_update_user_skills(
+        items: List[UserSkillBatchItem] = Body(max_length=SKILL_BATCH_MAX_ITEMS),
+        skill_repo: SkillRepository = Depends(get_skill_repository),
+        current_user: UserInfo = Depends(get_current_user)
+) -> UserSkillBatchSummary:
+    try:
+        resolved = []
+        for item in items:
+            if item.id_user is None:
+                item = item.model_copy(update={"id_user": current_user.id})
+            elif item.id_user != current_user.id and current_user.role != UserRole.admin:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Update can only your data")
+            resolved.append(item)
+
+        return await skill_repo.bulk_upsert_user_skills(resolved)
+    except HTTPException:
+        raise
+    except Exception as e:
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -222,7 +262,7 @@ async def update_user_skill(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -251,5 +291,5 @@ async def delete_user_skill(
     except HTTPException:
         raise
     except Exception as e:
-        app_logger.error(f"Error: {e}")
+        app_logger.error("Error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
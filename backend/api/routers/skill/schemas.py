@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from routers.skill.enums import UserSkillStatus
 
@@ -32,6 +32,29 @@ class UserSkillUpdate(BaseModel):
     status: Optional[UserSkillStatus] = None
 
 
+class UserSkillBatchItem(BaseModel):
+    """Change of one user skill in a batch: None - keep the current value"""
+    id_skill: int
+    id_user: Optional[int] = None
+    proficiency: Optional[int] = None
+    priority: Optional[int] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    status: Optional[UserSkillStatus] = None
+
+
+class UserSkillKey(BaseModel):
+    id_user: int
+    id_skill: int
+
+
+class UserSkillBatchSummary(BaseModel):
+    received: int
+    updated: int
+    inserted: int
+    skipped: List[UserSkillKey]
+
+
 class UserSkillResponse(UserSkillBase):
     class Config:
         from_attributes = True
@@ -1,19 +1,80 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, select, text
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from logger import app_logger
-from .enums import UserSkillStatus
+from .enums import OnConflict, UserSkillStatus
 from .models import Skill, UserSkill, CourserSkill
-from .schemas import UserSkillCreate, UserSkillUpdate
-from database import get_db
+from .schemas import UserSkillCreate, UserSkillUpdate, UserSkillBatchItem, UserSkillBatchSummary
+from database import get_db, get_read_db
+from tracing import trace_methods
 from ..courser.models import Course
 
 
+# Строк в одном INSERT ... VALUES: 7 параметров на строку, лимит протокола - 32767 параметров
+BULK_INSERT_CHUNK_SIZE = 1000
+USER_SKILL_KEY = ("id_skill", "id_user")
+BATCH_COLUMNS = ("id_user", "id_skill", "proficiency", "priority", "status", "start_date", "end_date")
+
+# Пакет изменений одним запросом: массивы колонок разворачиваются через unnest (7 параметров на любой размер),
+# существующие строки обновляются (NULL - оставить значение), отсутствующие с proficiency - вставляются
+# (end_date NOT NULL: без него новая строка получает start_date)
+BULK_UPSERT_USER_SKILLS_SQL = text("""
+    WITH data AS (
+        SELECT * FROM unnest(
+            CAST(:id_user AS INTEGER[]), CAST(:id_skill AS INTEGER[]), CAST(:proficiency AS INTEGER[]),
+            CAST(:priority AS INTEGER[]), CAST(:status AS skill_status[]),
+            CAST(:start_date AS TIMESTAMP[]), CAST(:end_date AS TIMESTAMP[])
+        ) AS d(id_user, id_skill, proficiency, priority, status, start_date, end_date)
+    ),
+    updated AS (
+        UPDATE user_skills AS us SET
+            proficiency = COALESCE(d.proficiency, us.proficiency),
+            priority = COALESCE(d.priority, us.priority),
+            status = COALESCE(d.status, us.status),
+            start_date = COALESCE(d.start_date, us.start_date),
+            end_date = COALESCE(d.end_date, us.end_date)
+        FROM data AS d
+        WHERE us.id_user = d.id_user AND us.id_skill = d.id_skill
+        RETURNING us.id_user, us.id_skill
+    ),
+    inserted AS (
+        INSERT INTO user_skills (id_user, id_skill, proficiency, priority, status, start_date, end_date)
+        SELECT d.id_user, d.id_skill, d.proficiency, d.priority, COALESCE(d.status, 'inactive'),
+               COALESCE(d.start_date, LOCALTIMESTAMP), COALESCE(d.end_date, d.start_date, LOCALTIMESTAMP)
+        FROM data AS d
+        WHERE d.proficiency IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM user_skills AS us WHERE us.id_user = d.id_user AND us.id_skill = d.id_skill)
+        ON CONFLICT (id_skill, id_user) DO NOTHING
+        RETURNING id_user, id_skill
+    )
+    SELECT
+        (SELECT count(*) FROM updated) AS updated,
+        (SELECT count(*) FROM inserted) AS inserted,
+        (SELECT json_agg(json_build_object('id_user', d.id_user, 'id_skill', d.id_skill))
+         FROM data AS d
+         WHERE NOT EXISTS (SELECT 1 FROM updated AS u WHERE u.id_user = d.id_user AND u.id_skill = d.id_skill)
+           AND NOT EXISTS (SELECT 1 FROM inserted AS i WHERE i.id_user = d.id_user AND i.id_skill = d.id_skill)
+        ) AS skipped
+""").columns(updated=Integer, inserted=Integer, skipped=JSON)
+
+
+def _naive_datetimes(values: List[Optional[datetime]]) -> List[Optional[datetime]]:
+    """Drops tzinfo from a column array (columns are ``TIMESTAMP`` without time zone)."""
+    if all(value is None or value.tzinfo is None for value in values):
+        return values
+    return [value.replace(tzinfo=None) if value is not None else None for value in values]
+
+
+@trace_methods
 class SkillRepository:
     def __init__(self, session: AsyncSession = Depends(get_db)):
         self.session = session
@@ -75,11 +136,35 @@ class SkillRepository:
         )
         return result.scalar_one_or_none()
 
-    async def create_user_skills(self, user_id: int, skill_data: List[UserSkillCreate]) -> List[UserSkill]:
+    @staticmethod
+    def build_user_skills_insert(rows: List[dict], on_conflict: OnConflict):
+        """Multi-row ``INSERT ... ON CONFLICT ... RETURNING`` of user skills."""
+        stmt = insert(UserSkill).values(rows)
+        if on_conflict == OnConflict.skip:
+            stmt = stmt.on_conflict_do_nothing(index_elements=USER_SKILL_KEY)
+        elif on_conflict == OnConflict.update:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=USER_SKILL_KEY,
+                set_={column: stmt.excluded[column] for column in rows[0] if column not in USER_SKILL_KEY},
+            )
+        return stmt.returning(UserSkill)
+
+    async def create_user_skills(self, user_id: int, skill_data: List[UserSkillCreate],
+                                 on_conflict: OnConflict = OnConflict.fail) -> List[UserSkill]:
+        """Adds user skills with one ``INSERT ... RETURNING`` and loads their skills with one SELECT.
+
+        Args:
+            user_id: Owner of the skills.
+            skill_data: Skills to add.
+            on_conflict: Skills the user already has - ``fail`` (400), ``skip`` or ``update``.
+
+        Returns:
+            Inserted (and, for ``update``, updated) rows with ``skill`` loaded; skipped rows are not returned.
+        """
         try:
-            skills = []
+            rows = []
             for skill in skill_data:
-                skill_dict = skill.model_dump(exclude_unset=True)
+                skill_dict = skill.model_dump()
 
                 if skill_dict.get('start_date') and skill_dict['start_date'].tzinfo is not None:
                     skill_dict['start_date'] = skill_dict['start_date'].replace(tzinfo=None)
@@ -87,30 +172,90 @@ class SkillRepository:
                 if skill_dict.get('end_date') and skill_dict['end_date'].tzinfo is not None:
                     skill_dict['end_date'] = skill_dict['end_date'].replace(tzinfo=None)
 
-                skills.append(UserSkill(id_user=user_id, **skill_dict))
+                rows.append({"id_user": user_id, **skill_dict})
 
-            self.session.add_all(skills)
-            await self.session.commit()
+            if on_conflict == OnConflict.update:
+                # Один INSERT не может обновить строку дважды: из повторов берём последний
+                rows = list({row["id_skill"]: row for row in rows}.values())
 
-            for skill in skills:
-                await self.session.refresh(skill)
-            return skills
+            user_skills = []
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                result = await self.session.scalars(
+                    self.build_user_skills_insert(rows[start:start + BULK_INSERT_CHUNK_SIZE], on_conflict),
+                    execution_options={"populate_existing": True},
+                )
+                user_skills.extend(result.all())
+
+            if user_skills:
+                result = await self.session.scalars(
+                    select(Skill).where(Skill.id.in_({user_skill.id_skill for user_skill in user_skills}))
+                )
+                skills = {skill.id: skill for skill in result.all()}
+                for user_skill in user_skills:
+                    set_committed_value(user_skill, "skill", skills.get(user_skill.id_skill))
+            return user_skills
 
         except IntegrityError as e:
             await self.session.rollback()
-            app_logger.error(f"IntegrityError: {e}")
+            app_logger.error("IntegrityError: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Skill already exists for this user or invalid foreign key"
             )
         except Exception as e:
             await self.session.rollback()
-            app_logger.error(f"Error: {e}")
+            app_logger.error("Error: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error"
+            )
+
+    async def bulk_upsert_user_skills(self, items: List[UserSkillBatchItem]) -> UserSkillBatchSummary:
+        """Applies many user skill changes with one set-based statement.
+
+        Existing rows get the given fields (None keeps the current value); missing
+        rows are inserted when ``proficiency`` is given, otherwise skipped. Inserted
+        rows default to status ``inactive``, ``start_date`` now and ``end_date`` equal
+        to ``start_date``. Repeated (id_user, id_skill) pairs - the last one wins.
+
+        Args:
+            items: Changes, ``id_user`` must be set.
+
+        Returns:
+            UserSkillBatchSummary: Counts of updated and inserted rows and the skipped keys.
+        """
+        changes = {(item.id_user, item.id_skill): item for item in items}
+        if not changes:
+            return UserSkillBatchSummary(received=0, updated=0, inserted=0, skipped=[])
+
+        rows = list(changes.values())
+        columns = {column: [getattr(item, column) for item in rows] for column in BATCH_COLUMNS}
+        columns["status"] = [value.value if value is not None else None for value in columns["status"]]
+        for column in ("start_date", "end_date"):
+            columns[column] = _naive_datetimes(columns[column])
+
+        try:
+            result = await self.session.execute(BULK_UPSERT_USER_SKILLS_SQL, columns)
+            row = result.one()
+        except IntegrityError as e:
+            await self.session.rollback()
+            app_logger.error("IntegrityError: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid skill or user in the batch"
+            )
+        except Exception as e:
+            await self.session.rollback()
+            app_logger.error("Error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
             )
 
+        return UserSkillBatchSummary(
+            received=len(items), updated=row.updated, inserted=row.inserted, skipped=row.skipped or [],
+        )
+
     async def update_user_skill(self, skill_id: int, user_id: int, skill_data: UserSkillUpdate) -> UserSkill:
         try:
             skill = await self.get_user_skill(skill_id, user_id)
@@ -134,12 +279,12 @@ class SkillRepository:
                 if hasattr(skill, key):
                     setattr(skill, key, value)
 
-            await self.session.commit()
+            await self.session.flush()
             await self.session.refresh(skill)
             return skill
         except Exception as e:
             await self.session.rollback()
-            app_logger.error(f"Error: {e}")
+            app_logger.error("Error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
@@ -155,10 +300,10 @@ class SkillRepository:
                 )
 
             await self.session.delete(skill)
-            await self.session.commit()
+            await self.session.flush()
         except Exception as e:
             await self.session.rollback()
-            app_logger.error(f"Error: {e}")
+            app_logger.error("Error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
@@ -167,4 +312,9 @@ class SkillRepository:
 
 def get_skill_repository(db: AsyncSession = Depends(get_db)) -> SkillRepository:
     """ Dependency для FastAPI """
-    return SkillRepository(db)
\ No newline at end of file
+    return SkillRepository(db)
+
+
+def get_skill_read_repository(db: AsyncSession = Depends(get_read_db)) -> SkillRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return SkillRepository(db)
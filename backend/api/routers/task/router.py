@@ -2,12 +2,12 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.exceptions import ResponseValidationError
 
-from .service import TaskRepository, get_task_repository
+from .service import TaskRepository, get_task_repository, get_task_read_repository
 from .schemas import TaskCreate, TaskResponse, TaskCreateSelf, TaskUpdate
 from ..auth.ident.dependencies import require_roles, get_current_user
 from ..auth.user.roles import UserRole
 from ..auth.user.schemas import UserInfo
-from ..auth.user.service import UserRepository
+from ..auth.user.service import UserRepository, get_user_repository
 
 
 router = APIRouter()
@@ -46,7 +46,7 @@ router = APIRouter()
 )
 async def get_user_tasks(
         user_id: int,
-        task_repo: TaskRepository = Depends(get_task_repository),
+        task_repo: TaskRepository = Depends(get_task_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> List[TaskResponse]:
     if current_user.role != UserRole.admin:
@@ -71,7 +71,7 @@ async def get_user_tasks(
 )
 async def get_task(
         task_id: int,
-        task_repo: TaskRepository = Depends(get_task_repository),
+        task_repo: TaskRepository = Depends(get_task_read_repository),
         current_user: UserInfo = Depends(get_current_user)
 ) -> TaskResponse:
     task = await task_repo.get_task(task_id)
@@ -115,9 +115,10 @@ async def add_task_for_user(
         user_id: int,
         task_data: TaskCreate,
         task_repo: TaskRepository = Depends(get_task_repository),
+        user_repo: UserRepository = Depends(get_user_repository),
         current_user: UserInfo = Depends(get_current_user)
 ):
-    user = await UserRepository.find_one_or_none_by_id(user_id)
+    user = await user_repo.find_one_or_none_by_id(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -3,10 +3,12 @@ from sqlalchemy import select
 from fastapi import HTTPException, status, Depends
 from .models import TaskOrm
 from .schemas import TaskCreate, TaskCreateSelf, TaskUpdate, TaskResponse
-from database import get_db
+from database import get_db, get_read_db
+from tracing import trace_methods
 from datetime import datetime, timezone
 
 
+@trace_methods
 class TaskRepository:
     def __init__(self, session: AsyncSession = Depends(get_db)):
         self.session = session
@@ -35,7 +37,7 @@ class TaskRepository:
             created_from=user_id,
         )
         self.session.add(task)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(task)
         return TaskResponse.model_validate(task)
 
@@ -58,7 +60,7 @@ class TaskRepository:
             created_from=task_data.created_from
         )
         self.session.add(task)
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(task)
         return TaskResponse.model_validate(task)
 
@@ -77,7 +79,7 @@ class TaskRepository:
         for key, value in update_data.items():
             setattr(task, key, value)
 
-        await self.session.commit()
+        await self.session.flush()
         await self.session.refresh(task)
         return TaskResponse.model_validate(task)
 
@@ -90,9 +92,14 @@ class TaskRepository:
             )
 
         await self.session.delete(task)
-        await self.session.commit()
+        await self.session.flush()
 
 
 def get_task_repository(db: AsyncSession = Depends(get_db)) -> TaskRepository:
     """ Dependency для FastAPI """
-    return TaskRepository(db)
\ No newline at end of file
+    return TaskRepository(db)
+
+
+def get_task_read_repository(db: AsyncSession = Depends(get_read_db)) -> TaskRepository:
+    """ Dependency для FastAPI (чтение из реплики) """
+    return TaskRepository(db)
@@ -0,0 +1,67 @@
+"""Micro-benchmark of agtype decoding (per-row cost).
+
+Compares the previous ``parse_agtype`` implementation with ``decode_agtype``
+using json and orjson (if installed). Run from ``backend/api``:
+
+    python tests/benchmark/bench_agtype.py --rows 20000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from routers.graphs import agtype  # noqa: E402
+
+
+def legacy_parse_agtype(value):
+    if isinstance(value, str):
+        if value.endswith("::vertex") or value.endswith("::edge"):
+            value = value.rsplit("::", 1)[0]
+        try:
+            return json.loads(value)
+        except:
+            return value
+    return value
+
+
+def make_rows(count):
+    rows = []
+    for i in range(count):
+        vertex = {
+            "id": 844424930131969 + i,
+            "label": "Skill",
+            "properties": {"name": f"skill-{i}", "skill_id": i, "value": i % 10, "profession_id": 1},
+        }
+        rows.append(json.dumps(vertex) + "::vertex")
+    return rows
+
+
+def bench(name, decode, rows, repeat):
+    best = min(timeit.repeat(lambda: [decode(row) for row in rows], number=1, repeat=repeat))
+    print(f"{name:<24} {best / len(rows) * 1e6:8.3f} us/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="agtype decoding benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    bench("legacy parse_agtype", legacy_parse_agtype, rows, args.repeat)
+
+    agtype.loads = agtype._loads_json
+    bench("decode_agtype (json)", agtype.decode_agtype, rows, args.repeat)
+
+    if agtype.orjson is not None:
+        agtype.loads = agtype._loads_orjson
+        bench("decode_agtype (orjson)", agtype.decode_agtype, rows, args.repeat)
+    else:
+        print("orjson is not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Per-token cost of JWT encode/decode: string keys (parsed per call) vs cached key objects.
+
+Run from ``backend/api``:
+
+    python tests/benchmark/bench_jwt.py --repeat 5000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519  # noqa: E402
+from jose import jwt as jose_jwt  # noqa: E402
+
+from routers.auth.ident.keys import TokenCodec, pyjwt  # noqa: E402
+
+
+def per_call_us(func, repeat):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def report(name, encode, decode, repeat):
+    print(f"{name:<28} encode {per_call_us(encode, repeat):8.1f} us   decode {per_call_us(decode, repeat):8.1f} us")
+
+
+def private_pem(key):
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                             serialization.NoEncryption())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    claims = {"sub": "42", "jti": "0" * 32, "exp": datetime.now(timezone.utc) + timedelta(hours=1)}
+    secret = "benchmark-secret"
+
+    token = jose_jwt.encode(claims, secret, algorithm="HS256")
+    report("HS256 jose, str key", lambda: jose_jwt.encode(claims, secret, algorithm="HS256"),
+           lambda: jose_jwt.decode(token, secret, algorithms=["HS256"]), args.repeat)
+
+    ec_pem = private_pem(ec.generate_private_key(ec.SECP256R1()))
+    token = jose_jwt.encode(claims, ec_pem, algorithm="ES256")
+    public_pem = serialization.load_pem_private_key(ec_pem, None).public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    report("ES256 jose, PEM key", lambda: jose_jwt.encode(claims, ec_pem, algorithm="ES256"),
+           lambda: jose_jwt.decode(token, public_pem, algorithms=["ES256"]), args.repeat)
+
+    codecs = [("HS256", TokenCodec("HS256", secret=secret, backend="jose")),
+              ("ES256", TokenCodec("ES256", private_pem=ec_pem, backend="jose"))]
+    if pyjwt is not None:
+        codecs += [("HS256", TokenCodec("HS256", secret=secret, backend="pyjwt")),
+                   ("ES256", TokenCodec("ES256", private_pem=ec_pem, backend="pyjwt")),
+                   ("EdDSA", TokenCodec("EdDSA", private_pem=private_pem(ed25519.Ed25519PrivateKey.generate()),
+                                        backend="pyjwt"))]
+    else:
+        print("PyJWT is not installed: EdDSA and the pyjwt backend are skipped")
+
+    for algorithm, codec in codecs:
+        token = codec.encode(claims)
+        report(f"{algorithm} codec ({codec.backend})", lambda: codec.encode(claims), lambda: codec.decode(token),
+               args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Latency of password hashing settings (hash and verify, per call).
+
+Helps to pick BCRYPT_ROUNDS / ARGON2_* for a deployment. Run from ``backend/api``:
+
+    python tests/benchmark/bench_password_hash.py --bcrypt-rounds 10 11 12 13
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from routers.auth.ident.utils import build_crypt_context  # noqa: E402
+
+
+def bench(name, context, repeat):
+    password = "benchmark-password"
+    context.hash(password)  # загрузка backend'а не входит в замер
+    started = time.perf_counter()
+    hashes = [context.hash(password) for _ in range(repeat)]
+    hash_ms = (time.perf_counter() - started) / repeat * 1000
+
+    started = time.perf_counter()
+    for hashed in hashes:
+        context.verify(password, hashed)
+    verify_ms = (time.perf_counter() - started) / repeat * 1000
+    print(f"{name:<36} hash {hash_ms:8.1f} ms   verify {verify_ms:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Password hashing benchmark")
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13])
+    parser.add_argument("--argon2-time-cost", type=int, nargs="*", default=[2, 3])
+    parser.add_argument("--argon2-memory-cost", type=int, default=65536)
+    parser.add_argument("--argon2-parallelism", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for rounds in args.bcrypt_rounds:
+        bench(f"bcrypt rounds={rounds}", build_crypt_context(["bcrypt"], bcrypt_rounds=rounds), args.repeat)
+
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        print("argon2-cffi is not installed, argon2 skipped")
+        return
+
+    for time_cost in args.argon2_time_cost:
+        context = build_crypt_context(
+            ["argon2"],
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=args.argon2_memory_cost,
+            argon2_parallelism=args.argon2_parallelism,
+        )
+        bench(f"argon2 t={time_cost} m={args.argon2_memory_cost} p={args.argon2_parallelism}", context, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Load test of DB pool pressure on authenticated user endpoints.
+
+Sends concurrent requests to the app in-process (httpx ASGI transport) against
+the database from ``.env`` and counts pool checkouts: the peak number of
+connections checked out at once and checkouts per request. With request-scoped
+sessions every request uses at most one connection. Run from ``backend/api``:
+
+    python tests/benchmark/load_pool.py --login alice --password secret1 --requests 500 --concurrency 50
+
+The user must exist. Rate limits on login are disabled for the run.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from database import engine, pool_stats  # noqa: E402
+from main import app  # noqa: E402
+from routers.auth.ident import limiter  # noqa: E402
+from routers.auth.ident.cache import user_cache  # noqa: E402
+
+
+class PoolStats:
+    def __init__(self):
+        self.checked_out = 0
+        self.peak = 0
+        self.checkouts = 0
+
+    def on_checkout(self, *args):
+        self.checked_out += 1
+        self.checkouts += 1
+        self.peak = max(self.peak, self.checked_out)
+
+    def on_checkin(self, *args):
+        self.checked_out -= 1
+
+
+async def run(args):
+    stats = PoolStats()
+    event.listen(engine.sync_engine.pool, "checkout", stats.on_checkout)
+    event.listen(engine.sync_engine.pool, "checkin", stats.on_checkin)
+    for rate_limiter in (limiter.login_ip_limiter, limiter.login_limiter):
+        rate_limiter.limit = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        credentials = {"login": args.login, "password": args.password}
+        response = await client.post("/auth/login", json=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        scenarios = {
+            "GET /user/me": lambda: client.get("/user/me", headers=headers),
+            "POST /user/aboutme": lambda: client.post("/user/aboutme", headers=headers, json={"about_me": "load"}),
+            "POST /auth/login": lambda: client.post("/auth/login", json=credentials),
+        }
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(send):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await send()
+                return time.perf_counter() - started, response.status_code
+
+        for name, send in scenarios.items():
+            user_cache.invalidate()
+            stats.peak, stats.checkouts = stats.checked_out, 0
+            started = time.perf_counter()
+            results = await asyncio.gather(*(one(send) for _ in range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+            latencies = sorted(latency for latency, _ in results)
+            errors = sum(1 for _, code in results if code >= 400)
+            print(
+                f"{name:<20} {args.requests / elapsed:8.1f} req/s   "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+                f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms   "
+                f"errors {errors:4d}   peak connections {stats.peak:3d}   "
+                f"checkouts/request {stats.checkouts / args.requests:5.2f}"
+            )
+
+    print(f"pool: {pool_stats()}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--login", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import pytest
+
+import instrumentation
+from metrics import QueryCounter, count_queries
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class QueryBudget:
+    """Assertions on the number of DB queries.
+
+    ``with query_budget(3, max_repeats=1):`` counts the queries of a block (direct
+    repository calls in the test task); ``query_budget.check(response, 3)`` reads
+    the ``X-Query-Count``/``X-Query-Max-Repeats`` headers of a TestClient response.
+    """
+
+    @staticmethod
+    def _assert(total: int, repeats: int, max_queries: int, max_repeats: Optional[int], details: str = "") -> None:
+        assert total <= max_queries, f"{total} DB queries, budget is {max_queries}{details}"
+        if max_repeats is not None:
+            assert repeats <= max_repeats, f"statement repeated {repeats} times, budget is {max_repeats}{details}"
+
+    @contextmanager
+    def __call__(self, max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryCounter]:
+        with count_queries() as counter:
+            yield counter
+        self._assert(counter.total, counter.max_repeats, max_queries, max_repeats, f": {counter.statements}")
+
+    def check(self, response, max_queries: int, max_repeats: Optional[int] = None) -> None:
+        self._assert(
+            int(response.headers[instrumentation.QUERY_COUNT_HEADER]),
+            int(response.headers[instrumentation.QUERY_REPEATS_HEADER]),
+            max_queries,
+            max_repeats,
+        )
+
+
+@pytest.fixture
+def query_budget(monkeypatch) -> QueryBudget:
+    monkeypatch.setattr(instrumentation, "QUERY_DEBUG_HEADERS", True)
+    return QueryBudget()
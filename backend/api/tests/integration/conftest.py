@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from config import POSTGRES_URL
+
+
+@pytest.fixture
+async def db_session():
+    """Session on the database from config (schema of ``database/postgres``); skipped when it is unreachable.
+
+    Everything runs in one transaction that is rolled back at the end.
+    """
+    engine = create_async_engine(POSTGRES_URL)
+    try:
+        conn = await asyncio.wait_for(engine.connect(), timeout=5)
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL is not available: {e}")
+    transaction = await conn.begin()
+    try:
+        yield AsyncSession(bind=conn, expire_on_commit=False)
+    finally:
+        await transaction.rollback()
+        await conn.close()
+        await engine.dispose()
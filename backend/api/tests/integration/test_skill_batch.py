@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from routers.skill.enums import UserSkillStatus
+from routers.skill.schemas import UserSkillBatchItem
+from routers.skill.service import SkillRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def user_skills(db_session):
+    # Копия user_skills с теми же NOT NULL и ключом, но без внешних ключей: тест не зависит от данных
+    await db_session.execute(text(
+        "CREATE TEMP TABLE user_skills (LIKE public.user_skills INCLUDING ALL) ON COMMIT DROP"
+    ))
+    await db_session.execute(text(
+        "INSERT INTO user_skills (id_user, id_skill, proficiency, start_date, end_date, status) "
+        "VALUES (7, 1, 1, '2026-01-01', '2026-02-01', 'process')"
+    ))
+    return db_session
+
+
+async def fetch(session, id_user, id_skill):
+    result = await session.execute(
+        text("SELECT * FROM user_skills WHERE id_user = :id_user AND id_skill = :id_skill"),
+        {"id_user": id_user, "id_skill": id_skill},
+    )
+    return result.mappings().one_or_none()
+
+
+async def test_bulk_upsert_inserts_rows_without_end_date(user_skills):
+    start = datetime(2026, 4, 6, 12, 0, tzinfo=timezone.utc)
+    items = [
+        UserSkillBatchItem(id_user=7, id_skill=1, status=UserSkillStatus.complete),
+        UserSkillBatchItem(id_user=7, id_skill=2, proficiency=3, start_date=start),
+        UserSkillBatchItem(id_user=7, id_skill=3, proficiency=2),
+        UserSkillBatchItem(id_user=7, id_skill=4, priority=1),
+    ]
+
+    summary = await SkillRepository(user_skills).bulk_upsert_user_skills(items)
+
+    assert (summary.updated, summary.inserted) == (1, 2)
+    assert [key.model_dump() for key in summary.skipped] == [{"id_user": 7, "id_skill": 4}]
+    updated = await fetch(user_skills, 7, 1)
+    assert (updated["status"], updated["end_date"]) == ("complete", datetime(2026, 2, 1))
+    inserted = await fetch(user_skills, 7, 2)
+    assert inserted["start_date"] == inserted["end_date"] == datetime(2026, 4, 6, 12, 0)
+    assert inserted["status"] == "inactive"
+    defaulted = await fetch(user_skills, 7, 3)
+    assert defaulted["end_date"] == defaulted["start_date"]
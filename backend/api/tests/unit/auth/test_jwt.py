@@ -1,9 +1,10 @@
 import pytest
 
 from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 from fastapi import HTTPException, Response, status
-from jose import ExpiredSignatureError, JWTError, jwt as jose_jwt
+from datetime import datetime, timedelta, timezone
+from jose import jwt as jose_jwt
 
 from routers.auth.ident.jwt import JWTService
 from routers.auth.ident.responses.http_errors import IdentErrorCode
@@ -13,11 +14,6 @@ from routers.auth.ident import jwt as jwt_module
 pytestmark = pytest.mark.anyio
 
 
-@pytest.fixture
-def anyio_backend():
-    return "asyncio"
-
-
 @pytest.fixture
 def jwt_settings(monkeypatch):
     secret = "test-secret"
@@ -56,41 +52,35 @@ def test_create_refresh_token_sets_cookie(jwt_settings):
     assert payload["sub"] == "9"
 
 
-async def test_descript_and_check_token_returns_user_for_valid_token(jwt_settings, monkeypatch):
+async def test_descript_and_check_token_returns_user_for_valid_token(jwt_settings):
     user = SimpleNamespace(id=7)
     lookup_mock = AsyncMock(return_value=user)
-    monkeypatch.setattr(jwt_module.UserRepository, "find_one_or_none_by_id", lookup_mock)
+    user_repo = SimpleNamespace(find_one_or_none_by_id=lookup_mock)
 
     token = JWTService.create_access_token({"sub": str(user.id)})
-    result = await JWTService.descript_and_check_token(token)
+    result = await JWTService.descript_and_check_token(token, user_repo)
 
     assert result is user
     lookup_mock.assert_awaited_once_with(7)
 
 
-async def test_descript_and_check_token_rejects_expired_token(monkeypatch):
-    monkeypatch.setattr(
-        jwt_module.jwt,
-        "decode",
-        lambda *args, **kwargs: (_ for _ in ()).throw(ExpiredSignatureError()),
-    )
+async def test_descript_and_check_token_rejects_expired_token(jwt_settings):
+    secret, algorithm = jwt_settings
+    expired = datetime.now(timezone.utc) - timedelta(minutes=1)
+    token = jose_jwt.encode({"sub": "7", "exp": expired}, secret, algorithm=algorithm)
 
     with pytest.raises(HTTPException) as exc_info:
-        await JWTService.descript_and_check_token("expired-token")
+        await JWTService.descript_and_check_token(token, Mock())
 
     assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
     assert exc_info.value.detail["code"] == IdentErrorCode.BAD_CREDENTIALS
 
 
-async def test_descript_and_check_token_rejects_invalid_token(monkeypatch):
-    monkeypatch.setattr(
-        jwt_module.jwt,
-        "decode",
-        lambda *args, **kwargs: (_ for _ in ()).throw(JWTError()),
-    )
+async def test_descript_and_check_token_rejects_invalid_token(jwt_settings):
+    token = jose_jwt.encode({"sub": "7"}, "other-secret", algorithm="HS256")
 
     with pytest.raises(HTTPException) as exc_info:
-        await JWTService.descript_and_check_token("invalid-token")
+        await JWTService.descript_and_check_token(token, Mock())
 
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert exc_info.value.detail["code"] == IdentErrorCode.INVALID_TOKEN
@@ -101,36 +91,106 @@ async def test_descript_and_check_token_rejects_token_without_sub(jwt_settings):
     token = jose_jwt.encode({"scope": "access"}, secret, algorithm=algorithm)
 
     with pytest.raises(HTTPException) as exc_info:
-        await JWTService.descript_and_check_token(token)
+        await JWTService.descript_and_check_token(token, Mock())
 
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert exc_info.value.detail["code"] == IdentErrorCode.INVALID_TOKEN
 
 
-async def test_descript_and_check_token_rejects_missing_user(jwt_settings, monkeypatch):
+async def test_descript_and_check_token_rejects_missing_user(jwt_settings):
     lookup_mock = AsyncMock(return_value=None)
-    monkeypatch.setattr(jwt_module.UserRepository, "find_one_or_none_by_id", lookup_mock)
+    user_repo = SimpleNamespace(find_one_or_none_by_id=lookup_mock)
 
     token = JWTService.create_access_token({"sub": "11"})
 
     with pytest.raises(HTTPException) as exc_info:
-        await JWTService.descript_and_check_token(token)
+        await JWTService.descript_and_check_token(token, user_repo)
 
     assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
     assert exc_info.value.detail["code"] == IdentErrorCode.DATA_OUT_OF_DATE
     lookup_mock.assert_awaited_once_with(11)
 
 
-async def test_refresh_access_token_creates_new_access_token(jwt_settings, monkeypatch):
+def refresh_cookie(response: Response) -> str:
+    return response.headers["set-cookie"].split("refresh_token=")[1].split(";")[0]
+
+
+@pytest.fixture
+def refresh_store():
+    return {}
+
+
+@pytest.fixture
+def repos(refresh_store):
+    async def revoke(jti, expires_at):
+        if jti in refresh_store:
+            return False
+        refresh_store[jti] = expires_at
+        return True
+
+    token_repo = SimpleNamespace(is_revoked=lambda jti: jti in refresh_store, revoke=AsyncMock(side_effect=revoke))
+    user_repo = SimpleNamespace(find_one_or_none_by_id=AsyncMock(return_value=SimpleNamespace(id=3)))
+    return {"user_repo": user_repo, "token_repo": token_repo}
+
+
+async def test_refresh_access_token_rotates_refresh_token(jwt_settings, refresh_store, repos):
     secret, algorithm = jwt_settings
-    monkeypatch.setattr(
-        JWTService,
-        "descript_and_check_token",
-        AsyncMock(return_value=SimpleNamespace(id=3)),
-    )
+    login_response = Response()
+    JWTService.create_refresh_token(login_response, {"sub": "3"})
+    old_refresh = refresh_cookie(login_response)
 
-    new_access_token = await JWTService.refresh_access_token("refresh-token")
+    response = Response()
+    new_access_token = await JWTService.refresh_access_token(response, old_refresh, **repos)
     payload = jose_jwt.decode(new_access_token, secret, algorithms=[algorithm])
+    new_refresh = jose_jwt.decode(refresh_cookie(response), secret, algorithms=[algorithm])
+    old_jti = jose_jwt.decode(old_refresh, secret, algorithms=[algorithm])["jti"]
 
     assert payload["sub"] == "3"
     assert "exp" in payload
+    assert new_refresh["type"] == "refresh"
+    assert new_refresh["jti"] != old_jti
+    assert old_jti in refresh_store
+
+
+async def test_refresh_access_token_rejects_reused_refresh_token(jwt_settings, refresh_store, repos):
+    login_response = Response()
+    JWTService.create_refresh_token(login_response, {"sub": "3"})
+    refresh_token = refresh_cookie(login_response)
+    await JWTService.refresh_access_token(Response(), refresh_token, **repos)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await JWTService.refresh_access_token(Response(), refresh_token, **repos)
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert exc_info.value.detail["code"] == IdentErrorCode.REFRESH_TOKEN_IN_BLACK_LIST
+
+
+async def test_refresh_access_token_rejects_access_token(jwt_settings, refresh_store, repos):
+    access_token = JWTService.create_access_token({"sub": "3"})
+
+    with pytest.raises(HTTPException) as exc_info:
+        await JWTService.refresh_access_token(Response(), access_token, **repos)
+
+    assert exc_info.value.detail["code"] == IdentErrorCode.INVALID_TOKEN
+
+
+async def test_refresh_access_token_rejects_token_without_jti(jwt_settings, refresh_store, repos):
+    secret, algorithm = jwt_settings
+    expire = datetime.now(timezone.utc) + timedelta(days=1)
+    legacy_refresh = jose_jwt.encode({"sub": "3", "exp": expire}, secret, algorithm=algorithm)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await JWTService.refresh_access_token(Response(), legacy_refresh, **repos)
+
+    assert exc_info.value.detail["code"] == IdentErrorCode.INVALID_TOKEN
+    repos["token_repo"].revoke.assert_not_awaited()
+
+
+async def test_revoke_refresh_token_on_logout(jwt_settings, refresh_store, repos):
+    login_response = Response()
+    JWTService.create_refresh_token(login_response, {"sub": "3"})
+
+    await JWTService.revoke_refresh_token(refresh_cookie(login_response), repos["token_repo"])
+    await JWTService.revoke_refresh_token("not-a-token", repos["token_repo"])
+
+    assert len(refresh_store) == 1
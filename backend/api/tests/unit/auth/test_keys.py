@@ -0,0 +1,96 @@
+import pytest
+
+from datetime import datetime, timedelta, timezone
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt as jose_jwt
+
+from routers.auth.ident import keys
+from routers.auth.ident.keys import TokenCodec, InvalidTokenError, TokenExpiredError
+
+
+@pytest.fixture
+def ec_pems():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem
+
+
+def future(minutes: int = 5) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+
+def test_hmac_codec_is_compatible_with_jose():
+    codec = TokenCodec("HS256", secret="test-secret")
+
+    token = codec.encode({"sub": "1", "exp": future()})
+
+    assert jose_jwt.decode(token, "test-secret", algorithms=["HS256"])["sub"] == "1"
+    assert codec.decode(token)["sub"] == "1"
+    assert codec.jwks() == {"keys": []}
+
+
+def test_hmac_codec_requires_secret():
+    with pytest.raises(ValueError):
+        TokenCodec("HS256", secret=None)
+
+
+def test_es256_codec_signs_with_kid_and_publishes_jwk(ec_pems):
+    private_pem, public_pem = ec_pems
+    codec = TokenCodec("ES256", private_pem=private_pem, kid="k1")
+
+    token = codec.encode({"sub": "1", "exp": future()})
+
+    assert jose_jwt.get_unverified_header(token) == {"alg": "ES256", "kid": "k1", "typ": "JWT"}
+    assert codec.decode(token)["sub"] == "1"
+
+    jwk = codec.jwks()["keys"][0]
+    assert jwk["kty"] == "EC" and jwk["crv"] == "P-256" and jwk["kid"] == "k1" and jwk["alg"] == "ES256"
+    # Другой сервис проверяет токен только по опубликованному JWK
+    assert jose_jwt.decode(token, jwk, algorithms=["ES256"])["sub"] == "1"
+
+
+def test_verify_only_codec(ec_pems):
+    private_pem, public_pem = ec_pems
+    signer = TokenCodec("ES256", private_pem=private_pem, kid="k1")
+    verifier = TokenCodec("ES256", public_pem=public_pem, kid="k1")
+
+    token = signer.encode({"sub": "1", "exp": future()})
+
+    assert verifier.decode(token)["sub"] == "1"
+    assert verifier.jwk == signer.jwk
+    with pytest.raises(ValueError):
+        verifier.encode({"sub": "1"})
+
+
+def test_decode_errors(ec_pems):
+    private_pem, _ = ec_pems
+    codec = TokenCodec("ES256", private_pem=private_pem)
+    other = TokenCodec("ES256", private_pem=ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+
+    with pytest.raises(TokenExpiredError):
+        codec.decode(codec.encode({"sub": "1", "exp": future(-1)}))
+    with pytest.raises(InvalidTokenError):
+        codec.decode(other.encode({"sub": "1", "exp": future()}))
+    with pytest.raises(InvalidTokenError):
+        codec.decode("not-a-token")
+
+
+@pytest.mark.skipif(keys.pyjwt is not None, reason="PyJWT supports EdDSA")
+def test_eddsa_requires_pyjwt(ec_pems):
+    with pytest.raises(ValueError):
+        TokenCodec("EdDSA", private_pem=ec_pems[0])
+
+
+def test_get_token_codec_is_cached():
+    keys.get_token_codec.cache_clear()
+
+    assert keys.get_token_codec("HS256", "a") is keys.get_token_codec("HS256", "a")
+    assert keys.get_token_codec("HS256", "a") is not keys.get_token_codec("HS256", "b")
@@ -0,0 +1,91 @@
+import ipaddress
+
+import pytest
+
+from types import SimpleNamespace
+from starlette.datastructures import Headers
+from fastapi import HTTPException, status
+
+from routers.auth.ident import limiter as limiter_module
+from routers.auth.ident.limiter import InMemoryRateLimitBackend, RateLimiter, check_login_limits, client_ip
+from routers.auth.ident.responses.http_errors import IdentErrorCode
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+async def test_bucket_allows_burst_then_rejects_with_retry_after(clock):
+    limiter = RateLimiter("test", limit=3, window=60, backend=InMemoryRateLimitBackend())
+
+    for _ in range(3):
+        await limiter.hit("alice")
+    with pytest.raises(HTTPException) as exc_info:
+        await limiter.hit("alice")
+
+    assert exc_info.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert exc_info.value.detail["code"] == IdentErrorCode.TOO_MANY_REQUESTS
+    assert exc_info.value.headers["Retry-After"] == "20"
+
+
+async def test_bucket_refills_over_time_and_keys_are_independent(clock):
+    limiter = RateLimiter("test", limit=1, window=10, backend=InMemoryRateLimitBackend())
+
+    await limiter.hit("alice")
+    await limiter.hit("bob")
+    clock[0] += 10
+    await limiter.hit("alice")
+
+
+async def test_in_memory_backend_is_bounded(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+
+    for key in ("a", "b", "c"):
+        await backend.take(key, capacity=1, refill_per_second=1)
+
+    assert len(backend) == 2
+
+
+async def test_login_is_rejected_before_hashing(clock, monkeypatch):
+    backend = InMemoryRateLimitBackend()
+    monkeypatch.setattr(limiter_module, "rate_limit_backend", backend)
+    monkeypatch.setattr(limiter_module.login_limiter, "limit", 1)
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+
+    await check_login_limits(request, "Alice")
+    with pytest.raises(HTTPException) as exc_info:
+        await check_login_limits(request, "alice")
+
+    assert exc_info.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def make_request(peer, **headers):
+    return SimpleNamespace(client=SimpleNamespace(host=peer), headers=Headers(headers))
+
+
+@pytest.mark.parametrize(
+    ("peer", "headers", "expected"),
+    [
+        ("172.18.0.5", {"x-forwarded-for": "203.0.113.7"}, "203.0.113.7"),
+        ("172.18.0.5", {"x-forwarded-for": "198.51.100.1, 203.0.113.7, 172.18.0.9"}, "203.0.113.7"),
+        ("172.18.0.5", {"x-real-ip": "203.0.113.8"}, "203.0.113.8"),
+        ("172.18.0.5", {}, "172.18.0.5"),
+        ("203.0.113.9", {"x-forwarded-for": "10.1.1.1"}, "203.0.113.9"),  # не прокси - заголовок подделан
+    ],
+)
+def test_client_ip_trusts_forwarded_headers_only_from_proxies(monkeypatch, peer, headers, expected):
+    monkeypatch.setattr(limiter_module, "_TRUSTED_NETWORKS", (ipaddress.ip_network("172.18.0.0/16"),))
+
+    assert client_ip(make_request(peer, **headers)) == expected
+
+
+def test_client_ip_ignores_forwarded_headers_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(limiter_module, "_TRUSTED_NETWORKS", ())
+
+    assert client_ip(make_request("172.18.0.5", **{"x-forwarded-for": "203.0.113.7"})) == "172.18.0.5"
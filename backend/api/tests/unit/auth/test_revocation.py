@@ -0,0 +1,45 @@
+import time
+
+from routers.auth.ident.revocation import BloomFilter, RevocationSet
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_set_respects_expiry():
+    revoked = RevocationSet(capacity=10, error_rate=0.01)
+    now = time.time()
+
+    revoked.add("live", now + 60)
+    revoked.add("expired", now - 1)
+
+    assert "live" in revoked
+    assert "expired" not in revoked
+    assert "unknown" not in revoked
+    assert len(revoked) == 1
+
+
+def test_revocation_set_purges_and_grows_over_capacity(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("routers.auth.ident.revocation.time.time", lambda: now[0])
+    revoked = RevocationSet(capacity=2, error_rate=0.01)
+
+    revoked.add("a", 1001)
+    revoked.add("b", 1100)
+    now[0] = 1050
+    revoked.add("c", 1100)
+
+    assert len(revoked) == 2
+    assert revoked.capacity == 4
+    assert "a" not in revoked
+    assert "b" in revoked and "c" in revoked
+
+    revoked.add("d", 1100)
+    assert all(jti in revoked for jti in ("b", "c", "d"))
@@ -0,0 +1,95 @@
+import pytest
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from routers.auth.ident import service as service_module
+from routers.auth.ident.service import AuthRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def session():
+    session = Mock()
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    session.savepoint_rollbacks = 0
+
+    @asynccontextmanager
+    async def savepoint():
+        try:
+            yield
+        except Exception:
+            session.savepoint_rollbacks += 1
+            raise
+
+    session.begin_nested = Mock(side_effect=savepoint)
+    return session
+
+
+@pytest.fixture
+def auth_repo(session):
+    return AuthRepository(session)
+
+
+@pytest.fixture
+def user_repository(auth_repo, monkeypatch):
+    user = SimpleNamespace(id=5, password="old-hash")
+    monkeypatch.setattr(auth_repo.users, "find_one_or_none_by_login", AsyncMock(return_value=user))
+    update_mock = AsyncMock()
+    monkeypatch.setattr(auth_repo.users, "update_password_hash", update_mock)
+    return user, update_mock
+
+
+async def test_authenticate_user_persists_rehashed_password(auth_repo, user_repository, monkeypatch):
+    user, update_mock = user_repository
+    monkeypatch.setattr(service_module, "verify_and_update_password_async", AsyncMock(return_value=(True, "new-hash")))
+
+    result = await auth_repo.authenticate_user("alice", "test-pass1")
+
+    assert result is user
+    assert user.password == "new-hash"
+    update_mock.assert_awaited_once_with(5, "new-hash")
+
+
+async def test_authenticate_user_keeps_up_to_date_hash(auth_repo, user_repository, monkeypatch):
+    user, update_mock = user_repository
+    monkeypatch.setattr(service_module, "verify_and_update_password_async", AsyncMock(return_value=(True, None)))
+
+    assert await auth_repo.authenticate_user("alice", "test-pass1") is user
+    update_mock.assert_not_awaited()
+
+
+async def test_authenticate_user_rejects_wrong_password(auth_repo, user_repository, monkeypatch):
+    _, update_mock = user_repository
+    monkeypatch.setattr(service_module, "verify_and_update_password_async", AsyncMock(return_value=(False, None)))
+
+    assert await auth_repo.authenticate_user("alice", "wrong-password") is None
+    update_mock.assert_not_awaited()
+
+
+async def test_authenticate_user_releases_connection_before_hashing(auth_repo, user_repository, session, monkeypatch):
+    async def verify(**kwargs):
+        # Читающая транзакция завершена до проверки пароля
+        session.commit.assert_awaited_once()
+        return True, None
+
+    monkeypatch.setattr(service_module, "verify_and_update_password_async", verify)
+
+    await auth_repo.authenticate_user("alice", "test-pass1")
+
+    session.expunge.assert_called_once()
+
+
+async def test_authenticate_user_survives_failed_rehash(auth_repo, user_repository, session, monkeypatch):
+    user, update_mock = user_repository
+    update_mock.side_effect = RuntimeError("db down")
+    monkeypatch.setattr(service_module, "verify_and_update_password_async", AsyncMock(return_value=(True, "new-hash")))
+
+    assert await auth_repo.authenticate_user("alice", "test-pass1") is user
+    assert user.password == "old-hash"
+    assert session.savepoint_rollbacks == 1
+    session.rollback.assert_not_awaited()
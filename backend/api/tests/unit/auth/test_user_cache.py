@@ -0,0 +1,127 @@
+import pytest
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import database
+from routers.auth.ident import jwt as jwt_module
+from routers.auth.ident import cache as cache_module
+from routers.auth.ident.cache import UserCache, invalidate_after_commit
+from routers.auth.ident.dependencies import get_current_user
+from routers.auth.ident.jwt import JWTService
+from routers.auth.user.roles import UserRole
+from routers.auth.user.schemas import UserInfo
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = UserCache(max_size=8, ttl=60)
+    monkeypatch.setattr(jwt_module, "user_cache", cache)
+    monkeypatch.setattr(jwt_module, "SECRET_KEY_JWT", "test-secret")
+    monkeypatch.setattr(jwt_module, "ALGORITHM", "HS256")
+    return cache
+
+
+def make_user_info(user_id: int = 7, role: UserRole = UserRole.user) -> UserInfo:
+    return UserInfo(id=user_id, login=f"user{user_id}", role=role, password="hash", create_date=datetime(2026, 1, 1))
+
+
+async def test_get_user_info_hits_database_once_per_token(cache):
+    user = SimpleNamespace(**make_user_info().model_dump())
+    lookup_mock = AsyncMock(return_value=user)
+    user_repo = SimpleNamespace(find_one_or_none_by_id=lookup_mock)
+    token = JWTService.create_access_token({"sub": "7"})
+
+    first = await JWTService.get_user_info(token, user_repo)
+    second = await JWTService.get_user_info(token, user_repo)
+
+    assert first == second == make_user_info()
+    lookup_mock.assert_awaited_once_with(7)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_get_user_info_caches_per_token_jti(cache):
+    lookup_mock = AsyncMock(return_value=SimpleNamespace(**make_user_info().model_dump()))
+    user_repo = SimpleNamespace(find_one_or_none_by_id=lookup_mock)
+
+    await JWTService.get_user_info(JWTService.create_access_token({"sub": "7"}), user_repo)
+    await JWTService.get_user_info(JWTService.create_access_token({"sub": "7"}), user_repo)
+
+    assert lookup_mock.await_count == 2
+
+
+@pytest.mark.parametrize("replica", [False, True])
+async def test_get_current_user_releases_primary_only_with_replica(cache, monkeypatch, replica):
+    if replica:
+        monkeypatch.setattr(database, "read_engine", Mock())
+    session = Mock(in_transaction=Mock(return_value=True), commit=AsyncMock())
+    user_repo = SimpleNamespace(
+        session=session, find_one_or_none_by_id=AsyncMock(return_value=SimpleNamespace(**make_user_info().model_dump())),
+    )
+    credentials = SimpleNamespace(credentials=JWTService.create_access_token({"sub": "7"}))
+
+    assert await get_current_user(credentials, user_repo) == make_user_info()
+
+    # без реплики сессию дальше использует get_read_db, с репликой соединение primary возвращается в пул
+    assert session.commit.await_count == int(replica)
+
+
+def test_invalidate_drops_every_token_of_user():
+    cache = UserCache(max_size=8, ttl=60)
+    cache.put(7, "a", make_user_info(7))
+    cache.put(7, "b", make_user_info(7))
+    cache.put(8, "c", make_user_info(8))
+
+    cache.invalidate(7)
+
+    assert cache.get(7, "a") is None
+    assert cache.get(7, "b") is None
+    assert cache.get(8, "c") == make_user_info(8)
+
+
+def test_entries_expire_and_size_is_bounded(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("routers.auth.ident.cache.time.monotonic", lambda: now[0])
+    cache = UserCache(max_size=2, ttl=10)
+
+    for user_id in (1, 2, 3):
+        cache.put(user_id, None, make_user_info(user_id))
+
+    assert len(cache) == 2
+    assert cache.get(1) is None
+    assert cache.get(3) == make_user_info(3)
+
+    now[0] += 10
+    assert cache.get(3) is None
+    assert len(cache) == 1
+
+
+def test_invalidate_after_commit_waits_for_commit(monkeypatch):
+    cache = UserCache(max_size=8, ttl=60)
+    monkeypatch.setattr(cache_module, "user_cache", cache)
+    cache.put(7, "a", make_user_info(7))
+    session = SimpleNamespace(info={})
+
+    invalidate_after_commit(session, 7)
+    assert cache.get(7, "a") == make_user_info(7)
+
+    cache_module._invalidate_committed(session)
+    assert cache.get(7, "a") is None
+    assert session.info == {}
+
+
+def test_invalidate_after_commit_is_discarded_on_rollback(monkeypatch):
+    cache = UserCache(max_size=8, ttl=60)
+    monkeypatch.setattr(cache_module, "user_cache", cache)
+    cache.put(7, "a", make_user_info(7))
+    session = SimpleNamespace(info={})
+
+    invalidate_after_commit(session, 7)
+    cache_module._discard_rolled_back(session)
+    cache_module._invalidate_committed(session)
+
+    assert cache.get(7, "a") == make_user_info(7)
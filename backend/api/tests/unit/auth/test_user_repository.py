@@ -0,0 +1,87 @@
+import pytest
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+from routers.auth.user import service as service_module
+from routers.auth.user.schemas import AboutMeCreate, UserUpdate
+from routers.auth.user.service import UserRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def session():
+    session = Mock()
+    session.get = AsyncMock()
+    session.execute = AsyncMock()
+    session.flush = AsyncMock()
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    session.info = {}
+
+    @asynccontextmanager
+    async def savepoint():
+        yield  # SAVEPOINT сбрасывает изменения (flush) при выходе
+        await session.flush()
+
+    session.begin_nested = Mock(side_effect=savepoint)
+    return session
+
+
+async def test_update_user_mutates_and_flushes_in_request_session(session, monkeypatch):
+    user = SimpleNamespace(id=7, login="old", password="hash", update_time=None)
+    session.get.return_value = user
+    monkeypatch.setattr(service_module, "get_password_hash_async", AsyncMock(return_value="new-hash"))
+
+    await UserRepository(session).update_user(UserUpdate(login="new", password="secret1"), 7)
+
+    assert (user.login, user.password) == ("new", "new-hash")
+    assert user.update_time is not None
+    session.get.assert_awaited_once()
+    session.begin_nested.assert_called_once()
+    session.flush.assert_awaited_once()
+    # Commit делает get_db, кэш сбрасывается после него
+    session.commit.assert_not_awaited()
+    session.add.assert_not_called()
+    assert session.info["user_cache_invalidate"] == {7}
+
+
+async def test_update_aboutme_rejects_missing_user(session):
+    session.get.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await UserRepository(session).update_aboutme(7, AboutMeCreate(about_me="hi"))
+
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+    session.commit.assert_not_awaited()
+
+
+async def test_create_user_hashes_before_touching_session(session, monkeypatch):
+    async def fake_hash(password):
+        session.add.assert_not_called()
+        return "hashed"
+
+    monkeypatch.setattr(service_module, "get_password_hash_async", fake_hash)
+    data = SimpleNamespace(login="alice", password="test-pass1")
+
+    assert await UserRepository(session).create_user(data) == "alice"
+    assert session.add.call_args.args[0].password == "hashed"
+    session.flush.assert_awaited_once()
+
+
+async def test_create_user_conflict_keeps_request_transaction(session, monkeypatch):
+    monkeypatch.setattr(service_module, "get_password_hash_async", AsyncMock(return_value="hashed"))
+    session.flush.side_effect = IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await UserRepository(session).create_user(SimpleNamespace(login="alice", password="test-pass1"))
+
+    assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+    # Откатывается только SAVEPOINT вставки, остальное в сессии запроса остаётся
+    session.rollback.assert_not_awaited()
@@ -1,6 +1,19 @@
+import asyncio
+import threading
+
 import pytest
+from fastapi import HTTPException, status
 
-from routers.auth.ident.utils import get_password_hash, verify_password
+from routers.auth.ident.responses.http_errors import IdentErrorCode
+from routers.auth.ident.utils import (
+    PasswordHashPool,
+    build_crypt_context,
+    check_password_backends,
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
 
 
 def test_password_hashing():
@@ -10,3 +23,56 @@ def test_password_hashing():
     
     assert verify_password(password, hashed) is True
     assert verify_password("wrong-password", hashed) is False
+
+
+@pytest.mark.anyio
+async def test_async_password_hashing():
+    hashed = await get_password_hash_async("test-pass1")
+
+    assert await verify_password_async("test-pass1", hashed) is True
+    assert await verify_password_async("wrong-password", hashed) is False
+
+
+@pytest.mark.anyio
+async def test_password_hash_pool_rejects_when_queue_is_full():
+    pool = PasswordHashPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    assert (pool.running, pool.queued) == (1, 1)
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*running)
+    pool.shutdown()
+
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.detail["code"] == IdentErrorCode.SERVICE_BUSY
+    assert pool.stats()["completed"] == 2
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["peak_in_flight"] == 2
+
+
+def test_verify_and_update_rehashes_when_cost_changes():
+    old_context = build_crypt_context(["bcrypt"], bcrypt_rounds=5)
+    new_context = build_crypt_context(["bcrypt"], bcrypt_rounds=4)
+    hashed = old_context.hash("test-pass1")
+
+    verified, new_hash = new_context.verify_and_update("test-pass1", hashed)
+    wrong, no_hash = new_context.verify_and_update("wrong-password", hashed)
+
+    assert verified is True
+    assert new_hash.startswith("$2b$04$")
+    assert new_context.verify_and_update("test-pass1", new_hash) == (True, None)
+    assert (wrong, no_hash) == (False, None)
+
+
+def test_check_password_backends_fails_fast_without_backend(monkeypatch):
+    context = build_crypt_context(["argon2", "bcrypt"])
+    monkeypatch.setattr(context.handler("argon2"), "has_backend", lambda *args: False)
+
+    with pytest.raises(RuntimeError, match="argon2"):
+        check_password_backends(context)
+    check_password_backends(build_crypt_context(["bcrypt"]))
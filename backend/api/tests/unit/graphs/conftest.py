@@ -0,0 +1,19 @@
+from contextlib import asynccontextmanager
+from unittest.mock import Mock
+
+import pytest
+
+
+@pytest.fixture
+def make_pool():
+    """Factory of fake asyncpg pools whose ``acquire()`` yields the given connection."""
+    def factory(conn):
+        pool = Mock()
+
+        @asynccontextmanager
+        async def acquire():
+            yield conn
+
+        pool.acquire = acquire
+        return pool
+    return factory
@@ -0,0 +1,41 @@
+import pytest
+
+from routers.graphs import agtype
+from routers.graphs.agtype import decode_agtype, strip_annotations
+
+
+def test_decode_vertex():
+    assert decode_agtype('{"id": 3, "label": "Skill", "properties": {"value": 5}}::vertex') == {
+        "id": 3, "label": "Skill", "properties": {"value": 5},
+    }
+
+
+def test_decode_path_with_nested_annotations():
+    value = '[{"id": 1}::vertex, {"id": 10, "start_id": 1, "end_id": 2}::edge, {"id": 2}::vertex]::path'
+
+    assert decode_agtype(value) == [{"id": 1}, {"id": 10, "start_id": 1, "end_id": 2}, {"id": 2}]
+
+
+def test_decode_numeric_and_scalars():
+    assert decode_agtype("1.5::numeric") == 1.5
+    assert decode_agtype("844424930131969") == 844424930131969
+    assert decode_agtype('"Python"') == "Python"
+    assert decode_agtype("null") is None
+
+
+def test_annotation_like_text_inside_strings_is_kept():
+    value = '{"name": "C++::vertex", "id": 1}::vertex'
+
+    assert decode_agtype(value) == {"name": "C++::vertex", "id": 1}
+    assert strip_annotations('["a\\"::edge", 1::numeric]') == '["a\\"::edge", 1]'
+
+
+def test_non_string_and_invalid_values():
+    assert decode_agtype(None) is None
+    assert decode_agtype(7) == 7
+    assert decode_agtype("not-json::vertex") == "not-json"
+
+
+@pytest.mark.skipif(agtype.orjson is None, reason="orjson is not installed")
+def test_orjson_falls_back_for_special_floats():
+    assert decode_agtype("NaN") != decode_agtype("NaN")
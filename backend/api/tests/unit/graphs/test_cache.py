@@ -0,0 +1,90 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from routers.graphs.cache import GraphCache
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def versions_pool(make_pool):
+    """Factory of a fake pool whose connection returns the given graph versions."""
+    def factory(versions: dict):
+        conn = Mock()
+        conn.fetch = AsyncMock(side_effect=lambda *args: [
+            {"profession_id": pid, "version": version} for pid, version in versions.items()
+        ])
+        return make_pool(conn), conn
+    return factory
+
+
+async def test_get_or_load_serves_second_lookup_from_cache(versions_pool):
+    pool, _ = versions_pool({1: 1})
+    cache = GraphCache(max_size=4, version_ttl=60)
+    loader = AsyncMock(return_value=("nodes", "rels"))
+
+    first = await cache.get_or_load(pool, 1, loader)
+    second = await cache.get_or_load(pool, 1, loader)
+
+    assert first == second == ("nodes", "rels")
+    loader.assert_awaited_once()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_version_bump_invalidates_only_changed_profession(versions_pool):
+    versions = {1: 1, 2: 1}
+    pool, _ = versions_pool(versions)
+    cache = GraphCache(max_size=4, version_ttl=0)
+    await cache.get_or_load(pool, 1, AsyncMock(return_value="graph-1"))
+    await cache.get_or_load(pool, 2, AsyncMock(return_value="graph-2"))
+
+    versions[1] = 2
+    reload_first = AsyncMock(return_value="graph-1-new")
+    reload_second = AsyncMock(return_value="graph-2-new")
+
+    assert await cache.get_or_load(pool, 1, reload_first) == "graph-1-new"
+    assert await cache.get_or_load(pool, 2, reload_second) == "graph-2"
+    reload_second.assert_not_awaited()
+
+
+async def test_versions_are_not_rechecked_within_ttl(versions_pool):
+    pool, conn = versions_pool({1: 1})
+    cache = GraphCache(max_size=4, version_ttl=60)
+
+    for _ in range(3):
+        await cache.get_or_load(pool, 1, AsyncMock(return_value="graph"))
+
+    conn.fetch.assert_awaited_once()
+
+
+async def test_lru_eviction_respects_max_size(versions_pool):
+    pool, _ = versions_pool({})
+    cache = GraphCache(max_size=2, version_ttl=60)
+
+    for profession_id in (1, 2, 1, 3):
+        await cache.get_or_load(pool, profession_id, AsyncMock(return_value=profession_id))
+
+    assert len(cache) == 2
+    assert cache.get(1) == 1
+    assert cache.get(2) is None
+    assert cache.get(3) == 3
+
+
+async def test_concurrent_misses_share_one_load(versions_pool):
+    pool, _ = versions_pool({})
+    cache = GraphCache(max_size=4, version_ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "graph"
+
+    results = await asyncio.gather(*(cache.get_or_load(pool, 1, loader) for _ in range(5)))
+
+    assert results == ["graph"] * 5
+    assert calls == 1
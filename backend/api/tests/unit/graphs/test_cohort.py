@@ -0,0 +1,79 @@
+import numpy as np
+
+from routers.graphs.cohort import CohortOverlay
+from routers.graphs.tree import CompiledProfessionTree
+
+
+def make_tree():
+    nodes = [
+        {"id": 1, "label": "Profession", "properties": {"name": "Backend", "value": 0}},
+        {"id": 2, "label": "Category", "properties": {"name": "Python", "value": 0}},
+        {"id": 3, "label": "Skill", "properties": {"name": "FastAPI", "skill_id": 101, "value": 5}},
+        {"id": 4, "label": "Skill", "properties": {"name": "SQLAlchemy", "skill_id": 102, "value": 5}},
+        {"id": 5, "label": "Category", "properties": {"name": "Databases", "value": 0}},
+        {"id": 6, "label": "Skill", "properties": {"name": "PostgreSQL", "skill_id": 103, "value": 10}},
+    ]
+    relationships = [
+        {"from": 1, "to": 2}, {"from": 2, "to": 3}, {"from": 2, "to": 4},
+        {"from": 1, "to": 5}, {"from": 5, "to": 6},
+    ]
+    return CompiledProfessionTree.compile(nodes, relationships)
+
+
+def make_overlay():
+    rows = [
+        (7, 101, 5), (7, 102, 10), (7, 103, 10),  # всё освоено (102 выше требуемого)
+        (8, 101, 2),                               # частично, остальное — серая зона
+        (42, 101, 5),                              # не из когорты — игнорируется
+    ]
+    return CohortOverlay(make_tree(), [9, 8, 7], rows)
+
+
+def test_overlay_builds_user_by_skill_matrix():
+    overlay = make_overlay()
+
+    assert overlay.user_ids.tolist() == [7, 8, 9]
+    assert overlay.skill_ids.tolist() == [101, 102, 103]
+    assert overlay.proficiency.tolist() == [[5, 10, 10], [2, 0, 0], [0, 0, 0]]
+    assert overlay.has_skill.sum() == 4
+
+
+def test_user_percent_is_weighted_and_capped_by_required_level():
+    overlay = make_overlay()
+
+    assert overlay.user_percent().tolist() == [100.0, 10.0, 0.0]
+    assert overlay.user_gray_zone().tolist() == [0, 2, 3]
+
+
+def test_category_rollups_and_aggregates():
+    result = make_overlay().export(offset=1, limit=1)
+
+    assert result["aggregates"]["users"] == 3
+    assert result["aggregates"]["complete_users"] == 1
+    assert result["aggregates"]["percent_median"] == 10.0
+    assert result["categories"][0] == {"name": "Python", "skills": 2, "percent": 40.0, "gray_zone": 0.5}
+    assert result["categories"][1]["name"] == "Databases"
+    assert result["total"] == 3
+    assert result["users"] == [
+        {"user_id": 8, "percent": 10.0, "gray_zone": 2, "categories": {"Python": 20.0, "Databases": 0.0}}
+    ]
+
+
+def test_overlay_handles_empty_cohort_and_shared_skills():
+    tree = make_tree()
+    empty = CohortOverlay(tree, [], [])
+
+    assert empty.export()["aggregates"]["users"] == 0
+    assert empty.export()["users"] == []
+
+    nodes = [
+        {"id": 1, "label": "Profession", "properties": {"name": "P", "value": 0}},
+        {"id": 2, "label": "Category", "properties": {"name": "A", "value": 0}},
+        {"id": 3, "label": "Category", "properties": {"name": "B", "value": 0}},
+        {"id": 4, "label": "Skill", "properties": {"name": "S", "skill_id": 1, "value": 4}},
+    ]
+    relationships = [{"from": 1, "to": 2}, {"from": 1, "to": 3}, {"from": 2, "to": 4}, {"from": 3, "to": 4}]
+    shared = CohortOverlay(CompiledProfessionTree.compile(nodes, relationships), [1], [(1, 1, 2)])
+
+    assert np.array_equal(shared.proficiency, [[2, 2]])
+    assert shared.category_names == ["A", "B"]
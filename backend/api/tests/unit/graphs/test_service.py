@@ -1,5 +1,8 @@
+import json
 from datetime import date
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
+
+import pytest
 
 from routers.graphs.service import GraphImporter, GraphStatusExporter, get_user_skills_from_db
 
@@ -51,6 +54,52 @@ def test_parse_agtype_returns_original_value_for_non_json_string():
     assert result == "not-json"
 
 
+def make_graph_rows(nodes, relationships):
+    """Rows of the single projected query: id, label, name, skill_id, value, children ids"""
+    rows = []
+    for node in nodes:
+        props = node["properties"]
+        children = [rel["to"] for rel in relationships if rel["from"] == node["id"]]
+        rows.append((
+            str(node["id"]),
+            json.dumps(node["label"]),
+            json.dumps(props.get("name")),
+            json.dumps(props["skill_id"]) if "skill_id" in props else None,
+            json.dumps(props.get("value")),
+            json.dumps(children),
+        ))
+    return rows
+
+
+@pytest.mark.anyio
+async def test_get_nodes_and_relationships_fetches_graph_in_one_parametrized_query(make_pool):
+    nodes, relationships = make_graph_data()
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=make_graph_rows(nodes, relationships))
+    importer = GraphImporter(make_pool(conn))
+
+    result_nodes, result_relationships = await importer.get_nodes_and_relationships(1)
+
+    assert result_nodes == nodes
+    assert result_relationships == relationships
+    conn.fetch.assert_awaited_once()
+    sql, params = conn.fetch.await_args.args
+    assert "$profession_id" in sql
+    assert json.loads(params) == {"profession_id": 1}
+
+
+@pytest.mark.anyio
+async def test_get_nodes_and_relationships_skips_missing_properties(make_pool):
+    conn = Mock()
+    conn.fetch = AsyncMock(return_value=[("5", '"Category"', '"Python"', None, "null", "[]")])
+    importer = GraphImporter(make_pool(conn))
+
+    nodes, relationships = await importer.get_nodes_and_relationships(1)
+
+    assert nodes == [{"id": 5, "label": "Category", "properties": {"name": "Python"}}]
+    assert relationships == []
+
+
 def test_export_by_status_groups_known_and_missing_skills():
     nodes, relationships = make_graph_data()
     exporter = GraphStatusExporter(
@@ -103,9 +152,10 @@ def test_export_builds_nested_hierarchy_with_user_progress():
     assert result["Backend"]["Python"]["SQLAlchemy"]["percent"] == 50.0
 
 
-def test_get_user_skills_from_db_builds_dict_with_iso_dates():
-    cursor = Mock()
-    cursor.fetchall.return_value = [
+@pytest.mark.anyio
+async def test_get_user_skills_from_db_builds_dict_with_iso_dates():
+    result = Mock()
+    result.mappings.return_value.all.return_value = [
         {
             "id_skill": 101,
             "skill_name": "FastAPI",
@@ -116,11 +166,14 @@ def test_get_user_skills_from_db_builds_dict_with_iso_dates():
             "end_date": None,
         }
     ]
+    session = Mock(execute=AsyncMock(return_value=result))
 
-    result = get_user_skills_from_db(7, cursor)
+    user_skills = await get_user_skills_from_db(7, session)
 
-    cursor.execute.assert_called_once()
-    assert result == {
+    # через сессию get_read_db (учитывает read_primary), а не через пул графа
+    session.execute.assert_awaited_once()
+    assert session.execute.await_args.args[1] == {"user_id": 7}
+    assert user_skills == {
         101: {
             "skill_name": "FastAPI",
             "proficiency": 4,
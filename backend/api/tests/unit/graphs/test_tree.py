@@ -0,0 +1,66 @@
+from routers.graphs.tree import CompiledProfessionTree, NO_PARENT, NO_SKILL
+
+
+def vertex(vertex_id, label, name, **props):
+    return {"id": vertex_id, "label": label, "properties": {"name": name, **props}}
+
+
+def contains(from_id, to_id):
+    return {"from": from_id, "to": to_id, "type": "CONTAINS"}
+
+
+def make_tree():
+    nodes = [
+        vertex(1, "Profession", "Backend", value=0),
+        vertex(2, "Category", "Python", value=0),
+        vertex(3, "Skill", "FastAPI", skill_id=101, value=5),
+        vertex(4, "Skill", "SQLAlchemy", skill_id=102, value=4),
+        vertex(5, "Category", "Databases", value=0),
+    ]
+    relationships = [contains(1, 2), contains(2, 3), contains(2, 4), contains(1, 5), contains(5, 4)]
+    return CompiledProfessionTree.compile(nodes, relationships)
+
+
+def test_compile_lays_out_slots_in_preorder_with_csr_children():
+    tree = make_tree()
+
+    assert tree.names == ("Backend", "Python", "FastAPI", "SQLAlchemy", "Databases", "SQLAlchemy")
+    assert list(tree.parents) == [NO_PARENT, 0, 1, 1, 0, 4]
+    assert list(tree.children_of(0)) == [1, 4]
+    assert list(tree.children_of(1)) == [2, 3]
+    assert list(tree.children_of(2)) == []
+    assert list(tree.skill_ids) == [NO_SKILL, NO_SKILL, 101, 102, NO_SKILL, 102]
+    assert list(tree.skill_slots) == [2, 3, 5]
+
+
+def test_export_repeats_shared_vertex_under_every_parent():
+    result = make_tree().export({"SQLAlchemy": 2})
+
+    assert result["Backend"]["Python"]["SQLAlchemy"]["percent"] == 50.0
+    assert result["Backend"]["Databases"]["SQLAlchemy"]["user_proficiency"] == 2
+
+
+def test_export_by_status_is_linear_over_skill_slots():
+    result = make_tree().export_by_status({
+        102: {"proficiency": 1, "status": "complete", "priority": None, "start_date": None, "end_date": None},
+    })
+
+    assert [skill["name"] for skill in result["complete"]] == ["SQLAlchemy", "SQLAlchemy"]
+    assert result["gray_zone"] == [{"name": "FastAPI", "count": 5}]
+
+
+def test_compile_handles_deep_chains_and_cycles_without_recursion():
+    depth = 5000
+    nodes = [vertex(0, "Profession", "Deep", value=0)]
+    nodes += [vertex(i, "Category", f"level-{i}", value=0) for i in range(1, depth)]
+    relationships = [contains(i, i + 1) for i in range(depth - 1)]
+    relationships.append(contains(depth - 1, 0))
+
+    tree = CompiledProfessionTree.compile(nodes, relationships)
+    result = tree.export()
+
+    assert len(tree) == depth
+    entry = result["Deep"]
+    for i in range(1, depth):
+        entry = entry[f"level-{i}"]
+    assert "Deep" not in entry
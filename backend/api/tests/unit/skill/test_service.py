@@ -0,0 +1,158 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from routers.skill.enums import OnConflict, UserSkillStatus
+from routers.skill.models import Skill, UserSkill
+from routers.skill.schemas import UserSkillBatchItem, UserSkillCreate
+from routers.skill.service import SkillRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+def make_skill_create(skill_id: int, proficiency: int = 3) -> UserSkillCreate:
+    return UserSkillCreate(
+        id_skill=skill_id,
+        proficiency=proficiency,
+        start_date=datetime(2026, 4, 6, 12, 0, tzinfo=timezone.utc),
+        end_date=datetime(2026, 5, 6, 12, 0),
+        status=UserSkillStatus.process,
+    )
+
+
+def scalars_result(items):
+    result = Mock()
+    result.all.return_value = items
+    return result
+
+
+@pytest.fixture
+def session():
+    session = Mock()
+    session.scalars = AsyncMock()
+    session.rollback = AsyncMock()
+    session.refresh = AsyncMock()
+    return session
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_create_user_skills_uses_one_insert_and_one_skill_select(session):
+    inserted = [UserSkill(id_user=7, id_skill=skill_id, proficiency=3) for skill_id in (1, 2)]
+    session.scalars.side_effect = [
+        scalars_result(inserted),
+        scalars_result([Skill(id=1, name="SQL"), Skill(id=2, name="Python")]),
+    ]
+    repository = SkillRepository(session)
+
+    result = await repository.create_user_skills(7, [make_skill_create(1), make_skill_create(2)])
+
+    assert result == inserted
+    assert [user_skill.name for user_skill in result] == ["SQL", "Python"]
+    assert session.scalars.await_count == 2
+    session.refresh.assert_not_awaited()
+
+    insert_sql = compiled(session.scalars.await_args_list[0].args[0])
+    assert insert_sql.startswith("INSERT INTO user_skills")
+    assert "ON CONFLICT" not in insert_sql
+    assert "RETURNING" in insert_sql
+    params = session.scalars.await_args_list[0].args[0].compile(dialect=postgresql.dialect()).params
+    assert params["start_date_m0"].tzinfo is None
+    assert params["id_user_m1"] == 7
+
+
+@pytest.mark.parametrize(
+    ("on_conflict", "clause"),
+    [
+        (OnConflict.skip, "ON CONFLICT (id_skill, id_user) DO NOTHING"),
+        (OnConflict.update, "ON CONFLICT (id_skill, id_user) DO UPDATE SET proficiency = excluded.proficiency"),
+    ],
+)
+def test_build_user_skills_insert_on_conflict(on_conflict, clause):
+    rows = [{"id_user": 7, "id_skill": 1, "proficiency": 3}]
+
+    assert clause in compiled(SkillRepository.build_user_skills_insert(rows, on_conflict))
+
+
+async def test_create_user_skills_update_keeps_last_duplicate(session):
+    session.scalars.side_effect = [scalars_result([]), scalars_result([])]
+    repository = SkillRepository(session)
+
+    result = await repository.create_user_skills(
+        7, [make_skill_create(1, proficiency=2), make_skill_create(1, proficiency=5)], OnConflict.update,
+    )
+
+    statement = session.scalars.await_args_list[0].args[0]
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert result == []
+    assert params["proficiency_m0"] == 5
+    assert "proficiency_m1" not in params
+    assert session.scalars.await_count == 1  # нет вставленных строк - нет SELECT навыков
+
+
+async def test_create_user_skills_conflict_fails_with_400(session):
+    session.scalars.side_effect = IntegrityError("INSERT", {}, Exception("duplicate key"))
+    repository = SkillRepository(session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await repository.create_user_skills(7, [make_skill_create(1)])
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    session.rollback.assert_awaited_once()
+
+
+async def test_bulk_upsert_user_skills_sends_column_arrays_in_one_statement(session):
+    result = Mock()
+    result.one.return_value = SimpleNamespace(updated=1, inserted=1, skipped=[{"id_user": 8, "id_skill": 3}])
+    session.execute = AsyncMock(return_value=result)
+    repository = SkillRepository(session)
+    items = [
+        UserSkillBatchItem(id_user=7, id_skill=1, proficiency=2),
+        UserSkillBatchItem(id_user=7, id_skill=1, proficiency=4, status=UserSkillStatus.complete,
+                           end_date=datetime(2026, 5, 6, 12, 0, tzinfo=timezone.utc)),
+        UserSkillBatchItem(id_user=7, id_skill=2, priority=1),
+        UserSkillBatchItem(id_user=8, id_skill=3, status=UserSkillStatus.process),
+    ]
+
+    summary = await repository.bulk_upsert_user_skills(items)
+
+    session.execute.assert_awaited_once()
+    statement, params = session.execute.await_args.args
+    assert "unnest(" in str(statement)
+    assert params["id_user"] == [7, 7, 8]
+    assert params["id_skill"] == [1, 2, 3]
+    assert params["proficiency"] == [4, None, None]
+    assert params["status"] == ["complete", None, "process"]
+    assert params["end_date"][0] == datetime(2026, 5, 6, 12, 0)
+    assert summary.model_dump() == {
+        "received": 4, "updated": 1, "inserted": 1, "skipped": [{"id_user": 8, "id_skill": 3}],
+    }
+
+
+async def test_bulk_upsert_user_skills_empty_batch_does_not_query(session):
+    session.execute = AsyncMock()
+    repository = SkillRepository(session)
+
+    summary = await repository.bulk_upsert_user_skills([])
+
+    assert summary.updated == summary.inserted == 0
+    session.execute.assert_not_awaited()
+
+
+async def test_bulk_upsert_user_skills_invalid_skill_fails_with_400(session):
+    session.execute = AsyncMock(side_effect=IntegrityError("INSERT", {}, Exception("foreign key")))
+    repository = SkillRepository(session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await repository.bulk_upsert_user_skills([UserSkillBatchItem(id_user=7, id_skill=999, proficiency=1)])
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+    session.rollback.assert_awaited_once()
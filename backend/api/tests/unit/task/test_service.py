@@ -12,17 +12,12 @@ from routers.task.service import TaskRepository
 pytestmark = pytest.mark.anyio
 
 
-@pytest.fixture
-def anyio_backend():
-    return "asyncio"
-
-
 @pytest.fixture
 def session():
     session = Mock()
     session.add = Mock()
     session.execute = AsyncMock()
-    session.commit = AsyncMock()
+    session.flush = AsyncMock()
     session.refresh = AsyncMock()
     session.delete = AsyncMock()
     return session
@@ -80,7 +75,7 @@ async def test_create_task_for_self_normalizes_naive_datetime(session):
     assert added_task.end_time is None
     assert result.id == 123
     assert result.title == "Write tests"
-    session.commit.assert_awaited_once()
+    session.flush.assert_awaited_once()
     session.refresh.assert_awaited_once_with(added_task)
 
 
@@ -120,7 +115,7 @@ async def test_update_task_updates_only_provided_fields(session, monkeypatch):
     assert task.description == "Initial description"
     assert task.status == "pending"
     assert result.title == "Updated title"
-    session.commit.assert_awaited_once()
+    session.flush.assert_awaited_once()
     session.refresh.assert_awaited_once_with(task)
 
 
@@ -133,7 +128,7 @@ async def test_update_task_raises_404_when_task_not_found(session, monkeypatch):
 
     assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
     assert exc_info.value.detail == "Task not found"
-    session.commit.assert_not_awaited()
+    session.flush.assert_not_awaited()
     session.refresh.assert_not_awaited()
 
 
@@ -145,7 +140,7 @@ async def test_delete_task_deletes_existing_task(session, monkeypatch):
     await repository.delete_task(1)
 
     session.delete.assert_awaited_once_with(task)
-    session.commit.assert_awaited_once()
+    session.flush.assert_awaited_once()
 
 
 async def test_delete_task_raises_404_when_task_not_found(session, monkeypatch):
@@ -158,4 +153,4 @@ async def test_delete_task_raises_404_when_task_not_found(session, monkeypatch):
     assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
     assert exc_info.value.detail == "Task not found"
     session.delete.assert_not_awaited()
-    session.commit.assert_not_awaited()
+    session.flush.assert_not_awaited()
@@ -0,0 +1,222 @@
+import pytest
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from fastapi import Response
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import database
+from database import (
+    MeteredQueuePool,
+    PoolMetrics,
+    apply_statement_timeout,
+    get_read_db,
+    pool_stats,
+    read_your_writes,
+    statement_timeout,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+def make_pool(monkeypatch, connect):
+    monkeypatch.setattr(AsyncAdaptedQueuePool, "connect", connect)
+    return MeteredQueuePool(creator=Mock(), pool_size=2, max_overflow=1)
+
+
+def test_pool_records_checkout_wait_and_peaks(monkeypatch):
+    pool = make_pool(monkeypatch, lambda self: "connection")
+    monkeypatch.setattr(pool, "checkedout", lambda: 3)
+    monkeypatch.setattr(pool, "overflow", lambda: 1)
+
+    assert pool.connect() == "connection"
+    assert pool.connect() == "connection"
+
+    metrics = pool.metrics
+    assert metrics.checkouts == 2
+    assert (metrics.peak_checked_out, metrics.peak_overflow) == (3, 1)
+    assert metrics.max_wait_seconds >= 0
+
+
+def test_pool_counts_checkout_timeouts(monkeypatch):
+    def connect(self):
+        raise exc.TimeoutError("QueuePool limit reached")
+
+    pool = make_pool(monkeypatch, connect)
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    assert (pool.metrics.timeouts, pool.metrics.checkouts) == (1, 0)
+
+
+def test_pool_metrics_survive_recreate():
+    pool = MeteredQueuePool(creator=Mock(), pool_size=2, max_overflow=1)
+    pool.metrics.checkouts = 5
+
+    assert pool.recreate().metrics.checkouts == 5
+
+
+def test_pool_stats_reports_averages(monkeypatch):
+    metrics = PoolMetrics()
+    metrics.checkouts, metrics.wait_seconds, metrics.max_wait_seconds = 4, 0.02, 0.01
+    pool = SimpleNamespace(
+        metrics=metrics, size=lambda: 20, checkedin=lambda: 3, checkedout=lambda: 2, overflow=lambda: -15,
+    )
+    monkeypatch.setattr(database, "engine", SimpleNamespace(pool=pool))
+
+    stats = pool_stats()
+
+    assert stats["avg_wait_ms"] == 5.0
+    assert stats["max_wait_ms"] == 10.0
+    assert stats["overflow"] == 0
+
+
+async def test_statement_timeout_is_applied_at_transaction_begin():
+    session = SimpleNamespace(info={})
+    await statement_timeout(1500)(db=session)
+    connection = Mock()
+
+    apply_statement_timeout(session, None, connection)
+
+    assert str(connection.execute.call_args.args[0]) == "SET LOCAL statement_timeout = 1500"
+
+
+def test_statement_timeout_is_not_set_by_default():
+    connection = Mock()
+
+    apply_statement_timeout(SimpleNamespace(info={}), None, connection)
+
+    connection.execute.assert_not_called()
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    primary, replica = Mock(close=AsyncMock()), Mock(close=AsyncMock())
+    monkeypatch.setattr(database, "new_primary_read_session", lambda: primary)
+    monkeypatch.setattr(database, "new_read_session", lambda: replica)
+    return primary, replica
+
+
+@pytest.mark.parametrize(
+    ("method", "cookies", "expected"),
+    [("GET", {}, "replica"), ("POST", {}, "replica"), ("POST", {"read_primary": "1"}, "primary")],
+)
+async def test_get_read_db_routes_by_sticky_cookie(sessions, replica_enabled, method, cookies, expected):
+    primary, replica = sessions
+    dependency = get_read_db(SimpleNamespace(cookies=cookies, method=method), Mock())
+
+    session = await anext(dependency)
+    await dependency.aclose()
+
+    assert session is {"primary": primary, "replica": replica}[expected]
+    session.close.assert_awaited_once()
+
+
+@pytest.fixture
+def replica_enabled(monkeypatch):
+    monkeypatch.setattr(database, "read_engine", Mock())
+
+
+@pytest.mark.parametrize(
+    ("method", "status_code", "sticky"),
+    [("POST", 201, True), ("DELETE", 200, True), ("GET", 200, False), ("PUT", 400, False)],
+)
+async def test_read_your_writes_marks_successful_writes(replica_enabled, method, status_code, sticky):
+    async def call_next(request):
+        return Response(status_code=status_code)
+
+    response = await read_your_writes(SimpleNamespace(method=method), call_next)
+
+    assert ("read_primary=1" in response.headers.get("set-cookie", "")) is sticky
+
+
+async def test_read_your_writes_is_noop_without_replica():
+    async def call_next(request):
+        return Response(status_code=201)
+
+    response = await read_your_writes(SimpleNamespace(method="POST"), call_next)
+
+    assert "set-cookie" not in response.headers
+
+
+def test_read_sessions_begin_read_only_transactions():
+    for factory in (database.new_read_session, database.new_primary_read_session):
+        assert factory.kw["bind"].get_execution_options()["postgresql_readonly"] is True
+    assert "postgresql_readonly" not in database.new_session.kw["bind"].get_execution_options()
+
+
+async def test_get_read_db_never_commits(sessions, replica_enabled):
+    _, replica = sessions
+    dependency = get_read_db(SimpleNamespace(cookies={}, method="GET"), Mock())
+
+    await anext(dependency)
+    await dependency.aclose()
+
+    replica.commit.assert_not_called()
+
+
+@pytest.mark.parametrize("replica", [False, True])
+async def test_get_read_db_reuses_request_session_for_primary_reads(sessions, monkeypatch, replica):
+    if replica:
+        monkeypatch.setattr(database, "read_engine", Mock())
+    request_session = Mock(close=AsyncMock())
+    dependency = get_read_db(SimpleNamespace(cookies={"read_primary": "1"}, method="GET"), request_session)
+
+    session = await anext(dependency)
+    await dependency.aclose()
+
+    assert session is request_session
+    request_session.close.assert_not_called()  # закрывает get_db
+
+
+async def test_get_db_is_read_only_without_commit_for_get(sessions, monkeypatch):
+    primary, _ = sessions
+    write = Mock(close=AsyncMock(), commit=AsyncMock())
+    monkeypatch.setattr(database, "new_session", lambda: write)
+
+    dependency = database.get_db(SimpleNamespace(method="GET"))
+    assert await anext(dependency) is primary
+    await dependency.aclose()
+
+    primary.commit.assert_not_called()
+    primary.close.assert_awaited_once()
+    write.commit.assert_not_called()
+
+
+async def test_get_db_commits_writes(monkeypatch):
+    write = Mock(close=AsyncMock(), commit=AsyncMock())
+    monkeypatch.setattr(database, "new_session", lambda: write)
+
+    dependency = database.get_db(SimpleNamespace(method="POST"))
+    assert await anext(dependency) is write
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+    write.commit.assert_awaited_once()
+
+
+async def test_graph_pool_sets_search_path_as_startup_parameter(monkeypatch):
+    create_pool = AsyncMock(return_value="pool")
+    monkeypatch.setattr(database.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(database, "graph_pool", None)
+
+    assert await database.init_graph_pool() == "pool"
+
+    kwargs = create_pool.await_args.kwargs
+    # search_path переживает RESET ALL при возврате соединения в пул только как параметр старта
+    assert kwargs["server_settings"]["search_path"].startswith("ag_catalog")
+    assert kwargs["server_settings"]["application_name"].endswith("-graph")
+    assert kwargs["init"] is database.init_graph_connection
+
+
+async def test_graph_connection_init_does_not_set_search_path():
+    conn = SimpleNamespace(add_query_logger=Mock(), execute=AsyncMock(), set_type_codec=AsyncMock())
+
+    await database.init_graph_connection(conn)
+
+    statements = [call.args[0] for call in conn.execute.await_args_list]
+    assert statements == ["LOAD 'age';"]
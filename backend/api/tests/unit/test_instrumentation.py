@@ -0,0 +1,96 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+import instrumentation
+from metrics import count_query
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        count_query()
+        count_query()
+        return {"id": item_id}
+
+    instrumentation.setup_instrumentation(app)
+    return TestClient(app)
+
+
+def test_requests_are_labelled_by_route_template():
+    client = make_client()
+    route = "/items/{item_id}"
+    before = instrumentation.http_request_duration.count(method="GET", route=route)
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+
+    assert instrumentation.http_request_duration.count(method="GET", route=route) == before + 2
+    assert instrumentation.http_requests.value(method="GET", route=route, status="200") >= 2
+    assert instrumentation.http_requests_in_flight.value() == 0
+
+
+def test_unmatched_paths_share_one_label():
+    client = make_client()
+
+    client.get("/no/such/path")
+
+    assert instrumentation.http_requests.value(method="GET", route="unmatched", status="404") >= 1
+
+
+def test_metrics_endpoint_exposes_app_metrics():
+    client = make_client()
+    client.get("/items/1")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'db_queries_per_request_bucket{method="GET",route="/items/{item_id}",le="2"}' in body
+    for name in ("db_pool_checked_out", "graph_cache_requests_total", "password_hash_queue_depth",
+                 "user_cache_requests_total", "http_requests_in_flight"):
+        assert f"# TYPE {name}" in body
+
+
+def test_repeated_statements_are_reported_as_n_plus_one(query_budget):
+    app = FastAPI()
+
+    @app.get("/skills")
+    async def get_skills():
+        count_query(None, None, "SELECT * FROM skills", (), None, False)
+        for skill_id in range(6):
+            count_query(None, None, "SELECT * FROM courses WHERE skill_id = $1", (skill_id,), None, False)
+        return []
+
+    instrumentation.setup_instrumentation(app)
+    before = instrumentation.db_n_plus_one.value(method="GET", route="/skills")
+
+    response = TestClient(app).get("/skills")
+
+    assert response.headers[instrumentation.QUERY_COUNT_HEADER] == "7"
+    assert response.headers[instrumentation.QUERY_REPEATS_HEADER] == "6"
+    assert instrumentation.db_n_plus_one.value(method="GET", route="/skills") == before + 1
+    query_budget.check(response, 7)
+    with pytest.raises(AssertionError, match="repeated 6 times"):
+        query_budget.check(response, 7, max_repeats=1)
+
+
+def test_query_budget_counts_engine_statements_of_a_block(query_budget):
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", count_query)
+
+    with query_budget(2) as counter:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    with pytest.raises(AssertionError, match="3 DB queries, budget is 2"):
+        with query_budget(2):
+            with engine.connect() as conn:
+                for value in range(3):
+                    conn.execute(text("SELECT :value"), {"value": value})
+
+    assert counter.total == 1
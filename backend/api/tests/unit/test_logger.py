@@ -0,0 +1,102 @@
+import json
+import logging
+import queue
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import logger as logger_module
+from logger import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    REQUEST_ID_HEADER,
+    request_id_middleware,
+)
+
+
+def make_record(msg="Error: %s", args=("boom",), level=logging.ERROR, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_emits_one_object_with_request_id_and_extra():
+    line = JsonFormatter().format(make_record(request_id="abc", user_id=7))
+
+    entry = json.loads(line)
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "app"
+    assert entry["message"] == "Error: boom"
+    assert entry["request_id"] == "abc"
+    assert entry["user_id"] == 7
+    assert "\n" not in line
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    log_queue = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+
+    handler.emit(make_record())
+    handler.emit(make_record())
+
+    queued = log_queue.get_nowait()
+    assert queued.msg == "Error: %s"
+    assert queued.args == ("boom",)
+    assert handler.dropped == 1
+
+
+def make_sampled(msg="Slow request %s", args=("GET /",), line=1, **extra) -> logging.LogRecord:
+    record = make_record(msg, args, logging.INFO, sampled=True, **extra)
+    record.lineno = line
+    return record
+
+
+def test_sampling_filter_passes_burst_then_reports_suppressed(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: clock[0])
+    sampling = SamplingFilter(burst=2, window=10, rate=0)
+
+    passed = [sampling.filter(make_sampled(args=(i,))) for i in range(5)]
+    clock[0] = 10.0
+    record = make_sampled()
+
+    assert passed == [True, True, False, False, False]
+    assert sampling.sampled_out == 3
+    assert sampling.filter(record)
+    assert record.suppressed == 3
+
+
+def test_sampling_filter_groups_by_call_site():
+    sampling = SamplingFilter(burst=1, window=60, rate=0)
+
+    assert sampling.filter(make_sampled(line=10))
+    assert sampling.filter(make_sampled(line=20))
+    assert not sampling.filter(make_sampled(line=10))
+
+
+def test_sampling_filter_never_drops_errors_or_unmarked_records():
+    sampling = SamplingFilter(burst=0, window=60, rate=0)
+
+    assert sampling.filter(make_record())
+    assert sampling.filter(make_record(level=logging.WARNING))
+    assert sampling.filter(make_record(sampled=True))
+    assert sampling.sampled_out == 0
+
+
+def test_request_id_middleware_binds_and_echoes_request_id():
+    app = FastAPI()
+    app.middleware("http")(request_id_middleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"request_id": logger_module.request_id_var.get()}
+
+    client = TestClient(app)
+    given = client.get("/ping", headers={REQUEST_ID_HEADER: "req-42"})
+    generated = client.get("/ping", headers={REQUEST_ID_HEADER: "bad id\n"})
+
+    assert given.headers[REQUEST_ID_HEADER] == "req-42"
+    assert given.json() == {"request_id": "req-42"}
+    assert generated.headers[REQUEST_ID_HEADER] != "bad id\n"
+    assert generated.json()["request_id"] == generated.headers[REQUEST_ID_HEADER]
@@ -0,0 +1,86 @@
+import pytest
+
+from types import SimpleNamespace
+
+from metrics import CallbackMetric, Counter, Gauge, Histogram, Registry, count_queries, count_query, start_query_count
+
+
+pytestmark = pytest.mark.anyio
+
+
+def test_counter_and_gauge_render_text_format():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    in_flight = registry.register(Gauge("in_flight", "In flight."))
+
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    in_flight.inc()
+    in_flight.dec()
+
+    assert registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/a\\"b"} 3\n'
+        "# HELP in_flight In flight.\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 0\n"
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, route="/x")
+
+    lines = histogram.render()[2:]
+    assert lines == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 3.65',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+    assert histogram.count(route="/x") == 4
+
+
+def test_labels_must_match():
+    counter = Counter("c_total", "C.", ("route",))
+
+    with pytest.raises(ValueError):
+        counter.inc(path="/x")
+
+
+def test_registry_rejects_duplicates_and_reads_callbacks_at_scrape():
+    registry = Registry()
+    state = {"hits": 1}
+    registry.register(CallbackMetric("hits_total", "Hits.", lambda: [({}, state["hits"])], "counter"))
+    state["hits"] = 5
+
+    assert "hits_total 5" in registry.render()
+    with pytest.raises(ValueError):
+        registry.register(Counter("hits_total", "Hits."))
+
+
+async def test_query_count_is_per_request_context():
+    count_query()  # вне запроса ничего не считается
+
+    counter = start_query_count()
+    count_query()
+    count_query("statement", "parameters")
+
+    assert counter.total == 2
+
+
+async def test_query_counter_tracks_repeated_statements():
+    with count_queries() as counter:
+        for _ in range(3):
+            count_query(None, None, "SELECT skills WHERE id = $1", (1,), None, False)
+        count_query(SimpleNamespace(query="SELECT cypher(...)"))
+
+    count_query(None, None, "SELECT 1", (), None, False)  # вне блока не считается
+    assert counter.total == 4
+    assert counter.max_repeats == 3
+    assert counter.repeated(3) == [("SELECT skills WHERE id = $1", 3)]
+    assert counter.repeated(4) == []
@@ -0,0 +1,139 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+import tracing
+from instrumentation import tracing_middleware
+from tracing import tracer, trace_methods, traced
+
+
+pytestmark = pytest.mark.anyio
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    collector = CollectingExporter()
+    monkeypatch.setattr(tracer, "exporter", collector)
+    monkeypatch.setattr(tracer, "slow_ms", 0)
+    monkeypatch.setattr(tracer, "enabled", True)
+    return collector
+
+
+@trace_methods
+class Repository:
+    async def find(self, value):
+        return value
+
+    @staticmethod
+    def helper():
+        return tracing.current_trace_id()
+
+
+async def test_spans_form_a_tree_and_trace_is_exported_on_root_end(exporter):
+    with tracer.start_trace("GET /items") as root:
+        assert await Repository().find(5) == 5
+        with tracer.span("stage"):
+            pass
+
+    (spans,) = exporter.traces
+    by_name = {span.name: span for span in spans}
+    assert set(by_name) == {"Repository.find", "stage", "GET /items"}
+    assert by_name["Repository.find"].parent_id == root.span_id
+    assert all(span.trace_id == root.trace_id for span in spans)
+    assert Repository.helper() is None
+
+
+async def test_traced_is_a_no_op_outside_a_trace(exporter):
+    @traced()
+    async def work():
+        return 1
+
+    assert await work() == 1
+    with tracer.span("orphan") as span:
+        assert span is None
+    assert exporter.traces == []
+
+
+def test_fast_traces_are_not_exported(exporter, monkeypatch):
+    monkeypatch.setattr(tracer, "slow_ms", 60_000)
+
+    with tracer.start_trace("GET /fast"):
+        with tracer.span("stage"):
+            pass
+
+    assert exporter.traces == []
+
+
+def test_exception_marks_span_as_error(exporter):
+    with pytest.raises(ValueError):
+        with tracer.start_trace("GET /boom"):
+            with tracer.span("stage"):
+                raise ValueError("boom")
+
+    stage = exporter.traces[0][0].to_dict()
+    assert stage["status"] == {"status_code": "ERROR", "description": "boom"}
+    assert stage["events"][0]["attributes"]["exception.type"] == "ValueError"
+
+
+def test_traceparent_header_continues_the_trace(exporter):
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+    with tracer.start_trace("GET /items", traceparent) as root:
+        pass
+
+    assert root.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert root.parent_id == "00f067aa0ba902b7"
+
+
+def test_spans_beyond_the_limit_are_counted(exporter, monkeypatch):
+    monkeypatch.setattr(tracer, "max_spans", 3)
+
+    with tracer.start_trace("GET /n-plus-one") as root:
+        for _ in range(5):
+            with tracer.span("db"):
+                pass
+
+    assert len(exporter.traces[0]) == 3
+    assert root.attributes["trace.dropped_spans"] == 3
+
+
+def test_sqlalchemy_events_create_statement_spans(exporter):
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", tracing.start_statement_span)
+    event.listen(engine, "after_cursor_execute", tracing.end_statement_span)
+    event.listen(engine, "handle_error", tracing.fail_statement_span)
+
+    with tracer.start_trace("GET /db"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+
+    queries = [span for span in exporter.traces[0] if span.name == "db.query"]
+    assert [span.attributes["db.statement"] for span in queries] == ["SELECT 1", "SELECT * FROM missing_table"]
+    assert [span.status for span in queries] == ["UNSET", "ERROR"]
+
+
+def test_middleware_names_root_span_by_route_template(exporter):
+    app = FastAPI()
+    app.middleware("http")(tracing_middleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    TestClient(app).get("/items/3")
+
+    root = exporter.traces[0][-1]
+    assert root.name == "GET /items/{item_id}"
+    assert root.kind == "SERVER"
+    assert root.attributes["http.status_code"] == 200
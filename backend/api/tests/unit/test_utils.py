@@ -9,11 +9,6 @@ from utils import handle_catch_error
 pytestmark = pytest.mark.anyio
 
 
-@pytest.fixture
-def anyio_backend():
-    return "asyncio"
-
-
 @pytest.mark.parametrize(
     ("input_status", "input_code", "expected_status", "expected_code", "expected_reason"),
     [
@@ -80,6 +75,20 @@ def anyio_backend():
             IdentErrorCode.LOGIN_ALREADY_EXISTS,
             "Login is already taken",
         ),
+        (
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            IdentErrorCode.TOO_MANY_REQUESTS,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            IdentErrorCode.TOO_MANY_REQUESTS,
+            "Too many attempts, try again later",
+        ),
+        (
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            IdentErrorCode.SERVICE_BUSY,
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            IdentErrorCode.SERVICE_BUSY,
+            "Too many authentication requests, try again later",
+        ),
         (
             status.HTTP_404_NOT_FOUND,
             UserErrorCode.USER_NOT_FOUND,
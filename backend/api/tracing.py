@@ -0,0 +1,336 @@
+import functools
+import inspect
+import json
+import logging
+import queue
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import (
+    TRACING_ENABLED,
+    TRACE_EXPORTER,
+    TRACE_FILE,
+    TRACE_SLOW_MS,
+    TRACE_MAX_SPANS,
+    LOG_QUEUE_SIZE,
+)
+from logger import app_logger, queue_handler, NonBlockingQueueHandler
+
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+MAX_STATEMENT_LENGTH = 1000
+
+# Активный span текущего запроса (None вне трассы: спаны не создаются)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _iso(time_ns: int) -> str:
+    return datetime.fromtimestamp(time_ns / 1e9, timezone.utc).isoformat(timespec="microseconds")
+
+
+class _Trace:
+    """Spans of one trace; exported when the root span ends and is slow enough."""
+
+    def __init__(self, trace_id: str, tracer: "Tracer"):
+        self.trace_id = trace_id
+        self.tracer = tracer
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def finish(self, span: "Span") -> None:
+        if len(self.spans) < self.tracer.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+        if span.parent is None and self.tracer.exporter is not None and span.duration_ms >= self.tracer.slow_ms:
+            if self.dropped:
+                span.set_attribute("trace.dropped_spans", self.dropped)
+            self.tracer.exporter.export(list(self.spans))
+
+
+class Span:
+    """A timed operation with the OpenTelemetry data model (ids, parent, kind, status, attributes, events).
+
+    Attributes:
+        name: Operation name.
+        trace_id: 32 hex digits, shared by all spans of the request.
+        span_id: 16 hex digits.
+        parent_id: Span id of the parent (for the root - of the remote parent from ``traceparent``).
+    """
+    __slots__ = ("name", "trace_id", "span_id", "parent", "parent_id", "kind", "attributes", "events",
+                 "status", "description", "start_ns", "end_ns", "_trace")
+
+    def __init__(self, name: str, trace: _Trace, parent: Optional["Span"] = None, parent_id: Optional[str] = None,
+                 kind: str = "INTERNAL", attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.name = name
+        self.trace_id = trace.trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent = parent
+        self.parent_id = parent.span_id if parent is not None else parent_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.events: List[dict] = []
+        self.status = "UNSET"
+        self.description: Optional[str] = None
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._trace = trace
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.description = str(exc)
+        self.events.append({
+            "name": "exception",
+            "timestamp": _iso(time.time_ns()),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        self._trace.finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        status = {"status_code": self.status}
+        if self.description:
+            status["description"] = self.description
+        return {
+            "name": self.name,
+            "context": {"trace_id": self.trace_id, "span_id": self.span_id},
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns) if self.end_ns is not None else None,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class ConsoleSpanExporter:
+    """Writes a slow trace as one log record (JSON pipeline of ``logger``) with all its spans."""
+
+    def export(self, spans: List[Span]) -> None:
+        root = spans[-1]
+        app_logger.info(
+            "Slow request %s: %.1f ms, %s spans", root.name, root.duration_ms, len(spans),
+            extra={"trace_id": root.trace_id, "spans": [span.to_dict() for span in spans], "sampled": True},
+        )
+
+
+class _JsonLines:
+    def __init__(self, spans: List[Span]):
+        self.spans = spans
+
+    def __str__(self) -> str:
+        return "\n".join(json.dumps(span.to_dict(), default=str, ensure_ascii=False) for span in self.spans)
+
+
+class FileSpanExporter:
+    """Appends spans as JSON lines (one span per line) to a file.
+
+    Serialisation and file I/O run in a separate listener thread, like the logs.
+    """
+
+    def __init__(self, path: str):
+        file_handler = logging.FileHandler(path, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        self.handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        self.listener = QueueListener(self.handler.queue, file_handler)
+        self.listener.start()
+
+    def export(self, spans: List[Span]) -> None:
+        self.handler.handle(logging.makeLogRecord({"msg": "%s", "args": (_JsonLines(spans),)}))
+
+    def shutdown(self) -> None:
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+
+class Tracer:
+    """Creates spans inside request traces.
+
+    Spans are only created under a root span (``start_trace``); outside a request
+    ``span`` and ``traced`` cost one ContextVar lookup.
+
+    Attributes:
+        exporter: Receives the spans of traces whose root lasted at least ``slow_ms``.
+        slow_ms: Export threshold of the root span duration.
+        max_spans: Spans kept per trace, the rest are counted in ``trace.dropped_spans``.
+    """
+
+    def __init__(self, exporter=None, slow_ms: float = 0.0, max_spans: int = 512, enabled: bool = True):
+        self.exporter = exporter
+        self.slow_ms = slow_ms
+        self.max_spans = max_spans
+        self.enabled = enabled
+
+    @contextmanager
+    def start_trace(self, name: str, traceparent: Optional[str] = None, kind: str = "SERVER",
+                    **attributes: Any) -> Iterator[Optional[Span]]:
+        """Root span of a request; continues the trace of a W3C ``traceparent`` header when given."""
+        if not self.enabled:
+            yield None
+            return
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        match = _TRACEPARENT_PATTERN.match(traceparent or "")
+        if match:
+            trace_id, parent_id = match.groups()
+        span = Span(name, _Trace(trace_id, self), parent_id=parent_id, kind=kind, attributes=attributes)
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def span(self, name: str, kind: str = "INTERNAL", **attributes: Any) -> Iterator[Optional[Span]]:
+        """Child span of the active span (``None`` outside a trace)."""
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(name, parent._trace, parent, kind=kind, attributes=attributes)
+        with self._activate(span):
+            yield span
+
+    @staticmethod
+    @contextmanager
+    def _activate(span: Span) -> Iterator[Span]:
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def start_span(self, name: str, kind: str = "INTERNAL", start_ns: Optional[int] = None,
+                   **attributes: Any) -> Optional[Span]:
+        """Child span that is not made active (for callbacks: DB events); the caller ends it."""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(name, parent._trace, parent, kind=kind, attributes=attributes, start_ns=start_ns)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: runs a function (sync or async) in a span named ``name`` or its qualified name."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(cls: type) -> type:
+    """Class decorator: wraps every public method (not static/class methods) in a ``Class.method`` span."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.isfunction(value):
+            continue
+        setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+# -------------------- DB events --------------------
+
+def start_statement_span(conn, cursor, statement, parameters, context, executemany) -> None:
+    """SQLAlchemy ``before_cursor_execute``: opens a span per SQL statement."""
+    span = tracer.start_span(
+        "db.query", kind="CLIENT", **{"db.system": "postgresql", "db.statement": statement[:MAX_STATEMENT_LENGTH]}
+    )
+    if span is not None and context is not None:
+        context._trace_span = span
+
+
+def end_statement_span(conn, cursor, statement, parameters, context, executemany) -> None:
+    """SQLAlchemy ``after_cursor_execute``."""
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        span.set_attribute("db.rowcount", cursor.rowcount)
+        span.end()
+
+
+def fail_statement_span(exception_context) -> None:
+    """SQLAlchemy ``handle_error``."""
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.end()
+
+
+def record_graph_query(record) -> None:
+    """asyncpg query logger: a span per graph pool query, built after the fact from ``elapsed``."""
+    end_ns = time.time_ns()
+    span = tracer.start_span(
+        "graph.query", kind="CLIENT", start_ns=end_ns - int(record.elapsed * 1e9),
+        **{"db.system": "postgresql", "db.statement": record.query[:MAX_STATEMENT_LENGTH]},
+    )
+    if span is not None:
+        if record.exception is not None:
+            span.record_exception(record.exception)
+        span.end(end_ns)
+
+
+def shutdown_tracing() -> None:
+    """Flushes spans queued by the file exporter."""
+    if isinstance(tracer.exporter, FileSpanExporter):
+        tracer.exporter.shutdown()
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds ``trace_id`` to log records written inside a trace."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "trace_id", None) is None:
+            record.trace_id = current_trace_id()
+        return True
+
+
+def _exporter(name: str):
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "file":
+        return FileSpanExporter(TRACE_FILE)
+    return None
+
+
+tracer = Tracer(_exporter(TRACE_EXPORTER) if TRACING_ENABLED else None, TRACE_SLOW_MS, TRACE_MAX_SPANS,
+                TRACING_ENABLED)
+queue_handler.addFilter(TraceIdFilter())
@@ -52,6 +52,12 @@ def handle_catch_error(func: Callable[..., Coroutine[Any, Any, T]]) -> Callable[
                 case (status.HTTP_409_CONFLICT, IdentErrorCode.LOGIN_ALREADY_EXISTS):
                     raise HTTPError_ident.login_already_exists_409()
 
+                case (status.HTTP_429_TOO_MANY_REQUESTS, IdentErrorCode.TOO_MANY_REQUESTS):
+                    raise HTTPError_ident.too_many_requests_429((e.headers or {}).get("Retry-After"))
+
+                case (status.HTTP_503_SERVICE_UNAVAILABLE, IdentErrorCode.SERVICE_BUSY):
+                    raise HTTPError_ident.service_busy_503()
+
                 # -------------------- Not Found errors --------------------
                 case (status.HTTP_404_NOT_FOUND, UserErrorCode.USER_NOT_FOUND):
                     raise HTTPError_user.user_not_found_404()
@@ -60,7 +66,7 @@ def handle_catch_error(func: Callable[..., Coroutine[Any, Any, T]]) -> Callable[
 
         # -------------------- Other error --------------------
         except Exception as e:
-            app_logger.error(f"Unexpected error in {func.__name__}: {str(e)}", exc_info=True)
+            app_logger.error("Unexpected error in %s: %s", func.__name__, e, exc_info=True)
             raise HTTPError_ident.endpoint_not_found_500()
 
     return wrapper
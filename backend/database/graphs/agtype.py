@@ -0,0 +1,50 @@
+"""Decoding of Apache AGE ``agtype`` text values for the graph scripts.
+
+A copy of ``api/routers/graphs/agtype.py`` without the optional ``orjson``: the
+graphs-init image contains only this directory, so the scripts cannot import
+the API package.
+"""
+import json
+import re
+from typing import Any
+
+
+ANNOTATIONS = frozenset(("vertex", "edge", "path", "numeric"))
+
+# Строковый литерал (оставляем как есть) или аннотация типа вне строки (вырезаем)
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|::[A-Za-z_]+')
+
+
+def _strip_token(match: re.Match) -> str:
+    token = match.group()
+    return token if token[0] == '"' else ""
+
+
+def strip_annotations(value: str) -> str:
+    """Removes every ``::type`` annotation that is not inside a string literal."""
+    if "::" not in value:
+        return value
+
+    # Частый случай: одна аннотация в конце (вершина, ребро, число)
+    head, _, suffix = value.rpartition("::")
+    if suffix in ANNOTATIONS and "::" not in head:
+        return head
+    return _TOKEN_RE.sub(_strip_token, value)
+
+
+def decode_agtype(value: Any) -> Any:
+    """Decodes an agtype text value into Python objects.
+
+    Args:
+        value: Raw value returned by the driver. Non-string values are returned unchanged.
+
+    Returns:
+        A Any, decoded JSON value, or the value without annotations if it is not valid JSON.
+    """
+    if not isinstance(value, str):
+        return value
+    value = strip_annotations(value)
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
@@ -1,10 +1,11 @@
-import re
 import os
 from age import Age
 import networkx as nx
 import matplotlib.pyplot as plt
 from dotenv import load_dotenv
 
+from agtype import decode_agtype
+
 
 load_dotenv()
 
@@ -114,7 +115,7 @@ class GraphVisualizer:
 
         nodes = {}
         for vid_raw, v in rows:
-            vid = int(str(vid_raw))
+            vid = int(decode_agtype(str(vid_raw)))
             node_data = self.unwrap_node(v, age_id=vid)
             nodes[vid] = node_data
             self.G.add_node(vid, **node_data)
@@ -126,12 +127,11 @@ class GraphVisualizer:
         ).fetchall()
 
         for ida, idb, reltype, r in rows_edges:
-            ida_i = int(str(ida))
-            idb_i = int(str(idb))
-            rel_raw = str(reltype)
-            
+            ida_i = int(decode_agtype(str(ida)))
+            idb_i = int(decode_agtype(str(idb)))
+
             # Очищаем название связи
-            rel_clean = re.sub(r"^\"|\"$|::[A-Za-z_0-9]+$", "", rel_raw).strip()
+            rel_clean = str(decode_agtype(str(reltype))).strip()
             if rel_clean.startswith("'") and rel_clean.endswith("'"):
                 rel_clean = rel_clean[1:-1]
                 
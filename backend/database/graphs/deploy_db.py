@@ -1,9 +1,13 @@
 from age import Age
+import hashlib
 import json
+import time
 import psycopg2
 import argparse
 import os
-from psycopg2.extras import RealDictCursor
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from psycopg2.extras import RealDictCursor, execute_values
 from dotenv import load_dotenv
 
 
@@ -44,21 +48,57 @@ class GraphImporter:
     
     def ensure_graph_exists(self):
         try:
-            self.cursor.execute("SELECT name FROM ag_graph WHERE name = 'professions_graph'")
+            self.cursor.execute("SELECT name FROM ag_graph WHERE name = %s", (POSTGRES_GRAPH,))
             if not self.cursor.fetchone():
-                self.cursor.execute("SELECT create_graph('professions_graph');")
+                self.cursor.execute("SELECT create_graph(%s);", (POSTGRES_GRAPH,))
                 self.conn.commit()
-                print("Граф professions_graph создан")
+                print(f"Граф {POSTGRES_GRAPH} создан")
             else:
-                print("Граф professions_graph уже существует")
+                print(f"Граф {POSTGRES_GRAPH} уже существует")
         except Exception as e:
             print(f"Ошибка при проверке/создании графа: {e}")
             self.conn.rollback()
     
+    def ensure_version_table(self):
+        """Создает таблицу версий графа (используется API для инвалидации кэша)"""
+        try:
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS public.graph_version (
+                    profession_id INTEGER PRIMARY KEY,
+                    version BIGINT NOT NULL DEFAULT 1,
+                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.conn.commit()
+        except Exception as e:
+            print(f"Ошибка при создании таблицы graph_version: {e}")
+            self.conn.rollback()
+
+    def bump_graph_version(self, profession_id=None, commit=True):
+        """Увеличивает версию графа профессии (или всех профессий, если profession_id не задан)"""
+        try:
+            if profession_id is None:
+                self.cursor.execute(
+                    "UPDATE public.graph_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP"
+                )
+            else:
+                self.cursor.execute("""
+                    INSERT INTO public.graph_version (profession_id) VALUES (%s)
+                    ON CONFLICT (profession_id)
+                    DO UPDATE SET version = graph_version.version + 1, updated_at = CURRENT_TIMESTAMP
+                """, (profession_id,))
+            if commit:
+                self.conn.commit()
+        except Exception as e:
+            print(f"Ошибка при обновлении версии графа: {e}")
+            if not commit:
+                raise
+            self.conn.rollback()
+
     def execute_cypher_no_return(self, cypher_query):
         """Выполняет Cypher запрос без возврата результата"""
         try:
-            sql_query = f"SELECT * FROM cypher('professions_graph', $${cypher_query}$$) as (v agtype);"
+            sql_query = f"SELECT * FROM cypher('{POSTGRES_GRAPH}', $${cypher_query}$$) as (v agtype);"
             self.cursor.execute(sql_query)
             self.conn.commit()
             return True
@@ -71,7 +111,7 @@ class GraphImporter:
     def execute_cypher_with_return(self, cypher_query):
         """Выполняет Cypher запрос с возвратом результата"""
         try:
-            sql_query = f"SELECT * FROM cypher('professions_graph', $${cypher_query}$$) as (v agtype);"
+            sql_query = f"SELECT * FROM cypher('{POSTGRES_GRAPH}', $${cypher_query}$$) as (v agtype);"
             self.cursor.execute(sql_query)
             result = self.cursor.fetchall()
             self.conn.commit()
@@ -86,6 +126,7 @@ class GraphImporter:
         """Очищает все данные в графе"""
         try:
             self.execute_cypher_no_return("MATCH (n) DETACH DELETE n")
+            self.bump_graph_version()
             print("Существующие данные очищены")
         except Exception as e:
             print(f"Ошибка при очистке данных: {e}")
@@ -223,6 +264,7 @@ class GraphImporter:
                 data = json.load(file)
                 
             self.ensure_graph_exists()
+            self.ensure_version_table()
             self.created_nodes = {}
 
             for profession_name, profession_data in data.items():
@@ -258,6 +300,9 @@ class GraphImporter:
                 else:
                     # если структура другая — обработаем как единый блок
                     self.process_nested_data({profession_name: profession_data}, profession_id, profession_name, "Profession", 1)
+
+                # Сообщаем API, что граф профессии изменился
+                self.bump_graph_version(profession_id)
                 
             print("\n=== Импорт данных завершен! ===")
             
@@ -294,8 +339,571 @@ class GraphImporter:
             self.conn.close()
 
 
-def parsing(path: str):
-    importer = GraphImporter()
+def cypher_literal(value):
+    """Переводит python-значение в литерал Cypher (строки — в двойных кавычках с экранированием)"""
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key}: {cypher_literal(val)}" for key, val in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(cypher_literal(val) for val in value) + "]"
+    if value is None:
+        return "null"
+    if isinstance(value, str) and "$$" in value:
+        raise ValueError(f"Недопустимая последовательность '$$' в значении: {value}")
+    return json.dumps(value, ensure_ascii=False)
+
+
+def flatten_profession(profession_name, profession_data):
+    """Разворачивает JSON-дерево профессии в плоские списки вершин и рёбер.
+
+    Правила те же, что и в GraphImporter.process_json_file: dict с ключом count — Skill,
+    dict без count — Category, скалярные значения пропускаются.
+
+    Returns:
+        dict с ключами profession, categories (имена), skills ({имя: count})
+        и edges (кортежи (from_type, from_name, to_type, to_name)).
+    """
+    categories = {}
+    skills = {}
+    edges = {}
+
+    def walk(data, parent_name, parent_type):
+        for key, value in data.items():
+            if not isinstance(value, dict):
+                continue
+            node_type = "Skill" if "count" in value else "Category"
+            if node_type == "Skill":
+                skills[key] = value["count"]
+                children = {k: v for k, v in value.items() if k != "count"}
+            else:
+                categories[key] = None
+                children = value
+            edges[(parent_type, parent_name, node_type, key)] = None
+            walk(children, key, node_type)
+
+    if isinstance(profession_data, dict):
+        walk(profession_data, profession_name, "Profession")
+    else:
+        walk({profession_name: profession_data}, profession_name, "Profession")
+
+    return {
+        "profession": profession_name,
+        "categories": list(categories),
+        "skills": skills,
+        "edges": list(edges),
+    }
+
+
+def flatten_file(file_path):
+    """Читает JSON-файл и разворачивает все профессии из него"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    return [flatten_profession(name, profession_data) for name, profession_data in data.items()]
+
+
+def subtree_hashes(flat):
+    """Считает хэш содержимого каждого поддерева профессии.
+
+    Хэш узла зависит от его типа, имени, count (для Skill) и хэшей детей, поэтому
+    изменение навыка меняет хэши только его предков.
+
+    Returns:
+        {(тип, имя): {"hash": sha256, "children": [(тип, имя), ...]}}, включая саму профессию.
+    """
+    root = ("Profession", flat["profession"])
+    children = {root: []}
+    children.update({("Category", name): [] for name in flat["categories"]})
+    children.update({("Skill", name): [] for name in flat["skills"]})
+    for from_type, from_name, to_type, to_name in flat["edges"]:
+        children.setdefault((from_type, from_name), []).append((to_type, to_name))
+
+    hashes = {}
+
+    def digest(node, path):
+        if node in hashes:
+            return hashes[node]["hash"]
+        node_type, name = node
+        # Ребро назад по пути (цикл в JSON) учитывается только по имени
+        child_hashes = sorted(
+            [child_type, child_name, "" if (child_type, child_name) in path else digest((child_type, child_name), path | {node})]
+            for child_type, child_name in children.get(node, ())
+        )
+        value = flat["skills"].get(name) if node_type == "Skill" else None
+        payload = json.dumps([node_type, name, value, child_hashes], ensure_ascii=False)
+        hashes[node] = {
+            "hash": hashlib.sha256(payload.encode("utf-8")).hexdigest(),
+            "children": list(children.get(node, ())),
+        }
+        return hashes[node]["hash"]
+
+    for node in children:
+        digest(node, frozenset({node}))
+    return hashes
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkGraphImporter(GraphImporter):
+    """Массовый импорт: одна транзакция на файл, set-based upsert таблиц и пакетный UNWIND в граф"""
+
+    UPSERT_SKILLS_SQL = """
+        WITH input AS (SELECT DISTINCT unnest(%s::text[]) AS name),
+        inserted AS (
+            INSERT INTO skills (name) SELECT name FROM input
+            ON CONFLICT (name) DO NOTHING
+            RETURNING id, name
+        )
+        SELECT id, name FROM inserted
+        UNION ALL
+        SELECT s.id, s.name FROM skills s JOIN input USING (name)
+    """
+
+    UPSERT_PROFESSIONS_SQL = """
+        WITH input AS (SELECT DISTINCT unnest(%s::text[]) AS name),
+        existing AS (
+            SELECT min(p.id) AS id, p.name FROM professions p JOIN input USING (name) GROUP BY p.name
+        ),
+        inserted AS (
+            INSERT INTO professions (name)
+            SELECT name FROM input WHERE name NOT IN (SELECT name FROM existing)
+            RETURNING id, name
+        )
+        SELECT id, name FROM existing
+        UNION ALL
+        SELECT id, name FROM inserted
+    """
+
+    def __init__(self, batch_size=500):
+        super().__init__()
+        self.batch_size = batch_size
+        self.stats = {"professions": 0, "categories": 0, "skills": 0, "edges": 0, "statements": 0}
+
+    def execute_cypher(self, cypher_query):
+        """Выполняет Cypher в текущей транзакции (без commit, ошибки пробрасываются)"""
+        sql_query = f"SELECT * FROM cypher('{POSTGRES_GRAPH}', $${cypher_query}$$) as (v agtype);"
+        self.cursor.execute(sql_query)
+        self.stats["statements"] += 1
+
+    def upsert_skills(self, names):
+        """Создает недостающие навыки одним запросом и возвращает {имя: id}"""
+        if not names:
+            return {}
+        self.cursor.execute(self.UPSERT_SKILLS_SQL, (list(names),))
+        self.stats["statements"] += 1
+        return {row['name']: row['id'] for row in self.cursor.fetchall()}
+
+    def upsert_professions(self, names):
+        """Создает недостающие профессии одним запросом и возвращает {имя: id}"""
+        if not names:
+            return {}
+        self.cursor.execute(self.UPSERT_PROFESSIONS_SQL, (list(names),))
+        self.stats["statements"] += 1
+        return {row['name']: row['id'] for row in self.cursor.fetchall()}
+
+    @staticmethod
+    def edge_endpoint(var, node_type, key, profession_id):
+        """Шаблон MATCH для конца ребра: Skill — по skill_id, остальные — по имени и профессии"""
+        if node_type == "Profession":
+            return f"MATCH ({var}:Profession) WHERE {var}.profession_id = {profession_id}"
+        if node_type == "Skill":
+            return f"MATCH ({var}:Skill) WHERE {var}.skill_id = e.{key}_id"
+        return f"MATCH ({var}:Category) WHERE {var}.name = e.{key} AND {var}.profession_id = {profession_id}"
+
+    def merge_profession(self, profession_name, profession_id):
+        self.execute_cypher(
+            f"MERGE (p:Profession {{profession_id: {profession_id}}}) "
+            f"SET p.name = {cypher_literal(profession_name)}"
+        )
+        self.stats["professions"] += 1
+
+    def merge_categories(self, names, profession_id):
+        for batch in batched(list(names), self.batch_size):
+            rows = cypher_literal([{"name": name} for name in batch])
+            self.execute_cypher(
+                f"UNWIND {rows} AS row "
+                f"MERGE (c:Category {{name: row.name, profession_id: {profession_id}}})"
+            )
+            self.stats["categories"] += len(batch)
+
+    def merge_skills(self, skills, profession_id, skill_ids):
+        """Создает/обновляет вершины Skill; skills — {имя: count}"""
+        # Порядок по skill_id одинаков во всех писателях — меньше шансов на взаимоблокировки
+        items = sorted(skills.items(), key=lambda item: skill_ids[item[0]])
+        for batch in batched(items, self.batch_size):
+            rows = cypher_literal([
+                {"skill_id": skill_ids[name], "name": name, "value": count} for name, count in batch
+            ])
+            self.execute_cypher(
+                f"UNWIND {rows} AS row "
+                f"MERGE (s:Skill {{skill_id: row.skill_id}}) "
+                f"SET s.name = row.name, s.value = row.value, s.profession_id = {profession_id}"
+            )
+            self.stats["skills"] += len(batch)
+
+    @staticmethod
+    def group_edges(edges, skill_ids):
+        """Группирует рёбра по паре меток (для UNWIND нужен один шаблон MATCH на пакет)"""
+        groups = {}
+        for from_type, from_name, to_type, to_name in edges:
+            groups.setdefault((from_type, to_type), []).append({
+                "from": from_name,
+                "from_id": skill_ids.get(from_name) if from_type == "Skill" else None,
+                "to": to_name,
+                "to_id": skill_ids.get(to_name) if to_type == "Skill" else None,
+            })
+        return groups
+
+    def merge_edges(self, edges, profession_id, skill_ids):
+        for (from_type, to_type), rows in self.group_edges(edges, skill_ids).items():
+            for batch in batched(rows, self.batch_size):
+                self.execute_cypher(
+                    f"UNWIND {cypher_literal(batch)} AS e "
+                    f"{self.edge_endpoint('a', from_type, 'from', profession_id)} "
+                    f"{self.edge_endpoint('b', to_type, 'to', profession_id)} "
+                    f"MERGE (a)-[:CONTAINS]->(b)"
+                )
+                self.stats["edges"] += len(batch)
+
+    def load_profession(self, flat, profession_id, skill_ids):
+        """Создает вершины и рёбра одной профессии пакетами UNWIND"""
+        self.merge_profession(flat["profession"], profession_id)
+        self.merge_categories(flat["categories"], profession_id)
+        self.merge_skills(flat["skills"], profession_id, skill_ids)
+        self.merge_edges(flat["edges"], profession_id, skill_ids)
+
+    def create_skill_vertices(self, skill_ids):
+        """Заранее создает вершины Skill (MERGE по skill_id), чтобы параллельные писатели их только обновляли"""
+        items = sorted(skill_ids.items(), key=lambda item: item[1])
+        for batch in batched(items, self.batch_size):
+            rows = cypher_literal([{"skill_id": skill_id, "name": name} for name, skill_id in batch])
+            self.execute_cypher(
+                f"UNWIND {rows} AS row "
+                f"MERGE (s:Skill {{skill_id: row.skill_id}}) "
+                f"SET s.name = row.name"
+            )
+
+    def load_flat_professions(self, flat_professions, skill_ids=None, profession_ids=None):
+        """Загружает уже развёрнутые профессии в текущей транзакции (без commit)"""
+        if skill_ids is None:
+            skill_names = {name for flat in flat_professions for name in flat["skills"]}
+            skill_ids = self.upsert_skills(skill_names)
+        if profession_ids is None:
+            profession_ids = self.upsert_professions([flat["profession"] for flat in flat_professions])
+
+        for flat in flat_professions:
+            profession_id = profession_ids[flat["profession"]]
+            print(f"\n=== Обработка профессии: {flat['profession']} (ID: {profession_id}) ===")
+            self.load_profession(flat, profession_id, skill_ids)
+            self.bump_graph_version(profession_id, commit=False)
+
+    def print_throughput(self, file_path, elapsed, label=None):
+        """Печатает пропускную способность; label — подпись вместо имени файла (итог нескольких файлов)"""
+        vertices = self.stats["professions"] + self.stats["categories"] + self.stats["skills"]
+        elapsed = max(elapsed, 1e-9)
+        if label is None:
+            label = os.path.basename(file_path)
+        print(
+            f"\n=== {label}: {vertices} вершин, {self.stats['edges']} связей "
+            f"за {elapsed:.2f} c ({vertices / elapsed:.0f} вершин/с, {self.stats['edges'] / elapsed:.0f} связей/с, "
+            f"{self.stats['statements']} запросов) ==="
+        )
+
+    def process_json_file(self, file_path):
+        """Импорт JSON файла одной транзакцией"""
+        self.ensure_graph_exists()
+        self.ensure_version_table()
+
+        started = time.perf_counter()
+        flat_professions = flatten_file(file_path)
+        try:
+            self.load_flat_professions(flat_professions)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Ошибка при обработке файла (транзакция отменена): {e}")
+            raise
+
+        self.print_throughput(file_path, time.perf_counter() - started)
+
+
+class DiffGraphImporter(BulkGraphImporter):
+    """Инкрементальный импорт: применяются только поддеревья, чей хэш изменился.
+
+    Хэши поддеревьев хранятся в graph_subtree_hash вместе с версией графа профессии.
+    Любой другой деплой увеличивает версию, и сохраненные хэши перестают учитываться.
+    """
+
+    LOAD_HASHES_SQL = """
+        SELECT h.node_type, h.name, h.hash, h.children
+        FROM public.graph_subtree_hash h
+        JOIN public.graph_version v ON v.profession_id = h.profession_id AND v.version = h.version
+        WHERE h.profession_id = %s
+    """
+
+    def __init__(self, batch_size=500):
+        super().__init__(batch_size)
+        self.stats.update({"unchanged_professions": 0, "deleted_nodes": 0, "deleted_edges": 0})
+
+    def ensure_hash_table(self):
+        """Создает таблицу хэшей поддеревьев (если её нет)"""
+        try:
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS public.graph_subtree_hash (
+                    profession_id INTEGER NOT NULL,
+                    node_type VARCHAR(16) NOT NULL,
+                    name TEXT NOT NULL,
+                    hash CHAR(64) NOT NULL,
+                    children JSONB NOT NULL DEFAULT '[]',
+                    version BIGINT NOT NULL,
+                    PRIMARY KEY (profession_id, node_type, name)
+                )
+            """)
+            self.conn.commit()
+        except Exception as e:
+            print(f"Ошибка при создании таблицы graph_subtree_hash: {e}")
+            self.conn.rollback()
+
+    def load_hashes(self, profession_id):
+        """Возвращает сохраненные хэши профессии (пусто, если граф менялся без --diff)"""
+        self.cursor.execute(self.LOAD_HASHES_SQL, (profession_id,))
+        self.stats["statements"] += 1
+        return {
+            (row["node_type"], row["name"]): {
+                "hash": row["hash"],
+                "children": [tuple(child) for child in row["children"]],
+            }
+            for row in self.cursor.fetchall()
+        }
+
+    def save_hashes(self, profession_id, new, changed, removed, replace_all):
+        """Сохраняет хэши изменившихся узлов и привязывает все хэши профессии к её новой версии"""
+        if replace_all:
+            self.cursor.execute("DELETE FROM public.graph_subtree_hash WHERE profession_id = %s", (profession_id,))
+        elif removed:
+            self.cursor.execute("""
+                DELETE FROM public.graph_subtree_hash
+                WHERE profession_id = %s
+                  AND (node_type, name) IN (SELECT * FROM unnest(%s::text[], %s::text[]))
+            """, (profession_id, [node[0] for node in removed], [node[1] for node in removed]))
+
+        execute_values(self.cursor, """
+            INSERT INTO public.graph_subtree_hash (profession_id, node_type, name, hash, children, version)
+            VALUES %s
+            ON CONFLICT (profession_id, node_type, name)
+            DO UPDATE SET hash = EXCLUDED.hash, children = EXCLUDED.children
+        """, [
+            (profession_id, node[0], node[1], new[node]["hash"], json.dumps(new[node]["children"], ensure_ascii=False), 0)
+            for node in changed
+        ], template="(%s, %s, %s, %s, %s::jsonb, %s)", page_size=self.batch_size)
+
+        self.cursor.execute("""
+            UPDATE public.graph_subtree_hash h SET version = v.version
+            FROM public.graph_version v
+            WHERE v.profession_id = h.profession_id AND h.profession_id = %s
+        """, (profession_id,))
+        self.stats["statements"] += 3
+
+    def delete_edges(self, edges, profession_id, skill_ids):
+        for (from_type, to_type), rows in self.group_edges(edges, skill_ids).items():
+            for batch in batched(rows, self.batch_size):
+                self.execute_cypher(
+                    f"UNWIND {cypher_literal(batch)} AS e "
+                    f"{self.edge_endpoint('a', from_type, 'from', profession_id)} "
+                    f"{self.edge_endpoint('b', to_type, 'to', profession_id)} "
+                    f"MATCH (a)-[r:CONTAINS]->(b) DELETE r"
+                )
+                self.stats["deleted_edges"] += len(batch)
+
+    def delete_categories(self, names, profession_id):
+        for batch in batched(list(names), self.batch_size):
+            rows = cypher_literal([{"name": name} for name in batch])
+            self.execute_cypher(
+                f"UNWIND {rows} AS row "
+                f"MATCH (c:Category) WHERE c.name = row.name AND c.profession_id = {profession_id} "
+                f"DETACH DELETE c"
+            )
+            self.stats["deleted_nodes"] += len(batch)
+
+    def apply_profession_diff(self, flat, profession_id):
+        """Применяет к графу только изменившиеся поддеревья профессии.
+
+        Returns:
+            True, если граф профессии изменился (и версию нужно увеличить).
+        """
+        root = ("Profession", flat["profession"])
+        old = self.load_hashes(profession_id)
+        new = subtree_hashes(flat)
+        if old.get(root, {}).get("hash") == new[root]["hash"]:
+            self.stats["unchanged_professions"] += 1
+            return False
+
+        changed = [node for node, entry in new.items() if old.get(node, {}).get("hash") != entry["hash"]]
+        removed = [node for node in old if node not in new]
+
+        # Рёбра изменившихся узлов: новые MERGE-им (идемпотентно), пропавшие удаляем
+        added_edges, removed_edges = [], []
+        for node in changed + removed:
+            new_children = new[node]["children"] if node in new else []
+            old_children = old[node]["children"] if node in old else []
+            added_edges += [(*node, *child) for child in new_children]
+            removed_edges += [(*node, *child) for child in set(old_children) - set(new_children)]
+
+        edges = added_edges + removed_edges
+        skill_names = {name for node_type, name in changed if node_type == "Skill"}
+        skill_names |= {edge[1] for edge in edges if edge[0] == "Skill"}
+        skill_names |= {edge[3] for edge in edges if edge[2] == "Skill"}
+        skill_ids = self.upsert_skills(skill_names)
+
+        self.merge_profession(flat["profession"], profession_id)
+        self.merge_categories([name for node_type, name in changed if node_type == "Category"], profession_id)
+        self.merge_skills(
+            {name: flat["skills"][name] for node_type, name in changed if node_type == "Skill"},
+            profession_id, skill_ids,
+        )
+        self.delete_edges(removed_edges, profession_id, skill_ids)
+        # Вершины Skill общие для всех профессий (MERGE по skill_id) — удаляем только категории
+        self.delete_categories([name for node_type, name in removed if node_type == "Category"], profession_id)
+        self.merge_edges(added_edges, profession_id, skill_ids)
+
+        self.bump_graph_version(profession_id, commit=False)
+        self.save_hashes(profession_id, new, changed, removed, replace_all=not old)
+        return True
+
+    def load_flat_professions(self, flat_professions, skill_ids=None, profession_ids=None):
+        """Применяет изменения развёрнутых профессий в текущей транзакции (без commit)"""
+        if profession_ids is None:
+            profession_ids = self.upsert_professions([flat["profession"] for flat in flat_professions])
+
+        for flat in flat_professions:
+            profession_id = profession_ids[flat["profession"]]
+            if self.apply_profession_diff(flat, profession_id):
+                print(f"✏️  {flat['profession']} (ID: {profession_id}): граф обновлен")
+            else:
+                print(f"⏭️  {flat['profession']} (ID: {profession_id}): без изменений")
+
+    def process_json_file(self, file_path):
+        self.ensure_hash_table()
+        super().process_json_file(file_path)
+        print(
+            f"Без изменений: {self.stats['unchanged_professions']} профессий, "
+            f"удалено вершин: {self.stats['deleted_nodes']}, связей: {self.stats['deleted_edges']}"
+        )
+
+
+def group_by_profession(flattened):
+    """Объединяет файлы с общими профессиями в группы (компоненты связности по имени профессии).
+
+    Вершины Profession и Category и их рёбра создаются через MERGE, а параллельные
+    транзакции не видят незакоммиченные вершины друг друга: файлы одной профессии
+    должен загружать один писатель по очереди, иначе появятся дубли.
+
+    Returns:
+        Список групп путей к файлам в исходном порядке.
+    """
+    parent = {file_path: file_path for file_path in flattened}
+
+    def find(file_path):
+        while parent[file_path] != file_path:
+            parent[file_path] = parent[parent[file_path]]
+            file_path = parent[file_path]
+        return file_path
+
+    owner = {}
+    for file_path, flats in flattened.items():
+        for flat in flats:
+            other = owner.setdefault(flat["profession"], file_path)
+            parent[find(file_path)] = find(other)
+
+    groups = {}
+    for file_path in flattened:
+        groups.setdefault(find(file_path), []).append(file_path)
+    return list(groups.values())
+
+
+def deploy_parallel(file_paths, jobs, batch_size=500):
+    """Параллельный массовый импорт нескольких файлов.
+
+    1. Файлы читаются и разворачиваются в пуле процессов (jobs штук).
+    2. Координатор одной транзакцией создает все навыки, профессии, вершины Skill
+       и рёбра между навыками — всё, что общее у разных профессий, поэтому
+       параллельные писатели это только находят через MERGE.
+    3. Не более jobs писателей (каждый со своим соединением) грузят группы файлов
+       (group_by_profession): файлы с общей профессией — один писатель по очереди,
+       по одной транзакции на файл.
+    """
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        flattened = dict(zip(file_paths, pool.map(flatten_file, file_paths)))
+    print(f"📄 Разобрано файлов: {len(flattened)} за {time.perf_counter() - started:.2f} c")
+
+    coordinator = BulkGraphImporter(batch_size)
+    try:
+        coordinator.connect_to_db()
+        coordinator.ensure_graph_exists()
+        coordinator.ensure_version_table()
+        all_professions = [flat for flats in flattened.values() for flat in flats]
+        skill_ids = coordinator.upsert_skills({name for flat in all_professions for name in flat["skills"]})
+        profession_ids = coordinator.upsert_professions([flat["profession"] for flat in all_professions])
+        coordinator.create_skill_vertices(skill_ids)
+        skill_edges = {edge for flat in all_professions for edge in flat["edges"] if edge[0] == edge[2] == "Skill"}
+        coordinator.merge_edges(sorted(skill_edges), None, skill_ids)
+        coordinator.conn.commit()
+    except Exception:
+        coordinator.conn.rollback()
+        raise
+    finally:
+        coordinator.close_connections()
+
+    local = threading.local()
+    writers = []
+    writers_lock = threading.Lock()
+
+    def get_writer():
+        if not hasattr(local, "importer"):
+            local.importer = BulkGraphImporter(batch_size)
+            local.importer.connect_to_db()
+            with writers_lock:
+                writers.append(local.importer)
+        return local.importer
+
+    def write_file(file_path):
+        importer = get_writer()
+        file_started = time.perf_counter()
+        try:
+            importer.load_flat_professions(flattened[file_path], skill_ids, profession_ids)
+            importer.conn.commit()
+        except Exception as e:
+            importer.conn.rollback()
+            print(f"❌ Ошибка при обработке файла {file_path} (транзакция отменена): {e}")
+            return False
+        print(f"✅ {os.path.basename(file_path)} загружен за {time.perf_counter() - file_started:.2f} c")
+        return True
+
+    def write_group(group):
+        return [write_file(file_path) for file_path in group]
+
+    groups = group_by_profession(flattened)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = [ok for group_results in pool.map(write_group, groups) for ok in group_results]
+    finally:
+        for importer in writers:
+            importer.close_connections()
+
+    totals = BulkGraphImporter(batch_size)
+    for importer in writers:
+        for key, value in importer.stats.items():
+            totals.stats[key] += value
+    totals.print_throughput(None, time.perf_counter() - started, label=f"{sum(results)}/{len(file_paths)} файлов")
+
+
+def parsing(path: str, bulk: bool = False, batch_size: int = 500, diff: bool = False):
+    if diff:
+        importer = DiffGraphImporter(batch_size)
+    else:
+        importer = BulkGraphImporter(batch_size) if bulk else GraphImporter()
     try:
         importer.connect_to_db()
         importer.process_json_file(path)
@@ -311,12 +919,22 @@ def main():
     parser = argparse.ArgumentParser(description='Deploy Graph in DB')
     parser.add_argument("--file", help="Если нужно распарсить конкретный json-файл.")
     parser.add_argument("--dir", type=str, help="Если нужно распарсить все json-файлы в директории.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Массовый импорт: одна транзакция на файл, пакетные UNWIND вместо запроса на каждый узел.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Размер пакета UNWIND в режиме --bulk.")
+    parser.add_argument("--diff", action="store_true",
+                        help="Инкрементальный импорт: применяются только изменившиеся поддеревья (хэши в graph_subtree_hash).")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Число процессов разбора и соединений-писателей для --dir (включает режим --bulk, "
+                             "несовместимо с --diff).")
 
     args = parser.parse_args()
+    if args.jobs > 1 and args.diff:
+        parser.error("--jobs несовместим с --diff: инкрементальный импорт выполняется последовательно")
 
     if args.file:
         if os.path.exists(args.file):
-            parsing(args.file)
+            parsing(args.file, bulk=args.bulk, batch_size=args.batch_size, diff=args.diff)
         else:
             print(f"❌ Файл не найден: {args.file}")
     
@@ -331,10 +949,14 @@ def main():
                     return
                 
                 print(f"📁 Найдено {len(json_files)} JSON файлов для обработки")
+
+                if args.jobs > 1:
+                    deploy_parallel([os.path.join(args.dir, f) for f in json_files], args.jobs, args.batch_size)
+                    return
                 
                 for file in json_files:
                     file_path = os.path.join(args.dir, file)
-                    parsing(file_path)
+                    parsing(file_path, bulk=args.bulk, batch_size=args.batch_size, diff=args.diff)
                     
             except Exception as e:
                 print(f"❌ Ошибка при чтении директории: {e}")
@@ -345,6 +967,9 @@ def main():
         print("ℹ️  Использование:")
         print("  --file <path>  - обработать конкретный json файл")
         print("  --dir <path>   - обработать все JSON файлы в директории")
+        print("  --bulk         - массовый импорт (вместе с --file или --dir)")
+        print("  --diff         - применить только изменившиеся поддеревья (вместе с --file или --dir)")
+        print("  --jobs <N>     - параллельный массовый импорт директории (вместе с --dir, без --diff)")
         print("❌ Не указаны аргументы. Используйте --help для справки.")
 
 
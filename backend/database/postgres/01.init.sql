@@ -13,6 +13,13 @@ CREATE TABLE users (
     update_time TIMESTAMP
 );
 
+-- Отозванные refresh-токены (ротация и logout), хранятся до истечения токена
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(64) PRIMARY KEY,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX ix_revoked_tokens_expires_at ON revoked_tokens (expires_at);
+
 -- Таблица навыков
 CREATE TABLE skills (
     id INTEGER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
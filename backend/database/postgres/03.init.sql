@@ -0,0 +1,17 @@
+-- Версии графа профессий (инвалидация кэша графа в API)
+CREATE TABLE graph_version (
+    profession_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Хэши поддеревьев графа (инкрементальный деплой deploy_db.py --diff)
+CREATE TABLE graph_subtree_hash (
+    profession_id INTEGER NOT NULL,
+    node_type VARCHAR(16) NOT NULL,
+    name TEXT NOT NULL,
+    hash CHAR(64) NOT NULL,
+    children JSONB NOT NULL DEFAULT '[]',
+    version BIGINT NOT NULL,
+    PRIMARY KEY (profession_id, node_type, name)
+);